@@ -13,9 +13,19 @@ class Settings(BaseSettings):
     twilio_account_sid: str
     twilio_auth_token: str
     twilio_phone_number: str
+    twilio_api_url: str = "https://api.twilio.com/2010-04-01"
+    twilio_max_connections: int = 20
+    twilio_timeout_seconds: float = 15.0
+    twilio_messaging_service_sid: str = ""
+    # Delivery status callbacks; the URL defaults to {api_base_url}/api/webhooks/twilio/sms-status
+    twilio_status_callback_enabled: bool = True
+    twilio_status_callback_url: str = ""
+    twilio_validate_signature: bool = True
     
     # Database Configuration
     database_url: str = "sqlite:///./bills.db"
+    # Used by async routes; defaults to DATABASE_URL with aiosqlite / asyncpg
+    async_database_url: str = ""
     
     # Application Configuration
     secret_key: str = "change-this-secret-key-in-production"
@@ -37,6 +47,126 @@ class Settings(BaseSettings):
     max_call_duration: int = 300
     call_retry_attempts: int = 3
     reminder_interval_hours: int = 24
+    # IANA timezone of callback times the customer names ("5 pm"), unless the assistant passes one
+    customer_timezone: str = "Asia/Kolkata"
+    
+    # Call Rate Limiting
+    vapi_calls_per_second: float = 2.0
+    vapi_call_burst: int = 5
+    vapi_max_concurrent_calls: int = 10
+    vapi_call_queue_max_wait: float = 60.0
+    vapi_call_lease_grace: int = 120
+    
+    # Outbound Number Pool (comma-separated VAPI phone number IDs; empty uses vapi_phone_number_id)
+    vapi_phone_number_ids: str = ""
+    vapi_max_calls_per_number: int = 0
+    vapi_number_selection: str = "least_loaded"
+    vapi_max_connections: int = 50
+    
+    # Call Reconciler (repairs calls whose webhooks were lost)
+    call_reconciler_enabled: bool = True
+    call_reconciler_interval: int = 60
+    call_reconciler_stale_seconds: int = 300
+    call_reconciler_concurrency: int = 20
+    call_reconciler_batch_size: int = 500
+    call_reconciler_lease_seconds: int = 180
+    
+    # Overdue Marker (sets unpaid bills past their due date to overdue)
+    overdue_marker_enabled: bool = True
+    overdue_marker_interval: int = 300
+    overdue_marker_lease_seconds: int = 900
+    
+    # Call Job Queue
+    call_job_worker_enabled: bool = True
+    call_job_worker_concurrency: int = 5
+    call_job_poll_interval: float = 2.0
+    call_job_lock_timeout: int = 300
+    call_job_backoff_seconds: int = 60
+    call_job_backoff_max_seconds: int = 3600
+    
+    # Reminder Scheduler ("call" queues a call until call_retry_attempts is used up, then sends SMS)
+    # Off by default because due reminders dial customers
+    reminder_scheduler_enabled: bool = False
+    reminder_channel: str = "call"
+    reminder_scheduler_window: int = 10000
+    reminder_scheduler_resync_seconds: int = 300
+    
+    # VAPI Webhook Ingestion ("queue" acknowledges at once and applies events in the
+    # background, sharded by call ID; "partitioned" stores them in webhook_events for
+    # partition workers across processes; "sync" applies them before responding)
+    webhook_ingest_mode: str = "queue"
+    webhook_consumers: int = 4
+    webhook_queue_max_size: int = 10000
+    webhook_queue_max_wait: float = 5.0
+    
+    # Partitioned Webhook Workers (max_partitions 0 = take every free partition)
+    webhook_partitions: int = 16
+    webhook_worker_enabled: bool = True
+    webhook_worker_max_partitions: int = 0
+    webhook_partition_lease_seconds: int = 30
+    webhook_partition_poll_interval: float = 0.5
+    webhook_event_max_attempts: int = 5
+    webhook_event_retention_hours: int = 72
+    
+    # Webhook Group Commit (events applied within the window share one transaction;
+    # durability per message type: immediate = own commit, group = caller waits for the
+    # shared commit, deferred = caller does not wait; unlisted types use group)
+    webhook_group_commit_enabled: bool = True
+    webhook_group_commit_window_ms: int = 10
+    webhook_group_commit_max_batch: int = 200
+    # Events waiting for the writer; submitters wait for room, so queue shards fill up behind it
+    webhook_group_commit_max_queue: int = 1000
+    webhook_commit_durability: str = "tool-calls:immediate,function-call:immediate,transcript:deferred"
+    
+    # Raw VAPI Webhook Journal (gzip segments rotated by size or age; retention 0 = keep all)
+    webhook_journal_enabled: bool = True
+    webhook_journal_dir: str = "webhook_journal"
+    webhook_journal_segment_mb: int = 64
+    webhook_journal_segment_minutes: int = 60
+    webhook_journal_retention_days: int = 30
+    webhook_journal_queue_size: int = 10000
+    
+    # Assistant Tool Calls (budget = latency target, timeout = when the assistant gets a
+    # fallback reply; per-tool overrides as "tool:ms,tool:ms")
+    tool_call_budget_ms: int = 1000
+    tool_call_timeout_ms: int = 3000
+    tool_call_budgets: str = "send_payment_link:2000"
+    tool_call_timeouts: str = ""
+    
+    # Active call cache used by webhook handlers (entries expire after the maximum call window)
+    active_call_cache_size: int = 10000
+    
+    # Dial Priority (priors for customers with little call history, decay per attempt,
+    # call minutes when answered / unanswered, log-score boost per day overdue)
+    priority_answer_rate: float = 0.5
+    priority_payment_rate: float = 0.3
+    priority_prior_weight: float = 2.0
+    priority_attempt_decay: float = 0.8
+    priority_talk_minutes: float = 3.0
+    priority_ring_minutes: float = 0.5
+    priority_overdue_weight: float = 0.02
+    
+    # Idempotency-Key retention
+    idempotency_key_ttl_hours: int = 24
+    
+    # Campaign Configuration
+    campaign_concurrency: int = 5
+    campaign_max_concurrency: int = 50
+    
+    # Bulk Bill Import (rows per INSERT and commit; per-row errors kept in the response)
+    bill_import_chunk_size: int = 1000
+    bill_import_max_errors: int = 1000
+    
+    # Streaming exports (rows fetched per server-side cursor batch)
+    export_batch_size: int = 1000
+    
+    # Bulk Reminder SMS (rate per blast; sends in flight at once; overdue bills read per chunk;
+    # a running blast with no heartbeat for stale_seconds is resumed at startup)
+    sms_blast_messages_per_second: float = 10.0
+    sms_blast_max_messages_per_second: float = 100.0
+    sms_blast_concurrency: int = 20
+    sms_blast_chunk_size: int = 200
+    sms_blast_stale_seconds: int = 120
     
     class Config:
         env_file = ".env"
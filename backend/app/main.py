@@ -1,13 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.database import init_db
+from app.database import init_db, SessionLocal, async_engine
 from app.routes import (
     bills_router,
     calls_router,
     payments_router,
-    vapi_webhooks_router
+    vapi_webhooks_router,
+    campaigns_router,
+    call_jobs_router,
+    sms_blasts_router,
+    twilio_webhooks_router,
+    exports_router,
+    stats_router
 )
+from app.services.campaign_service import campaign_manager
+from app.services.call_job_service import call_job_worker
+from app.services.reminder_scheduler import reminder_scheduler
+from app.services.call_reconciler import call_reconciler
+from app.services.overdue_marker import overdue_marker
+from app.services.vapi_service import close_http_client
+from app.services.twilio_service import close_twilio_http_client
+from app.services.dial_priority import DialPriorityService
+from app.services.stats_service import StatsService
+from app.services.webhook_queue import webhook_queue
+from app.services.webhook_partitions import webhook_partition_worker
+from app.services.webhook_journal import webhook_journal
+from app.services.webhook_writer import webhook_commit_writer
+from app.services.sms_blast_service import sms_blast_runner
+import asyncio
 import logging
 
 # Configure logging
@@ -36,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -46,6 +68,68 @@ async def startup_event():
     logger.info("Starting up application...")
     init_db()
     logger.info("Database initialized successfully")
+    
+    db = SessionLocal()
+    try:
+        DialPriorityService.backfill(db)
+        StatsService.ensure_counters(db)
+    finally:
+        db.close()
+    
+    if settings.webhook_group_commit_enabled:
+        webhook_commit_writer.start()
+    
+    if settings.webhook_ingest_mode == "queue":
+        webhook_queue.start()
+    
+    if settings.webhook_journal_enabled:
+        webhook_journal.start()
+    
+    if settings.webhook_ingest_mode == "partitioned" and settings.webhook_worker_enabled:
+        webhook_partition_worker.start()
+    
+    if settings.call_job_worker_enabled:
+        call_job_worker.start()
+    
+    if settings.reminder_scheduler_enabled:
+        reminder_scheduler.start()
+    
+    if settings.call_reconciler_enabled:
+        call_reconciler.start()
+    
+    if settings.overdue_marker_enabled:
+        overdue_marker.start()
+    
+    # Blasts interrupted by a restart carry on from their pending recipients
+    await sms_blast_runner.resume_stale()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work before the process exits"""
+    logger.info("Shutting down application...")
+    await campaign_manager.shutdown()
+    await sms_blast_runner.stop()
+    await webhook_queue.stop()
+    await webhook_commit_writer.stop()
+    await webhook_partition_worker.stop()
+    await asyncio.to_thread(webhook_journal.stop)
+    
+    if settings.call_job_worker_enabled:
+        await call_job_worker.stop()
+    
+    if settings.reminder_scheduler_enabled:
+        await reminder_scheduler.stop()
+    
+    if settings.call_reconciler_enabled:
+        await call_reconciler.stop()
+    
+    if settings.overdue_marker_enabled:
+        await overdue_marker.stop()
+    
+    await close_http_client()
+    await close_twilio_http_client()
+    await async_engine.dispose()
 
 
 # Include routers
@@ -53,6 +137,12 @@ app.include_router(bills_router)
 app.include_router(calls_router)
 app.include_router(payments_router)
 app.include_router(vapi_webhooks_router)
+app.include_router(campaigns_router)
+app.include_router(call_jobs_router)
+app.include_router(sms_blasts_router)
+app.include_router(twilio_webhooks_router)
+app.include_router(exports_router)
+app.include_router(stats_router)
 
 
 @app.get("/")
@@ -1,6 +1,15 @@
 from app.models.bill import Bill, BillStatus
 from app.models.call_log import CallLog, CallStatus, CallOutcome
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
+from app.models.call_job import CallJob, CallJobStatus
+from app.models.idempotency_key import IdempotencyKey
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus, WebhookPartitionLease
+from app.models.transcript_segment import TranscriptSegment
+from app.models.sms_delivery import SmsDelivery
+from app.models.sms_blast import SmsBlast, SmsBlastStatus, SmsBlastRecipient, SmsRecipientStatus
+from app.models.stats_counter import StatsCounter
+from app.models.call_lease import CallLease
+from app.models.worker_lease import WorkerLease
 
 __all__ = [
     "Bill",
@@ -11,4 +20,19 @@ __all__ = [
     "Payment",
     "PaymentStatus",
     "PaymentMethod",
+    "CallJob",
+    "CallJobStatus",
+    "IdempotencyKey",
+    "WebhookEvent",
+    "WebhookEventStatus",
+    "WebhookPartitionLease",
+    "TranscriptSegment",
+    "SmsDelivery",
+    "SmsBlast",
+    "SmsBlastStatus",
+    "SmsBlastRecipient",
+    "SmsRecipientStatus",
+    "StatsCounter",
+    "CallLease",
+    "WorkerLease",
 ]
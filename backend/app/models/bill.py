@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -34,9 +34,17 @@ class Bill(Base):
     
     call_attempts = Column(Integer, default=0)
     last_call_date = Column(DateTime, nullable=True)
-    next_reminder_date = Column(DateTime, nullable=True)
+    next_reminder_date = Column(DateTime, nullable=True, index=True)
+    priority_score = Column(Float, nullable=True, index=True)  # dial order; NULL when not dialable
+    dialing_until = Column(DateTime, nullable=True)  # set while one process is dialing the bill
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     notes = Column(String, nullable=True)
+    
+    __table_args__ = (
+        # Keyset pagination of the bill listings
+        Index("ix_bills_created_at_id", "created_at", "id"),
+        Index("ix_bills_due_date_id", "due_date", "id"),
+    )
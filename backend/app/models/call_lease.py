@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+
+class CallLease(Base):
+    """One concurrent call slot, shared by every process that places calls"""
+    __tablename__ = "call_leases"
+    
+    pool = Column(String, primary_key=True)  # "calls", or "number:<VAPI phone number ID>"
+    slot = Column(Integer, primary_key=True)
+    
+    # Empty while the slot is free; the call ID is bound once VAPI accepts the call
+    lease_key = Column(String, nullable=True, index=True)
+    call_id = Column(String, nullable=True, index=True)
+    acquired_at = Column(DateTime, nullable=True)
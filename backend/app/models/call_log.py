@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum, Text
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -14,6 +14,15 @@ class CallStatus(str, enum.Enum):
     BUSY = "busy"
 
 
+# Statuses after which the call no longer occupies a line
+TERMINAL_CALL_STATUSES = {
+    CallStatus.COMPLETED,
+    CallStatus.FAILED,
+    CallStatus.NO_ANSWER,
+    CallStatus.BUSY,
+}
+
+
 class CallOutcome(str, enum.Enum):
     PAYMENT_CONFIRMED = "payment_confirmed"
     PAYMENT_PROMISED = "payment_promised"
@@ -30,7 +39,8 @@ class CallLog(Base):
     bill_id = Column(Integer, ForeignKey("bills.id"), nullable=False, index=True)
     
     vapi_call_id = Column(String, nullable=True, unique=True, index=True)
-    customer_phone = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False, index=True)
+    phone_number_id = Column(String, nullable=True, index=True)  # outbound VAPI number
     
     status = Column(SQLEnum(CallStatus), default=CallStatus.INITIATED, index=True)
     outcome = Column(SQLEnum(CallOutcome), nullable=True)
@@ -49,3 +59,10 @@ class CallLog(Base):
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Used by the reconciler to find calls stuck in a non-terminal status
+        Index("ix_call_logs_status_created_at", "status", "created_at"),
+        # Keyset pagination of GET /api/calls
+        Index("ix_call_logs_created_at_id", "created_at", "id"),
+    )
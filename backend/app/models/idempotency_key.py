@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False)
+    scope = Column(String, nullable=False)  # e.g. "POST /api/bills/1/call"
+    request_hash = Column(String, nullable=False)
+    
+    # NULL while the original request is still being processed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("key", "scope", name="uq_idempotency_keys_key_scope"),
+    )
@@ -0,0 +1,77 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class SmsBlastStatus(str, enum.Enum):
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class SmsRecipientStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class SmsBlast(Base):
+    """A bulk reminder SMS job over all overdue bills"""
+    __tablename__ = "sms_blasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=True)
+    status = Column(SQLEnum(SmsBlastStatus), default=SmsBlastStatus.RUNNING, nullable=False)
+
+    messages_per_second = Column(Float, nullable=False)
+    messaging_service_sid = Column(String, nullable=True)
+
+    # Overdue bills are read in ID order; recipients exist for every bill up to here
+    last_bill_id = Column(Integer, default=0, nullable=False)
+    snapshot_complete = Column(Integer, default=0, nullable=False)
+
+    total = Column(Integer, default=0, nullable=False)
+    sent = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    last_error = Column(String, nullable=True)
+
+    # Process running the blast and when it last made progress
+    owner = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.sent - self.failed - self.skipped, 0)
+
+    @property
+    def eta_seconds(self) -> float:
+        """Time left at the blast's send rate"""
+        return self.remaining / self.messages_per_second
+
+
+class SmsBlastRecipient(Base):
+    """One reminder of a blast and its delivery result"""
+    __tablename__ = "sms_blast_recipients"
+
+    id = Column(Integer, primary_key=True, index=True)
+    blast_id = Column(Integer, ForeignKey("sms_blasts.id"), nullable=False)
+    bill_id = Column(Integer, ForeignKey("bills.id"), nullable=False)
+    to_number = Column(String, nullable=False)
+
+    status = Column(SQLEnum(SmsRecipientStatus), default=SmsRecipientStatus.PENDING, nullable=False)
+    sms_sid = Column(String, nullable=True)
+    error_message = Column(String, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("blast_id", "bill_id", name="uq_sms_blast_recipients_blast_bill"),
+        Index("ix_sms_blast_recipients_blast_status", "blast_id", "status"),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Order of Twilio message statuses; callbacks can arrive out of order, so a
+# status never replaces one that is further along
+SMS_STATUS_RANKS = {
+    "accepted": 0,
+    "scheduled": 0,
+    "queued": 1,
+    "sending": 2,
+    "sent": 3,
+    "delivered": 4,
+    "undelivered": 4,
+    "failed": 4,
+    "canceled": 4,
+    "read": 5,
+}
+
+
+class SmsDelivery(Base):
+    """Latest delivery status Twilio reported for a message"""
+    __tablename__ = "sms_deliveries"
+    
+    sid = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    status_rank = Column(Integer, nullable=False)
+    error_code = Column(Integer, nullable=True)
+    
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class StatsCounter(Base):
+    """Running count (and bill amount) of rows per bill status, call status or call outcome"""
+    __tablename__ = "stats_counters"
+    
+    kind = Column(String, primary_key=True)  # bill_status, call_status or call_outcome
+    name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class TranscriptSegment(Base):
+    """One final utterance of a call transcript"""
+    __tablename__ = "transcript_segments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    call_log_id = Column(Integer, ForeignKey("call_logs.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # order within the call
+    role = Column(String, nullable=True)
+    text = Column(Text, nullable=False)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("call_log_id", "seq", name="uq_transcript_segments_call_log_seq"),
+    )
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, Text, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class WebhookEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+class WebhookEvent(Base):
+    """VAPI webhook event waiting to be applied by the owner of its partition"""
+    __tablename__ = "webhook_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    call_id = Column(String, nullable=True)
+    partition = Column(Integer, nullable=False)
+    event_type = Column(String, nullable=True)
+    payload = Column(Text, nullable=False)  # raw event JSON
+    
+    status = Column(SQLEnum(WebhookEventStatus), default=WebhookEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String, nullable=True)
+    
+    received_at = Column(DateTime, server_default=func.now())
+    processed_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Each partition worker reads its pending events in arrival order
+        Index("ix_webhook_events_partition_status_id", "partition", "status", "id"),
+    )
+
+
+class WebhookPartitionLease(Base):
+    """Which worker process currently applies the events of a partition"""
+    __tablename__ = "webhook_partition_leases"
+    
+    partition = Column(Integer, primary_key=True)
+    owner = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class WorkerLease(Base):
+    """Which process currently runs a background job that must run in one place only"""
+    __tablename__ = "worker_leases"
+    
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
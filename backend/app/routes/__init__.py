@@ -2,10 +2,22 @@ from app.routes.bills import router as bills_router
 from app.routes.calls import router as calls_router
 from app.routes.payments import router as payments_router
 from app.routes.vapi_webhooks import router as vapi_webhooks_router
+from app.routes.campaigns import router as campaigns_router
+from app.routes.call_jobs import router as call_jobs_router
+from app.routes.sms_blasts import router as sms_blasts_router
+from app.routes.twilio_webhooks import router as twilio_webhooks_router
+from app.routes.exports import router as exports_router
+from app.routes.stats import router as stats_router
 
 __all__ = [
     "bills_router",
     "calls_router",
     "payments_router",
     "vapi_webhooks_router",
+    "campaigns_router",
+    "call_jobs_router",
+    "sms_blasts_router",
+    "twilio_webhooks_router",
+    "exports_router",
+    "stats_router",
 ]
@@ -1,54 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.bill import BillCreate, BillUpdate, BillResponse, BillListResponse
-from app.schemas.call import VapiCallRequest
-from app.services.bill_service import BillService
-from app.services.vapi_service import VapiService
-from app.models.bill import BillStatus, Bill
-from app.models.call_log import CallLog, CallStatus
-from typing import Optional
+from app.database import get_db, get_async_db
+from app.schemas.bill import BillCreate, BillUpdate, BillResponse, BillListResponse, PriorityBillResponse, PriorityBillListResponse, BillImportResult
+from app.services.bill_service import BillService, AsyncBillService
+from app.services.call_service import CallService, CallAlreadyActive
+from app.services.call_limiter import CallLimitExceeded
+from app.services.call_job_service import CallJobService, call_job_worker
+from app.services.idempotency_service import IdempotencyService, IdempotencyConflict
+from app.services.dial_priority import DialPriorityService
+from app.services.bill_import import import_bills, detect_format
+from app.services.stats_service import StatsService
+from app.models.bill import BillStatus
+from app.models.idempotency_key import IdempotencyKey
+from datetime import datetime
+from typing import Any, Optional, Tuple
+import io
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/bills", tags=["Bills"])
 
-vapi_service = VapiService()
+
+def begin_idempotent_request(
+    db: Session,
+    idempotency_key: Optional[str],
+    request: Request,
+    payload: Any
+) -> Tuple[Optional[IdempotencyKey], Optional[JSONResponse]]:
+    """Reserve an Idempotency-Key, or return the stored response of an earlier request"""
+    if not idempotency_key:
+        return None, None
+    
+    try:
+        record, stored = IdempotencyService.begin(
+            db,
+            idempotency_key,
+            scope=f"POST {request.url.path}",
+            request_hash=IdempotencyService.hash_request(payload)
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    if stored:
+        status_code, body = stored
+        return None, JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+    
+    return record, None
 
 
 @router.post("/", response_model=BillResponse)
-def create_bill(bill: BillCreate, db: Session = Depends(get_db)):
+def create_bill(
+    bill: BillCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db)
+):
     """Create a new bill"""
+    record, replay = begin_idempotent_request(db, idempotency_key, request, bill.model_dump(mode="json"))
+    if replay:
+        return replay
+    
     try:
-        # Check if bill already exists
-        existing = BillService.get_bill_by_number(db, bill.bill_number)
-        if existing:
-            raise HTTPException(status_code=400, detail="Bill number already exists")
+        # Unique constraints reject duplicates atomically, unlike a lookup before insert
+        try:
+            new_bill = BillService.create_bill(db, bill)
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Bill number or consumer number already exists")
         
-        new_bill = BillService.create_bill(db, bill)
+        if record:
+            body = BillResponse.model_validate(new_bill).model_dump(mode="json")
+            IdempotencyService.complete(db, record, 200, body)
         return new_bill
         
-    except HTTPException:
-        raise
     except Exception as e:
+        if record:
+            IdempotencyService.abandon(db, record)
+        if isinstance(e, HTTPException):
+            raise
         logger.error(f"Error creating bill: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk", response_model=BillImportResult)
+def bulk_import_bills(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON with one bill per line"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name when omitted"),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many bills from a CSV or NDJSON upload, matched by bill_number
+    
+    The upload is spooled to disk and read a chunk at a time, so files of any
+    size can be loaded. Invalid rows are reported and skipped.
+    """
+    try:
+        fmt = format or detect_format(file.filename, file.content_type)
+        text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        return import_bills(db, text, fmt)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing bills: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/", response_model=BillListResponse)
 def get_bills(
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Deprecated, use cursor"),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[BillStatus] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get list of bills with optional filtering"""
+    """Get a page of bills, newest first, with optional filtering"""
     try:
-        bills = BillService.get_bills(db, skip=skip, limit=limit, status=status)
-        total = db.query(Bill).count()
+        bills, next_cursor = BillService.get_bills(db, limit=limit, status=status, cursor=cursor, skip=skip)
+        total = StatsService.count_bills(db, status=status)
         
-        return BillListResponse(total=total, bills=bills)
+        return BillListResponse(total=total, bills=bills, next_cursor=next_cursor)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching bills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,10 +165,26 @@ def delete_bill(bill_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{bill_id}/call")
-async def initiate_call(bill_id: int, db: Session = Depends(get_db)):
-    """Initiate a call for a specific bill"""
+async def initiate_call(
+    bill_id: int,
+    response: Response,
+    request: Request,
+    wait: bool = Query(True, description="Wait for VAPI to accept the call; false returns 202 with a job ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Initiate a call for a specific bill
+    
+    Runs on the async session: services shared with the background workers
+    run through db.run_sync, and no connection is held while VAPI dials.
+    """
+    record, replay = await db.run_sync(begin_idempotent_request, idempotency_key, request, {"wait": wait})
+    if replay:
+        return replay
+    
     try:
-        bill = BillService.get_bill(db, bill_id)
+        bill = await AsyncBillService.get_bill(db, bill_id)
         
         if not bill:
             raise HTTPException(status_code=404, detail="Bill not found")
@@ -99,79 +192,119 @@ async def initiate_call(bill_id: int, db: Session = Depends(get_db)):
         if bill.status == BillStatus.PAID:
             raise HTTPException(status_code=400, detail="Bill already paid")
         
-        # Format date with ordinal suffix (1st, 2nd, 3rd, etc.)
-        def get_ordinal_suffix(day):
-            if 10 <= day % 100 <= 20:
-                suffix = 'th'
+        status_code = 200
+        try:
+            if not wait:
+                await db.run_sync(CallService.check_no_active_call, bill.id)
+                
+                # Record the intent and let the call job worker talk to VAPI
+                job = await db.run_sync(
+                    lambda session: CallJobService.enqueue(session, bill.id, customer_phone=bill.customer_phone)
+                )
+                call_job_worker.notify()
+                
+                status_code = 202
+                body = {
+                    "message": "Call queued",
+                    "job_id": job.id,
+                    "call_log_id": job.call_log_id,
+                    "bill_id": bill.id,
+                    "status_url": f"/api/jobs/{job.id}"
+                }
             else:
-                suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
-            return suffix
-        
-        day = bill.due_date.day
-        ordinal_day = f"{day}{get_ordinal_suffix(day)}"
-        formatted_date = bill.due_date.strftime(f"{ordinal_day} %B %Y")
-        
-        # Prepare bill data for VAPI
-        bill_data = {
-            "customer_name": bill.customer_name,
-            "bill_amount": bill.bill_amount,
-            "due_date": formatted_date,  # e.g., "1st June 2025"
-            "consumer_number": bill.consumer_number,
-            "bill_number": bill.bill_number,
-            "payment_link": bill.payment_link
-        }
-        
-        # Initiate call via VAPI
-        call_response = await vapi_service.initiate_call(
-            phone_number=bill.customer_phone,
-            bill_data=bill_data
-        )
+                call_log = await CallService.place_call(db, bill)
+                body = {
+                    "message": "Call initiated successfully",
+                    "call_id": call_log.vapi_call_id,
+                    "bill_id": bill.id
+                }
         
-        # Create call log
-        call_log = CallLog(
-            bill_id=bill.id,
-            vapi_call_id=call_response.get("id"),
-            customer_phone=bill.customer_phone,
-            status=CallStatus.INITIATED
-        )
-        
-        db.add(call_log)
-        db.commit()
+        except CallAlreadyActive as e:
+            # A double-click or retry joins the call already placed instead of dialing again
+            logger.info(f"Duplicate call request for bill {bill_id} joined call {e.vapi_call_id}")
+            body = {
+                "message": "Call already in progress",
+                "call_id": e.vapi_call_id,
+                "bill_id": bill.id
+            }
         
-        logger.info(f"Call initiated for bill {bill.bill_number}, Call ID: {call_response.get('id')}")
+        if record:
+            await db.run_sync(IdempotencyService.complete, record, status_code, body)
         
-        return {
-            "message": "Call initiated successfully",
-            "call_id": call_response.get("id"),
-            "bill_id": bill.id
-        }
+        response.status_code = status_code
+        return body
         
-    except HTTPException:
-        raise
     except Exception as e:
+        if record:
+            await db.run_sync(IdempotencyService.abandon, record)
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, CallLimitExceeded):
+            logger.warning(f"Call capacity unavailable for bill {bill_id}: {str(e)}")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
         logger.error(f"Error initiating call: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/pending/list")
-def get_pending_bills(db: Session = Depends(get_db)):
-    """Get all pending bills that need to be called"""
+@router.get("/pending/list", response_model=BillListResponse)
+def get_pending_bills(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(False, description="Count the whole list; a full scan"),
+    db: Session = Depends(get_db)
+):
+    """Get a page of pending bills that need to be called, earliest due first"""
     try:
-        bills = BillService.get_pending_bills(db)
-        return {"total": len(bills), "bills": bills}
+        bills, next_cursor = BillService.get_pending_bills(db, limit=limit, cursor=cursor)
+        total = BillService.count_pending_bills(db) if include_total else None
+        
+        return BillListResponse(total=total, bills=bills, next_cursor=next_cursor)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching pending bills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/overdue/list")
-def get_overdue_bills(db: Session = Depends(get_db)):
-    """Get all overdue bills"""
+@router.get("/priority/list", response_model=PriorityBillListResponse)
+def get_priority_bills(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get pending bills in the order the dialer should call them"""
     try:
-        bills = BillService.get_overdue_bills(db)
-        return {"total": len(bills), "bills": bills}
+        bills = BillService.get_priority_bills(db, limit=limit)
+        now = datetime.utcnow()
+        
+        ranked = []
+        for bill in bills:
+            item = PriorityBillResponse.model_validate(bill)
+            item.priority_score = DialPriorityService.current_score(bill.priority_score, now)
+            ranked.append(item)
+        
+        return PriorityBillListResponse(total=len(ranked), bills=ranked)
+        
+    except Exception as e:
+        logger.error(f"Error fetching priority bills: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/overdue/list", response_model=BillListResponse)
+def get_overdue_bills(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a page of overdue bills, longest overdue first"""
+    try:
+        bills, next_cursor = BillService.get_overdue_bills(db, limit=limit, cursor=cursor)
+        total = StatsService.count_bills(db, status=BillStatus.OVERDUE)
+        
+        return BillListResponse(total=total, bills=bills, next_cursor=next_cursor)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching overdue bills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
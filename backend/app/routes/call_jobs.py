@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.call_job import CallJobCreate, CallJobResponse, CallJobStats
+from app.services.call_job_service import CallJobService
+from app.services.bill_service import BillService
+from app.models.call_job import CallJobStatus
+from typing import Optional, List
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/jobs", tags=["Call Jobs"])
+
+
+@router.post("/calls", response_model=List[CallJobResponse])
+def enqueue_calls(jobs: CallJobCreate, db: Session = Depends(get_db)):
+    """Queue calls for bills; bills with an active job keep their existing job"""
+    try:
+        queued = []
+        for bill_id in jobs.bill_ids:
+            if not BillService.get_bill(db, bill_id):
+                raise HTTPException(status_code=404, detail=f"Bill {bill_id} not found")
+            queued.append(CallJobService.enqueue(db, bill_id, run_at=jobs.run_at))
+        
+        return queued
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing calls: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/", response_model=List[CallJobResponse])
+def get_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[CallJobStatus] = None,
+    ids: Optional[List[int]] = Query(None, max_length=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Get call jobs with optional status filtering (status=dead for the dead-letter list);
+    pass ids to track many queued calls at once, unknown IDs are omitted
+    """
+    return CallJobService.get_jobs(db, status=status, skip=skip, limit=limit, job_ids=ids)
+
+
+@router.get("/stats", response_model=CallJobStats)
+def get_job_stats(db: Session = Depends(get_db)):
+    """Get the number of call jobs in each status"""
+    return CallJobService.get_stats(db)
+
+
+@router.get("/{job_id}", response_model=CallJobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Get progress of a call queued with POST /api/bills/{bill_id}/call?wait=false"""
+    job = CallJobService.get_job(db, job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@router.post("/{job_id}/requeue", response_model=CallJobResponse)
+def requeue_job(job_id: int, db: Session = Depends(get_db)):
+    """Retry a dead-lettered job with a fresh set of attempts"""
+    try:
+        job = CallJobService.requeue_dead_job(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
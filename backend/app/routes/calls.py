@@ -1,7 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.call import CallLogResponse
+from sqlalchemy import func
+from app.schemas.call import (
+    CallLogResponse,
+    CallLimiterStats,
+    PhoneNumberStats,
+    ReconcileResult,
+    SmsDeliveryStatusRequest,
+    SmsDeliveryStatusResponse,
+)
+from app.services.call_reconciler import call_reconciler
+from app.services.transcript_service import TranscriptService
+from app.services.sms_delivery_service import SmsDeliveryService
+from app.services.call_limiter import call_limiter
+from app.utils.pagination import keyset_paginate, get_page
+from app.services.phone_number_pool import phone_number_pool
 from app.models.call_log import CallLog, CallStatus
 from typing import Optional, List
 import logging
@@ -12,13 +26,15 @@ router = APIRouter(prefix="/api/calls", tags=["Calls"])
 
 @router.get("/", response_model=List[CallLogResponse])
 def get_call_logs(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated, use cursor"),
     limit: int = Query(100, ge=1, le=1000),
     bill_id: Optional[int] = None,
     status: Optional[CallStatus] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get call logs with optional filtering"""
+    """Get a page of call logs, newest first; the next page's cursor is in X-Next-Cursor"""
     try:
         query = db.query(CallLog)
         
@@ -28,15 +44,93 @@ def get_call_logs(
         if status:
             query = query.filter(CallLog.status == status)
         
-        call_logs = query.order_by(CallLog.created_at.desc()).offset(skip).limit(limit).all()
+        query = keyset_paginate(query, CallLog.created_at, CallLog.id, cursor, descending=True)
+        if skip and not cursor:
+            query = query.offset(skip)
+        
+        call_logs, next_cursor = get_page(query.limit(limit + 1).all(), limit, "created_at")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         return call_logs
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching call logs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/limiter", response_model=CallLimiterStats)
+def get_call_limiter_stats(db: Session = Depends(get_db)):
+    """Get outbound call limiter queue depth and wait times"""
+    return call_limiter.get_stats(db)
+
+
+@router.get("/numbers", response_model=List[PhoneNumberStats])
+def get_phone_number_stats(db: Session = Depends(get_db)):
+    """Get live load and historical answer rate for each outbound phone number"""
+    try:
+        # A call counts as answered once it reached in-progress (started_at set)
+        rows = db.query(
+            CallLog.phone_number_id,
+            func.count(CallLog.id),
+            func.count(CallLog.started_at)
+        ).filter(CallLog.phone_number_id.isnot(None)).group_by(CallLog.phone_number_id).all()
+        history = {number_id: (total, answered) for number_id, total, answered in rows}
+        
+        live_calls = phone_number_pool.get_live_calls(db)
+        stats = []
+        for number_id in sorted(set(live_calls) | set(history)):
+            total, answered = history.get(number_id, (0, 0))
+            stats.append(PhoneNumberStats(
+                phone_number_id=number_id,
+                live_calls=live_calls.get(number_id, 0),
+                max_calls=phone_number_pool.max_calls_per_number or None,
+                total_calls=total,
+                answered_calls=answered,
+                answer_rate=answered / total if total else 0.0
+            ))
+        
+        return stats
+        
+    except Exception as e:
+        logger.error(f"Error fetching phone number stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reconcile", response_model=ReconcileResult)
+async def reconcile_calls():
+    """Fetch the real state of calls stuck in initiated/ringing from VAPI and apply it"""
+    try:
+        return await call_reconciler.reconcile()
+        
+    except Exception as e:
+        logger.error(f"Error reconciling calls: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sms-status", response_model=List[SmsDeliveryStatusResponse])
+def get_sms_statuses(request: SmsDeliveryStatusRequest, db: Session = Depends(get_db)):
+    """Get the payment link SMS delivery status of many calls at once; unknown call log IDs are omitted"""
+    try:
+        return [
+            SmsDeliveryStatusResponse(
+                call_log_id=call_log_id,
+                sms_sid=sms_sid,
+                sms_status=status,
+                error_code=error_code,
+                updated_at=updated_at
+            )
+            for call_log_id, sms_sid, status, error_code, updated_at
+            in SmsDeliveryService.get_for_call_logs(db, request.call_log_ids)
+        ]
+        
+    except Exception as e:
+        logger.error(f"Error fetching SMS statuses: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{call_log_id}", response_model=CallLogResponse)
 def get_call_log(call_log_id: int, db: Session = Depends(get_db)):
     """Get specific call log by ID"""
@@ -45,7 +139,9 @@ def get_call_log(call_log_id: int, db: Session = Depends(get_db)):
     if not call_log:
         raise HTTPException(status_code=404, detail="Call log not found")
     
-    return call_log
+    response = CallLogResponse.model_validate(call_log)
+    response.transcript = TranscriptService.get_transcript(db, call_log)
+    return response
 
 
 @router.get("/vapi/{vapi_call_id}", response_model=CallLogResponse)
@@ -56,4 +152,6 @@ def get_call_log_by_vapi_id(vapi_call_id: str, db: Session = Depends(get_db)):
     if not call_log:
         raise HTTPException(status_code=404, detail="Call log not found")
     
-    return call_log
+    response = CallLogResponse.model_validate(call_log)
+    response.transcript = TranscriptService.get_transcript(db, call_log)
+    return response
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.schemas.campaign import CampaignCreate, CampaignResponse
+from app.services.campaign_service import campaign_manager
+from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/campaigns", tags=["Campaigns"])
+
+
+@router.post("/", response_model=CampaignResponse)
+async def create_campaign(campaign: CampaignCreate, db: AsyncSession = Depends(get_async_db)):
+    """Start a server-side dialing campaign for all pending bills"""
+    try:
+        return await campaign_manager.create_campaign(
+            db,
+            name=campaign.name,
+            concurrency=campaign.concurrency,
+            max_calls=campaign.max_calls
+        )
+        
+    except Exception as e:
+        logger.error(f"Error creating campaign: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/", response_model=List[CampaignResponse])
+def get_campaigns():
+    """Get all campaigns with their progress"""
+    return campaign_manager.list_campaigns()
+
+
+@router.get("/{campaign_id}", response_model=CampaignResponse)
+def get_campaign(campaign_id: str):
+    """Get campaign progress by ID"""
+    campaign = campaign_manager.get_campaign(campaign_id)
+    
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    return campaign
+
+
+@router.post("/{campaign_id}/pause", response_model=CampaignResponse)
+async def pause_campaign(campaign_id: str):
+    """Pause a running campaign"""
+    try:
+        campaign = campaign_manager.pause_campaign(campaign_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    return campaign
+
+
+@router.post("/{campaign_id}/resume", response_model=CampaignResponse)
+async def resume_campaign(campaign_id: str):
+    """Resume a paused campaign"""
+    try:
+        campaign = campaign_manager.resume_campaign(campaign_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    return campaign
+
+
+@router.post("/{campaign_id}/cancel", response_model=CampaignResponse)
+async def cancel_campaign(campaign_id: str):
+    """Cancel a campaign"""
+    try:
+        campaign = campaign_manager.cancel_campaign(campaign_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    return campaign
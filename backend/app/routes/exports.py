@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from app.services.export_service import stream_export, get_export_filename, EXPORT_FORMATS
+from app.models.bill import BillStatus
+from app.models.call_log import CallStatus
+from app.models.payment import PaymentStatus
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/exports", tags=["Exports"])
+
+FORMAT_QUERY = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson")
+SINCE_QUERY = Query(None, description="Only rows created at or after this UTC time")
+UNTIL_QUERY = Query(None, description="Only rows created before this UTC time")
+
+
+def export_response(
+    name: str,
+    format: str,
+    status: Optional[Enum],
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> StreamingResponse:
+    """Stream an export as a file download"""
+    return StreamingResponse(
+        stream_export(name, format, status=status, since=since, until=until),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{get_export_filename(name, format)}"'}
+    )
+
+
+@router.get("/bills")
+def export_bills(
+    format: str = FORMAT_QUERY,
+    status: Optional[BillStatus] = None,
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY
+):
+    """Download all matching bills in one response"""
+    return export_response("bills", format, status, since, until)
+
+
+@router.get("/calls")
+def export_call_logs(
+    format: str = FORMAT_QUERY,
+    status: Optional[CallStatus] = None,
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY
+):
+    """Download all matching call logs in one response"""
+    return export_response("calls", format, status, since, until)
+
+
+@router.get("/payments")
+def export_payments(
+    format: str = FORMAT_QUERY,
+    status: Optional[PaymentStatus] = None,
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY
+):
+    """Download all matching payments in one response"""
+    return export_response("payments", format, status, since, until)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.schemas.payment import PaymentCallbackRequest, PaymentResponse
-from app.services.payment_service import PaymentService
-from app.services.bill_service import BillService
+from app.services.payment_service import PaymentService, AsyncPaymentService
+from app.services.bill_service import AsyncBillService
 from app.services.twilio_service import TwilioService
 from app.models.payment import PaymentStatus
 import logging
@@ -17,7 +18,7 @@ twilio_service = TwilioService()
 @router.post("/callback")
 async def payment_callback(
     callback_data: PaymentCallbackRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Handle payment gateway callback
@@ -28,7 +29,7 @@ async def payment_callback(
         logger.info(f"Payment callback received: {callback_data.payment_id}")
         
         # Process the payment callback
-        payment = PaymentService.process_payment_callback(
+        payment = await AsyncPaymentService.process_payment_callback(
             db=db,
             payment_id=callback_data.payment_id,
             transaction_id=callback_data.transaction_id,
@@ -42,7 +43,7 @@ async def payment_callback(
         
         # If payment is completed, update bill and send thank you SMS
         if payment.status == PaymentStatus.COMPLETED:
-            bill = BillService.mark_bill_paid(
+            bill = await AsyncBillService.mark_bill_paid(
                 db=db,
                 bill_id=payment.bill_id,
                 payment_id=payment.payment_id,
@@ -51,7 +52,7 @@ async def payment_callback(
             
             if bill:
                 # Send thank you SMS
-                twilio_service.send_thank_you(
+                await twilio_service.send_thank_you(
                     to_number=bill.customer_phone,
                     bill_amount=bill.bill_amount
                 )
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import get_db, get_async_db
+from app.schemas.sms_blast import SmsBlastCreate, SmsBlastResponse, SmsBlastRecipientResponse
+from app.services.sms_blast_service import SmsBlastService, sms_blast_runner
+from app.models.sms_blast import SmsBlastStatus, SmsRecipientStatus
+from typing import Optional, List
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/sms-blasts", tags=["SMS Blasts"])
+
+
+@router.post("/", response_model=SmsBlastResponse)
+async def create_blast(blast_data: SmsBlastCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Send a reminder SMS to every overdue bill at a bounded rate
+
+    Database work runs through db.run_sync, so the event loop keeps serving
+    requests and sending other blasts while the overdue bills are counted.
+    """
+    try:
+        blast = await db.run_sync(
+            SmsBlastService.create_blast,
+            blast_data.name,
+            blast_data.messages_per_second,
+            blast_data.messaging_service_sid
+        )
+        await sms_blast_runner.resume(blast.id)
+
+        logger.info(f"SMS blast {blast.id} started for {blast.total} overdue bills")
+        await db.refresh(blast)
+        return blast
+
+    except Exception as e:
+        logger.error(f"Error starting SMS blast: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/", response_model=List[SmsBlastResponse])
+def get_blasts(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    """Get recent SMS blasts, newest first"""
+    return SmsBlastService.list_blasts(db, limit=limit)
+
+
+@router.get("/{blast_id}", response_model=SmsBlastResponse)
+def get_blast(blast_id: int, db: Session = Depends(get_db)):
+    """Get the progress of an SMS blast"""
+    blast = SmsBlastService.get_blast(db, blast_id)
+
+    if not blast:
+        raise HTTPException(status_code=404, detail="SMS blast not found")
+
+    return blast
+
+
+@router.get("/{blast_id}/recipients", response_model=List[SmsBlastRecipientResponse])
+def get_blast_recipients(
+    blast_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[SmsRecipientStatus] = None,
+    db: Session = Depends(get_db)
+):
+    """Get per-recipient results of an SMS blast (status=failed for the failures)"""
+    if not SmsBlastService.get_blast(db, blast_id):
+        raise HTTPException(status_code=404, detail="SMS blast not found")
+
+    return SmsBlastService.get_recipients(db, blast_id, status=status, skip=skip, limit=limit)
+
+
+async def _change_status(db: AsyncSession, blast_id: int, status: SmsBlastStatus):
+    try:
+        blast = await db.run_sync(SmsBlastService.set_status, blast_id, status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not blast:
+        raise HTTPException(status_code=404, detail="SMS blast not found")
+
+    return blast
+
+
+@router.post("/{blast_id}/pause", response_model=SmsBlastResponse)
+async def pause_blast(blast_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Stop sending; in-flight messages finish and the blast can be resumed"""
+    blast = await _change_status(db, blast_id, SmsBlastStatus.PAUSED)
+    sms_blast_runner.stop_sending(blast_id)
+    return blast
+
+
+@router.post("/{blast_id}/resume", response_model=SmsBlastResponse)
+async def resume_blast(blast_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Continue a paused blast from its pending recipients"""
+    blast = await _change_status(db, blast_id, SmsBlastStatus.RUNNING)
+    await sms_blast_runner.resume(blast_id)
+    await db.refresh(blast)
+    return blast
+
+
+@router.post("/{blast_id}/cancel", response_model=SmsBlastResponse)
+async def cancel_blast(blast_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Stop a blast for good"""
+    blast = await _change_status(db, blast_id, SmsBlastStatus.CANCELLED)
+    sms_blast_runner.stop_sending(blast_id)
+    return blast
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.stats import StatsResponse
+from app.services.stats_service import StatsService
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/stats", tags=["Stats"])
+
+
+@router.get("/", response_model=StatsResponse)
+def get_stats(db: Session = Depends(get_db)):
+    """Get bill counts and amounts by status, collection rate and call counts"""
+    try:
+        return StatsService.get_stats(db)
+        
+    except Exception as e:
+        logger.error(f"Error fetching stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rebuild", response_model=StatsResponse)
+def rebuild_stats(db: Session = Depends(get_db)):
+    """Recount the stats from the bills and call logs tables"""
+    try:
+        StatsService.rebuild(db)
+        return StatsService.get_stats(db)
+        
+    except Exception as e:
+        logger.error(f"Error rebuilding stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.services.sms_delivery_service import SmsDeliveryService
+from app.services.twilio_service import get_status_callback_url, validate_twilio_signature
+from app.config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+router = APIRouter(prefix="/api/webhooks/twilio", tags=["Twilio Webhooks"])
+
+
+@router.post("/sms-status")
+async def handle_sms_status(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Handle Twilio message status callbacks
+    
+    Twilio posts here (form-encoded) each time a message sent with a
+    StatusCallback changes status. The status is stored through
+    db.run_sync, so the event loop is not blocked on the database.
+    """
+    form = await request.form()
+    params = {key: str(value) for key, value in form.items()}
+    
+    if settings.twilio_validate_signature and not validate_twilio_signature(
+        get_status_callback_url(), params, request.headers.get("X-Twilio-Signature", "")
+    ):
+        raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+    
+    sid = params.get("MessageSid")
+    status = params.get("MessageStatus")
+    if not sid or not status:
+        raise HTTPException(status_code=400, detail="MessageSid and MessageStatus are required")
+    
+    try:
+        error_code = int(params["ErrorCode"]) if params.get("ErrorCode") else None
+        await db.run_sync(SmsDeliveryService.record_status, sid, status, error_code)
+        return {"status": "ok"}
+        
+    except Exception as e:
+        logger.error(f"Error recording SMS status for {sid}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
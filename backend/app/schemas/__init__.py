@@ -1,10 +1,31 @@
-from app.schemas.bill import BillCreate, BillUpdate, BillResponse, BillListResponse
+from app.schemas.bill import (
+    BillCreate,
+    BillUpdate,
+    BillResponse,
+    BillListResponse,
+    PriorityBillResponse,
+    PriorityBillListResponse,
+    BillImportError,
+    BillImportResult,
+)
 from app.schemas.call import (
     CallLogCreate,
     CallLogUpdate,
     CallLogResponse,
     VapiWebhookEvent,
     VapiCallRequest,
+    CallLimiterStats,
+    PhoneNumberStats,
+    ReconcileResult,
+    SmsDeliveryStatusRequest,
+    SmsDeliveryStatusResponse,
+    ActiveCallCacheStats,
+    WebhookJournalStats,
+    WebhookCommitWriterStats,
+    WebhookQueueStats,
+    ToolLatencyBucket,
+    ToolLatencyStats,
+    WebhookPartitionStats,
 )
 from app.schemas.payment import (
     PaymentCreate,
@@ -12,19 +33,48 @@ from app.schemas.payment import (
     PaymentResponse,
     PaymentCallbackRequest,
 )
+from app.schemas.campaign import CampaignCreate, CampaignResponse
+from app.schemas.call_job import CallJobCreate, CallJobResponse, CallJobStats
+from app.schemas.sms_blast import SmsBlastCreate, SmsBlastResponse, SmsBlastRecipientResponse
+from app.schemas.stats import StatsResponse
 
 __all__ = [
     "BillCreate",
     "BillUpdate",
     "BillResponse",
     "BillListResponse",
+    "PriorityBillResponse",
+    "PriorityBillListResponse",
+    "BillImportError",
+    "BillImportResult",
     "CallLogCreate",
     "CallLogUpdate",
     "CallLogResponse",
     "VapiWebhookEvent",
     "VapiCallRequest",
+    "CallLimiterStats",
+    "PhoneNumberStats",
+    "ReconcileResult",
+    "SmsDeliveryStatusRequest",
+    "SmsDeliveryStatusResponse",
+    "ActiveCallCacheStats",
+    "WebhookJournalStats",
+    "WebhookCommitWriterStats",
+    "WebhookQueueStats",
+    "ToolLatencyBucket",
+    "ToolLatencyStats",
+    "WebhookPartitionStats",
     "PaymentCreate",
     "PaymentUpdate",
     "PaymentResponse",
     "PaymentCallbackRequest",
+    "CampaignCreate",
+    "CampaignResponse",
+    "CallJobCreate",
+    "CallJobResponse",
+    "CallJobStats",
+    "SmsBlastCreate",
+    "SmsBlastResponse",
+    "SmsBlastRecipientResponse",
+    "StatsResponse",
 ]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 from app.models.bill import BillStatus
@@ -46,6 +46,32 @@ class BillResponse(BillBase):
         from_attributes = True
 
 
+class PriorityBillResponse(BillResponse):
+    priority_score: Optional[float] = None  # log(expected rupees per dialer minute) + overdue boost
+
+
 class BillListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # None when the endpoint's total is opt-in and not requested
     bills: list[BillResponse]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
+
+
+class PriorityBillListResponse(BaseModel):
+    total: int
+    bills: list[PriorityBillResponse]
+
+
+class BillImportError(BaseModel):
+    row: int
+    bill_number: Optional[str] = None
+    error: str
+
+
+class BillImportResult(BaseModel):
+    """Summary of a bulk import; errors stop being listed after BILL_IMPORT_MAX_ERRORS"""
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: list[BillImportError]
+    errors_truncated: bool
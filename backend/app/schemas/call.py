@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from app.models.call_log import CallStatus, CallOutcome
 
 
@@ -29,6 +29,7 @@ class CallLogUpdate(BaseModel):
 class CallLogResponse(CallLogBase):
     id: int
     vapi_call_id: Optional[str] = None
+    phone_number_id: Optional[str] = None
     status: CallStatus
     outcome: Optional[CallOutcome] = None
     started_at: Optional[datetime] = None
@@ -61,3 +62,128 @@ class VapiCallRequest(BaseModel):
     phone_number: str
     bill_id: int
     assistant_id: Optional[str] = None
+
+
+class SmsDeliveryStatusRequest(BaseModel):
+    call_log_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class SmsDeliveryStatusResponse(BaseModel):
+    """Delivery status of a call's payment link SMS; None until Twilio reports it"""
+    call_log_id: int
+    sms_sid: Optional[str] = None
+    sms_status: Optional[str] = None
+    error_code: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+
+class PhoneNumberStats(BaseModel):
+    """Load and answer rate of an outbound phone number"""
+    phone_number_id: str
+    live_calls: int
+    max_calls: Optional[int] = None
+    total_calls: int
+    answered_calls: int
+    answer_rate: float
+
+
+class ReconcileResult(BaseModel):
+    """Outcome of a reconciliation pass over stale calls"""
+    checked: int
+    repaired: int
+    errors: int
+
+
+class ActiveCallCacheStats(BaseModel):
+    """Size and hit rate of the live call cache"""
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class WebhookJournalStats(BaseModel):
+    """Raw webhook journal writer state"""
+    running: bool
+    recorded: int
+    dropped: int
+    queue_depth: int
+    segment: Optional[str] = None
+
+
+class WebhookCommitWriterStats(BaseModel):
+    """Group-commit batching of webhook events"""
+    running: bool
+    queue_depth: int
+    events: int
+    batches: int
+    avg_batch_size: float
+    failed: int
+    retried_batches: int
+    avg_commit_seconds: float
+
+
+class WebhookQueueStats(BaseModel):
+    """Webhook ingestion queue depth, counters and lag"""
+    mode: str
+    running: bool
+    consumers: int
+    queue_depth: int
+    shard_depths: List[int]
+    enqueued: int
+    processed: int
+    failed: int
+    rejected: int
+    avg_lag_seconds: float
+    p95_lag_seconds: float
+    max_lag_seconds: float
+    avg_process_seconds: float
+    active_call_cache: ActiveCallCacheStats
+    journal: WebhookJournalStats
+    commit_writer: WebhookCommitWriterStats
+
+
+class ToolLatencyBucket(BaseModel):
+    """Tool calls that finished within le_ms (None = slower than every bound)"""
+    le_ms: Optional[int] = None
+    count: int
+
+
+class ToolLatencyStats(BaseModel):
+    """Latency histogram and counters of an assistant tool"""
+    name: str
+    budget_ms: int
+    timeout_ms: int
+    calls: int
+    errors: int
+    timeouts: int
+    over_budget: int
+    avg_ms: float
+    p50_ms: Optional[int] = None
+    p95_ms: Optional[int] = None
+    max_ms: float
+    buckets: List[ToolLatencyBucket]
+
+
+class WebhookPartitionStats(BaseModel):
+    """Lease owner and backlog of one webhook partition"""
+    partition: int
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    pending: int
+    failed: int
+    oldest_pending_seconds: float
+
+
+class CallLimiterStats(BaseModel):
+    """Outbound call limiter queue and wait statistics"""
+    live_calls: int
+    max_concurrent_calls: int
+    calls_per_second: float
+    queue_depth: int
+    admitted: int
+    rejected: int
+    avg_wait_seconds: float
+    p95_wait_seconds: float
+    max_wait_seconds: float
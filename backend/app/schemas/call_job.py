@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from app.models.call_job import CallJobStatus
+
+
+class CallJobCreate(BaseModel):
+    bill_ids: List[int] = Field(..., min_length=1)
+    run_at: Optional[datetime] = None
+
+
+class CallJobResponse(BaseModel):
+    id: int
+    bill_id: int
+    status: CallJobStatus
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    locked_by: Optional[str] = None
+    call_log_id: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class CallJobStats(BaseModel):
+    queued: int
+    running: int
+    succeeded: int
+    cancelled: int
+    dead: int
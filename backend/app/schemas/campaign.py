@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+import enum
+
+
+class CampaignStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+
+class CampaignCreate(BaseModel):
+    name: Optional[str] = None
+    concurrency: Optional[int] = Field(None, ge=1)
+    max_calls: Optional[int] = Field(None, ge=1)
+
+
+class CampaignResponse(BaseModel):
+    id: str
+    name: Optional[str] = None
+    status: CampaignStatus
+    concurrency: int
+    total: int
+    dialed: int
+    succeeded: int
+    failed: int
+    skipped: int
+    remaining: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
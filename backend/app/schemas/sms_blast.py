@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+from app.models.sms_blast import SmsBlastStatus, SmsRecipientStatus
+
+
+class SmsBlastCreate(BaseModel):
+    name: Optional[str] = None
+    messages_per_second: Optional[float] = Field(None, gt=0)
+    messaging_service_sid: Optional[str] = None
+
+
+class SmsBlastResponse(BaseModel):
+    id: int
+    name: Optional[str] = None
+    status: SmsBlastStatus
+    messages_per_second: float
+    messaging_service_sid: Optional[str] = None
+    total: int
+    sent: int
+    failed: int
+    skipped: int
+    remaining: int
+    eta_seconds: float
+    last_error: Optional[str] = None
+    owner: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SmsBlastRecipientResponse(BaseModel):
+    id: int
+    bill_id: int
+    to_number: str
+    status: SmsRecipientStatus
+    sms_sid: Optional[str] = None
+    error_message: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class StatusTotal(BaseModel):
+    count: int
+    amount: float
+
+
+class BillStats(BaseModel):
+    total: int
+    total_amount: float
+    by_status: Dict[str, StatusTotal]
+
+
+class CallStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_outcome: Dict[str, int]
+
+
+class StatsResponse(BaseModel):
+    bills: BillStats
+    collection_rate: float  # % of bills paid
+    amount_collection_rate: float  # % of the billed amount paid
+    calls: CallStats
@@ -2,10 +2,53 @@ from app.services.vapi_service import VapiService
 from app.services.twilio_service import TwilioService
 from app.services.bill_service import BillService
 from app.services.payment_service import PaymentService
+from app.services.call_service import CallService
+from app.services.campaign_service import CampaignManager, campaign_manager
+from app.services.call_job_service import CallJobService, CallJobWorker, call_job_worker
+from app.services.reminder_scheduler import ReminderScheduler, reminder_scheduler
+from app.services.call_reconciler import CallReconciler, call_reconciler
+from app.services.dial_priority import DialPriorityService
+from app.services.transcript_service import TranscriptService
+from app.services.webhook_queue import WebhookEventQueue, webhook_queue
+from app.services.webhook_partitions import WebhookEventStore, WebhookPartitionWorker, webhook_partition_worker
+from app.services.webhook_journal import WebhookJournal, webhook_journal
+from app.services.webhook_writer import WebhookCommitWriter, webhook_commit_writer
+from app.services.call_tools import ToolDispatcher, tool_dispatcher
+from app.services.sms_delivery_service import SmsDeliveryService
+from app.services.sms_blast_service import SmsBlastService, SmsBlastRunner, sms_blast_runner
+from app.services.stats_service import StatsService
 
 __all__ = [
     "VapiService",
     "TwilioService",
     "BillService",
     "PaymentService",
+    "CallService",
+    "CampaignManager",
+    "campaign_manager",
+    "CallJobService",
+    "CallJobWorker",
+    "call_job_worker",
+    "ReminderScheduler",
+    "reminder_scheduler",
+    "CallReconciler",
+    "call_reconciler",
+    "DialPriorityService",
+    "TranscriptService",
+    "WebhookEventQueue",
+    "webhook_queue",
+    "WebhookEventStore",
+    "WebhookPartitionWorker",
+    "webhook_partition_worker",
+    "WebhookJournal",
+    "webhook_journal",
+    "WebhookCommitWriter",
+    "webhook_commit_writer",
+    "ToolDispatcher",
+    "tool_dispatcher",
+    "SmsDeliveryService",
+    "SmsBlastService",
+    "SmsBlastRunner",
+    "sms_blast_runner",
+    "StatsService",
 ]
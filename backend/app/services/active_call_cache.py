@@ -0,0 +1,117 @@
+from app.models.bill import Bill
+from app.models.call_log import CallLog, CallOutcome
+from app.config import get_settings
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+import threading
+import time
+
+settings = get_settings()
+
+
+class ActiveCall:
+    """What webhook handlers need to know about a live call, without reading the database"""
+
+    __slots__ = (
+        "call_log_id", "vapi_call_id", "bill_id", "customer_phone", "customer_name",
+        "bill_number", "bill_amount", "due_date", "payment_link",
+        "started_at", "outcome", "callback_at", "transcript_seq", "ended"
+    )
+
+    def __init__(self, call_log: CallLog, bill: Bill, transcript_seq: int = 0):
+        self.call_log_id = call_log.id
+        self.vapi_call_id = call_log.vapi_call_id
+        self.bill_id = bill.id
+        self.customer_phone = bill.customer_phone
+        self.customer_name = bill.customer_name
+        self.bill_number = bill.bill_number
+        self.bill_amount = bill.bill_amount
+        self.due_date: datetime = bill.due_date
+        self.payment_link = bill.payment_link
+        self.started_at: Optional[datetime] = call_log.started_at
+        self.outcome = call_log.outcome
+        # Reminder time the customer asked for, kept when the call ends
+        self.callback_at: Optional[datetime] = (
+            bill.next_reminder_date if call_log.outcome == CallOutcome.CALLBACK_REQUESTED else None
+        )
+        self.transcript_seq = transcript_seq
+        # The end-of-call report has been applied; only loaded calls can be ended
+        self.ended = call_log.ended_at is not None
+
+
+class ActiveCallCache:
+    """
+    Bounded LRU of live calls keyed by VAPI call ID.
+
+    Filled when a call is placed and dropped at end of call; entries also
+    expire after ttl seconds so calls whose report never arrives do not
+    linger. Handlers update the cached fields they change (started_at,
+    outcome, callback_at, transcript_seq) so later events of the call need
+    no reads. Handlers run in worker threads, so the entries are guarded
+    by a lock.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, vapi_call_id: Optional[str]) -> Optional[ActiveCall]:
+        """Cached call, or None if unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(vapi_call_id) if vapi_call_id else None
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[vapi_call_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(vapi_call_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, call: ActiveCall):
+        """Cache a live call, evicting the least recently used entry when full"""
+        if not call.vapi_call_id or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[call.vapi_call_id] = (call, time.monotonic() + self.ttl)
+            self._entries.move_to_end(call.vapi_call_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, vapi_call_id: Optional[str]):
+        """Drop a call that has ended"""
+        if vapi_call_id:
+            with self._lock:
+                self._entries.pop(vapi_call_id, None)
+
+    def latest(self) -> Optional[ActiveCall]:
+        """Most recently placed or used live call"""
+        now = time.monotonic()
+        with self._lock:
+            for call, expires_at in reversed(self._entries.values()):
+                if expires_at >= now:
+                    return call
+        return None
+
+    def get_stats(self) -> dict:
+        """Size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+active_call_cache = ActiveCallCache(
+    max_size=settings.active_call_cache_size,
+    ttl=settings.max_call_duration + settings.vapi_call_lease_grace
+)
@@ -0,0 +1,236 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.models.bill import Bill, BillStatus
+from app.schemas.bill import BillCreate
+from app.services.dial_priority import DialPriorityService
+from app.services.stats_service import StatsService, BILL_STATUS, add_delta
+from app.config import get_settings
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+import csv
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Columns a re-imported bill_number overwrites; status, payment and call
+# history of an existing bill are kept
+UPSERT_COLUMNS = (
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "consumer_number",
+    "bill_amount",
+    "due_date",
+    "billing_period",
+)
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """csv or ndjson, from the file extension or content type"""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(file: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    (row number, raw row) pairs read one at a time from an upload
+
+    CSV row 1 is the first record after the header; NDJSON rows are line
+    numbers. A line that is not valid JSON is yielded as its error message.
+    """
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(file), start=1):
+            # Empty cells are missing optional fields, not empty strings
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+
+    for row_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, f"Invalid JSON: {e.msg}"
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+
+class BillImport:
+    """
+    Upserts bills by bill_number from a stream of rows.
+
+    Rows are validated against BillCreate and written a chunk at a time,
+    with an INSERT ... ON CONFLICT (bill_number) DO NOTHING statement for
+    new bills, one DO UPDATE statement for the rest, and a commit, so
+    memory use depends on the chunk size, not the upload. New
+    bills get a payment link; existing bills keep their link, status and
+    payment. If a chunk violates another constraint (a consumer number
+    used by a different bill), it is split in halves until only the
+    offending rows fail.
+    """
+
+    def __init__(self, db: Session, chunk_size: int, max_errors: int):
+        self.db = db
+        self.chunk_size = max(chunk_size, 1)
+        self.max_errors = max_errors
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def run(self, rows: Iterator[Tuple[int, Any]]) -> dict:
+        """Import every row and return the summary with per-row errors"""
+        chunk: Dict[str, Tuple[int, dict]] = {}
+        for row_number, raw in rows:
+            self.received += 1
+            if isinstance(raw, str):
+                self._error(row_number, None, raw)
+                continue
+            if not isinstance(raw, dict):
+                self._error(row_number, None, "Row must be an object")
+                continue
+
+            try:
+                bill = BillCreate.model_validate(raw)
+            except ValidationError as e:
+                self._error(row_number, raw.get("bill_number"), format_validation_error(e))
+                continue
+
+            if bill.bill_number in chunk:
+                earlier = chunk.pop(bill.bill_number)[0]
+                self._error(earlier, bill.bill_number, f"Replaced by row {row_number} with the same bill_number")
+            chunk[bill.bill_number] = (row_number, bill.model_dump())
+
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk)
+                chunk = {}
+
+        if chunk:
+            self._write_chunk(chunk)
+
+        return self.get_result()
+
+    def get_result(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _error(self, row_number: int, bill_number: Optional[str], message: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "bill_number": bill_number, "error": message})
+
+    def _write_chunk(self, chunk: Dict[str, Tuple[int, dict]]):
+        self._write_rows(list(chunk.values()))
+
+    def _write_rows(self, rows: List[Tuple[int, dict]]):
+        try:
+            self._upsert([values for _, values in rows])
+            return
+        except IntegrityError:
+            self.db.rollback()
+
+        if len(rows) == 1:
+            row_number, values = rows[0]
+            self._error(row_number, values["bill_number"], "Consumer number already belongs to another bill")
+            return
+
+        # Halve the rows until the offending ones are isolated
+        middle = len(rows) // 2
+        self._write_rows(rows[:middle])
+        self._write_rows(rows[middle:])
+
+    def _upsert(self, rows: List[dict]):
+        db = self.db
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        values = [
+            dict(
+                row,
+                payment_link=f"{settings.payment_gateway_url}/pay/{uuid.uuid4().hex}",
+                status=BillStatus.PENDING,
+                call_attempts=0
+            )
+            for row in rows
+        ]
+
+        # New bills first. RETURNING names exactly the rows this statement
+        # inserted, even with another import of the same bills running; it
+        # is sent as multi-row VALUES batches on both Postgres and SQLite
+        stmt = insert(Bill.__table__).on_conflict_do_nothing(index_elements=[Bill.bill_number])
+        inserted = set(db.execute(stmt.returning(Bill.bill_number), values).scalars())
+
+        # The others already exist. They are locked before they are read, so
+        # the stats deltas are taken from the values this upsert replaces
+        values = [row for row in values if row["bill_number"] not in inserted]
+        existing = {}
+        if values:
+            existing = {
+                bill.bill_number: bill
+                for bill in db.query(Bill.bill_number, Bill.status, Bill.bill_amount).filter(
+                    Bill.bill_number.in_([row["bill_number"] for row in values])
+                ).with_for_update()
+            }
+            stmt = insert(Bill.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Bill.bill_number],
+                set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()}
+            )
+            db.execute(stmt, values)
+
+        # New and changed bills are ranked for the dialer like BillService does one at a time
+        bill_numbers = [row["bill_number"] for row in rows]
+        bill_ids = [bill_id for (bill_id,) in db.query(Bill.id).filter(Bill.bill_number.in_(bill_numbers))]
+        DialPriorityService.refresh_many(db, bill_ids)
+
+        # The upsert bypasses the session, so the stats counters are moved
+        # here; a bill deleted between the two statements was inserted again
+        deltas = {}
+        for row in rows:
+            bill = existing.get(row["bill_number"])
+            if bill:
+                add_delta(deltas, BILL_STATUS, bill.status, 0, row["bill_amount"] - bill.bill_amount)
+            else:
+                add_delta(deltas, BILL_STATUS, BillStatus.PENDING, 1, row["bill_amount"])
+        StatsService.apply(db, deltas)
+        db.commit()
+
+        self.inserted += len(rows) - len(existing)
+        self.updated += len(existing)
+
+
+def import_bills(db: Session, file: TextIO, fmt: str) -> dict:
+    """Upsert the bills of a CSV or NDJSON file, streaming it a chunk at a time"""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}', expected one of {', '.join(IMPORT_FORMATS)}")
+
+    result = BillImport(
+        db,
+        chunk_size=settings.bill_import_chunk_size,
+        max_errors=settings.bill_import_max_errors
+    ).run(iter_rows(file, fmt))
+
+    logger.info(
+        f"Bill import: {result['received']} rows, {result['inserted']} inserted, "
+        f"{result['updated']} updated, {result['failed']} failed"
+    )
+    return result
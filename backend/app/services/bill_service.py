@@ -1,9 +1,15 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.bill import Bill, BillStatus
 from app.schemas.bill import BillCreate, BillUpdate
+from app.services.reminder_scheduler import CLOSED_BILL_STATUSES, reminder_scheduler
+from app.services.dial_priority import DialPriorityService
+from app.services.stats_service import StatsService
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.config import get_settings
+from app.utils.pagination import keyset_paginate, get_page
 import uuid
 
 settings = get_settings()
@@ -25,6 +31,7 @@ class BillService:
         )
         
         db.add(bill)
+        DialPriorityService.refresh(db, bill)
         db.commit()
         db.refresh(bill)
         return bill
@@ -42,17 +49,22 @@ class BillService:
     @staticmethod
     def get_bills(
         db: Session,
-        skip: int = 0,
         limit: int = 100,
-        status: Optional[BillStatus] = None
-    ) -> List[Bill]:
-        """Get list of bills with optional filtering"""
+        status: Optional[BillStatus] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[List[Bill], Optional[str]]:
+        """Get a page of bills, newest first, and the cursor of the next page"""
         query = db.query(Bill)
         
         if status:
             query = query.filter(Bill.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        query = keyset_paginate(query, Bill.created_at, Bill.id, cursor, descending=True)
+        if skip and not cursor:
+            query = query.offset(skip)
+        
+        return get_page(query.limit(limit + 1).all(), limit, "created_at")
     
     @staticmethod
     def update_bill(db: Session, bill_id: int, bill_update: BillUpdate) -> Optional[Bill]:
@@ -66,29 +78,55 @@ class BillService:
         for field, value in update_data.items():
             setattr(bill, field, value)
         
+        DialPriorityService.refresh(db, bill)
         db.commit()
         db.refresh(bill)
+        
+        if bill.status in (BillStatus.PAID, BillStatus.CANCELLED):
+            reminder_scheduler.discard(bill.id)
+        
         return bill
     
     @staticmethod
-    def mark_bill_called(db: Session, bill_id: int) -> Optional[Bill]:
-        """Mark bill as called and increment call attempts"""
+    def mark_bill_called(
+        db: Session,
+        bill_id: int,
+        commit: bool = True,
+        next_reminder_date: Optional[datetime] = None
+    ) -> Optional[Bill]:
+        """
+        Mark bill as called and increment call attempts
+        
+        Args:
+            commit: False leaves the commit to the caller
+            next_reminder_date: Time of the next reminder (default: after reminder_interval_hours)
+        """
         bill = db.query(Bill).filter(Bill.id == bill_id).first()
         
         if not bill:
             return None
         
+        # A late or replayed end-of-call must not reopen a paid or cancelled bill
+        if bill.status in CLOSED_BILL_STATUSES:
+            return bill
+        
         bill.status = BillStatus.CALLED
         bill.call_attempts += 1
         bill.last_call_date = datetime.utcnow()
         
         # Set next reminder date
-        bill.next_reminder_date = datetime.utcnow() + timedelta(
+        bill.next_reminder_date = next_reminder_date or datetime.utcnow() + timedelta(
             hours=settings.reminder_interval_hours
         )
         
-        db.commit()
-        db.refresh(bill)
+        DialPriorityService.refresh(db, bill)
+        if commit:
+            db.commit()
+            db.refresh(bill)
+        else:
+            db.flush()
+        
+        reminder_scheduler.schedule(bill.id, bill.next_reminder_date)
         return bill
     
     @staticmethod
@@ -107,35 +145,88 @@ class BillService:
         bill.status = BillStatus.PAID
         bill.payment_id = payment_id
         bill.payment_date = payment_date
+        bill.priority_score = None
         
         db.commit()
         db.refresh(bill)
+        
+        reminder_scheduler.discard(bill.id)
         return bill
     
     @staticmethod
-    def get_pending_bills(db: Session) -> List[Bill]:
-        """Get all pending bills that need to be called"""
+    def get_pending_bills(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Bill], Optional[str]]:
+        """Get a page of pending bills that need to be called, earliest due first"""
+        query = db.query(Bill).filter(
+            Bill.status.in_([BillStatus.PENDING, BillStatus.OVERDUE]),
+            Bill.call_attempts < settings.call_retry_attempts
+        )
+        query = keyset_paginate(query, Bill.due_date, Bill.id, cursor)
+        
+        return get_page(query.limit(limit + 1).all(), limit, "due_date")
+    
+    @staticmethod
+    def count_pending_bills(db: Session) -> int:
+        """Full count of the pending list; callers ask for it explicitly"""
         return db.query(Bill).filter(
             Bill.status.in_([BillStatus.PENDING, BillStatus.OVERDUE]),
             Bill.call_attempts < settings.call_retry_attempts
-        ).all()
+        ).count()
+    
+    @staticmethod
+    def get_priority_bills(db: Session, limit: Optional[int] = None) -> List[Bill]:
+        """Get pending bills in dial order, highest expected collection per minute first"""
+        return DialPriorityService.get_dial_list(db, limit=limit)
     
     @staticmethod
-    def get_overdue_bills(db: Session) -> List[Bill]:
-        """Get bills that are overdue"""
+    def mark_overdue_bills(db: Session, batch_size: int = 1000) -> int:
+        """Set the status of unpaid bills past their due date to overdue, a batch at a time"""
         now = datetime.utcnow()
-        bills = db.query(Bill).filter(
-            Bill.due_date < now,
-            Bill.status != BillStatus.PAID
-        ).all()
+        marked = 0
+        last_id = 0
         
-        # Update status to overdue
-        for bill in bills:
-            if bill.status != BillStatus.OVERDUE:
-                bill.status = BillStatus.OVERDUE
+        while True:
+            bills = db.query(Bill.id, Bill.status, Bill.bill_amount).filter(
+                Bill.id > last_id,
+                Bill.due_date < now,
+                Bill.status.notin_([BillStatus.PAID, BillStatus.OVERDUE])
+            ).order_by(Bill.id).limit(batch_size).all()
+            
+            if not bills:
+                return marked
+            bill_ids = [bill.id for bill in bills]
+            last_id = bill_ids[-1]
+            
+            db.execute(
+                update(Bill).where(Bill.id.in_(bill_ids)).values(status=BillStatus.OVERDUE),
+                execution_options={"synchronize_session": False}
+            )
+            StatsService.apply(db, StatsService.bill_status_deltas(
+                ((bill.status, bill.bill_amount) for bill in bills), BillStatus.OVERDUE
+            ))
+            DialPriorityService.refresh_many(db, bill_ids)
+            db.commit()
+            marked += len(bill_ids)
+    
+    @staticmethod
+    def get_overdue_bills(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Bill], Optional[str]]:
+        """
+        Get a page of overdue bills, longest overdue first
+
+        Lists bills the overdue marker has already marked, so the page
+        matches the overdue counter in stats_counters.
+        """
+        query = db.query(Bill).filter(Bill.status == BillStatus.OVERDUE)
+        query = keyset_paginate(query, Bill.due_date, Bill.id, cursor)
         
-        db.commit()
-        return bills
+        return get_page(query.limit(limit + 1).all(), limit, "due_date")
     
     @staticmethod
     def delete_bill(db: Session, bill_id: int) -> bool:
@@ -147,4 +238,90 @@ class BillService:
         
         db.delete(bill)
         db.commit()
+        
+        reminder_scheduler.discard(bill_id)
         return True
+
+
+class AsyncBillService:
+    """BillService for async routes, on an AsyncSession"""
+    
+    @staticmethod
+    async def get_bill(db: AsyncSession, bill_id: int) -> Optional[Bill]:
+        """Get bill by ID"""
+        return await db.get(Bill, bill_id)
+    
+    @staticmethod
+    async def get_bill_by_number(db: AsyncSession, bill_number: str) -> Optional[Bill]:
+        """Get bill by bill number"""
+        return await db.scalar(select(Bill).where(Bill.bill_number == bill_number).limit(1))
+    
+    @staticmethod
+    async def get_bills(
+        db: AsyncSession,
+        limit: int = 100,
+        status: Optional[BillStatus] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Bill], Optional[str]]:
+        """Get a page of bills, newest first, and the cursor of the next page"""
+        query = select(Bill)
+        
+        if status:
+            query = query.where(Bill.status == status)
+        
+        query = keyset_paginate(query, Bill.created_at, Bill.id, cursor, descending=True)
+        return get_page(list(await db.scalars(query.limit(limit + 1))), limit, "created_at")
+    
+    @staticmethod
+    async def mark_bill_called(
+        db: AsyncSession,
+        bill_id: int,
+        next_reminder_date: Optional[datetime] = None
+    ) -> Optional[Bill]:
+        """Mark bill as called and increment call attempts"""
+        bill = await db.get(Bill, bill_id)
+        
+        if not bill:
+            return None
+        
+        # A late or replayed end-of-call must not reopen a paid or cancelled bill
+        if bill.status in CLOSED_BILL_STATUSES:
+            return bill
+        
+        bill.status = BillStatus.CALLED
+        bill.call_attempts += 1
+        bill.last_call_date = datetime.utcnow()
+        bill.next_reminder_date = next_reminder_date or datetime.utcnow() + timedelta(
+            hours=settings.reminder_interval_hours
+        )
+        
+        await db.run_sync(DialPriorityService.refresh, bill)
+        await db.commit()
+        await db.refresh(bill)
+        
+        reminder_scheduler.schedule(bill.id, bill.next_reminder_date)
+        return bill
+    
+    @staticmethod
+    async def mark_bill_paid(
+        db: AsyncSession,
+        bill_id: int,
+        payment_id: str,
+        payment_date: datetime
+    ) -> Optional[Bill]:
+        """Mark bill as paid"""
+        bill = await db.get(Bill, bill_id)
+        
+        if not bill:
+            return None
+        
+        bill.status = BillStatus.PAID
+        bill.payment_id = payment_id
+        bill.payment_date = payment_date
+        bill.priority_score = None
+        
+        await db.commit()
+        await db.refresh(bill)
+        
+        reminder_scheduler.discard(bill.id)
+        return bill
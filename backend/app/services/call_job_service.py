@@ -0,0 +1,434 @@
+from sqlalchemy import update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import AsyncSessionLocal, run_in_session
+from app.models.bill import BillStatus
+from app.models.call_job import CallJob, CallJobStatus
+from app.models.call_log import CallLog, CallStatus
+from app.services.bill_service import BillService
+from app.services.call_service import CallService, CallAlreadyActive
+from app.services.call_limiter import CallLimitExceeded
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CallJobService:
+    """Service for the durable call initiation job queue"""
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        bill_id: int,
+        run_at: Optional[datetime] = None,
+        customer_phone: Optional[str] = None
+    ) -> CallJob:
+        """
+        Queue a call for a bill; returns the existing job if one is already active
+
+        When customer_phone is given, a pending call log is recorded with the
+        job so clients can follow the call before VAPI has been contacted.
+        """
+        existing = CallJobService.get_active_job(db, bill_id)
+        if existing:
+            return existing
+
+        job = CallJob(
+            bill_id=bill_id,
+            active_bill_id=bill_id,
+            status=CallJobStatus.QUEUED,
+            max_attempts=settings.call_retry_attempts,
+            run_at=run_at or datetime.utcnow()
+        )
+
+        if customer_phone:
+            call_log = CallLog(
+                bill_id=bill_id,
+                customer_phone=customer_phone,
+                status=CallStatus.INITIATED
+            )
+            db.add(call_log)
+            db.flush()
+            job.call_log_id = call_log.id
+
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request queued the same bill concurrently
+            db.rollback()
+            return CallJobService.get_active_job(db, bill_id)
+
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[CallJob]:
+        """Get job by ID"""
+        return db.query(CallJob).filter(CallJob.id == job_id).first()
+
+    @staticmethod
+    def get_active_job(db: Session, bill_id: int) -> Optional[CallJob]:
+        """Get the queued or running job for a bill"""
+        return db.query(CallJob).filter(CallJob.active_bill_id == bill_id).first()
+
+    @staticmethod
+    def _fail_call_log(db: Session, job: CallJob, error: str):
+        # Close out the pending call log of a job that will not dial again
+        if job.call_log_id:
+            call_log = db.query(CallLog).filter(CallLog.id == job.call_log_id).first()
+            if call_log and not call_log.vapi_call_id:
+                call_log.status = CallStatus.FAILED
+                call_log.error_message = error
+
+    @staticmethod
+    def get_jobs(
+        db: Session,
+        status: Optional[CallJobStatus] = None,
+        skip: int = 0,
+        limit: int = 100,
+        job_ids: Optional[List[int]] = None
+    ) -> List[CallJob]:
+        """Get jobs with optional status and ID filtering"""
+        query = db.query(CallJob)
+
+        if status:
+            query = query.filter(CallJob.status == status)
+        if job_ids:
+            query = query.filter(CallJob.id.in_(job_ids))
+
+        return query.order_by(CallJob.id.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def claim_jobs(db: Session, worker_id: str, limit: int) -> List[CallJob]:
+        """
+        Claim due jobs for a worker
+
+        Postgres uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers
+        never see the same rows. SQLite has no row locks, but it serializes
+        writers, so a conditional UPDATE on status acts as compare-and-set.
+        """
+        now = datetime.utcnow()
+        query = db.query(CallJob).filter(
+            CallJob.status == CallJobStatus.QUEUED,
+            CallJob.run_at <= now
+        ).order_by(CallJob.run_at).limit(limit)
+
+        if db.bind.dialect.name == "postgresql":
+            jobs = query.with_for_update(skip_locked=True).all()
+            for job in jobs:
+                job.status = CallJobStatus.RUNNING
+                job.locked_by = worker_id
+                job.locked_at = now
+                job.attempts += 1
+            db.commit()
+            return jobs
+
+        claimed_ids = []
+        for (job_id,) in query.with_entities(CallJob.id).all():
+            result = db.execute(
+                update(CallJob)
+                .where(CallJob.id == job_id, CallJob.status == CallJobStatus.QUEUED)
+                .values(
+                    status=CallJobStatus.RUNNING,
+                    locked_by=worker_id,
+                    locked_at=now,
+                    attempts=CallJob.attempts + 1
+                )
+            )
+            if result.rowcount == 1:
+                claimed_ids.append(job_id)
+        db.commit()
+
+        if not claimed_ids:
+            return []
+        return db.query(CallJob).filter(CallJob.id.in_(claimed_ids)).all()
+
+    @staticmethod
+    def hold_job(
+        db: Session,
+        job_id: int,
+        worker_id: str,
+        attempt: int,
+        locked_before: Optional[datetime] = None
+    ) -> Optional[CallJob]:
+        """
+        Lock a running job for the worker that claimed it, until the next commit
+
+        The attempt number the claim set is the fencing token: once a job is
+        requeued and claimed again, the earlier claimant no longer matches.
+        The conditional UPDATE takes the row's write lock, so a finisher and
+        the stale job check cannot both act on the same claim.
+
+        Returns:
+            The job, or None if the claim is no longer current
+        """
+        conditions = [
+            CallJob.id == job_id,
+            CallJob.status == CallJobStatus.RUNNING,
+            CallJob.locked_by == worker_id,
+            CallJob.attempts == attempt
+        ]
+        if locked_before:
+            conditions.append(CallJob.locked_at < locked_before)
+
+        result = db.execute(update(CallJob).where(*conditions).values(locked_at=datetime.utcnow()))
+        if result.rowcount != 1:
+            return None
+        return CallJobService.get_job(db, job_id)
+
+    @staticmethod
+    def complete_job(db: Session, job: CallJob, call_log_id: Optional[int] = None) -> CallJob:
+        """Mark a job as succeeded"""
+        job.status = CallJobStatus.SUCCEEDED
+        job.active_bill_id = None
+        job.call_log_id = call_log_id
+        job.last_error = None
+        db.commit()
+        return job
+
+    @staticmethod
+    def cancel_job(db: Session, job: CallJob, reason: str) -> CallJob:
+        """Mark a job as cancelled without dialing"""
+        job.status = CallJobStatus.CANCELLED
+        job.active_bill_id = None
+        job.last_error = reason
+        CallJobService._fail_call_log(db, job, reason)
+        db.commit()
+        return job
+
+    @staticmethod
+    def fail_job(db: Session, job: CallJob, error: str, retry_delay: Optional[float] = None) -> CallJob:
+        """Schedule a retry with exponential backoff, or dead-letter the job"""
+        job.last_error = error
+        job.locked_by = None
+        job.locked_at = None
+
+        if retry_delay is None and job.attempts >= job.max_attempts:
+            job.status = CallJobStatus.DEAD
+            job.active_bill_id = None
+            CallJobService._fail_call_log(db, job, error)
+            logger.error(f"Call job {job.id} for bill {job.bill_id} dead-lettered: {error}")
+        else:
+            if retry_delay is None:
+                retry_delay = min(
+                    settings.call_job_backoff_seconds * 2 ** (job.attempts - 1),
+                    settings.call_job_backoff_max_seconds
+                )
+            job.status = CallJobStatus.QUEUED
+            job.run_at = datetime.utcnow() + timedelta(seconds=retry_delay)
+
+        db.commit()
+        return job
+
+    @staticmethod
+    def release_capacity_wait(db: Session, job: CallJob, error: str) -> CallJob:
+        """Put a job back without using up an attempt (call capacity was busy)"""
+        job.attempts -= 1
+        return CallJobService.fail_job(db, job, error, retry_delay=settings.call_job_poll_interval)
+
+    @staticmethod
+    def requeue_stale_jobs(db: Session) -> int:
+        """Return jobs held by workers that died mid-dial to the queue"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.call_job_lock_timeout)
+        stale = db.query(CallJob.id, CallJob.locked_by, CallJob.attempts).filter(
+            CallJob.status == CallJobStatus.RUNNING,
+            CallJob.locked_at < cutoff
+        ).all()
+
+        requeued = 0
+        for job_id, locked_by, attempt in stale:
+            # Skipped if the worker finished the job since it was read
+            job = CallJobService.hold_job(db, job_id, locked_by, attempt, locked_before=cutoff)
+            if not job:
+                db.rollback()
+                continue
+
+            logger.warning(f"Call job {job_id} held by {locked_by} timed out")
+            CallJobService.fail_job(db, job, f"Worker {locked_by} lock timed out")
+            requeued += 1
+
+        return requeued
+
+    @staticmethod
+    def requeue_dead_job(db: Session, job_id: int) -> Optional[CallJob]:
+        """Give a dead-lettered job a fresh set of attempts"""
+        job = CallJobService.get_job(db, job_id)
+
+        if not job:
+            return None
+
+        if job.status != CallJobStatus.DEAD:
+            raise ValueError(f"Cannot requeue a {job.status.value} job")
+
+        job.status = CallJobStatus.QUEUED
+        job.active_bill_id = job.bill_id
+        job.attempts = 0
+        job.run_at = datetime.utcnow()
+        
+        if job.call_log_id:
+            call_log = db.query(CallLog).filter(CallLog.id == job.call_log_id).first()
+            if call_log and not call_log.vapi_call_id:
+                call_log.status = CallStatus.INITIATED
+                call_log.error_message = None
+
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise ValueError("Bill already has an active call job")
+
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_stats(db: Session) -> dict:
+        """Count jobs by status"""
+        counts = dict(
+            db.query(CallJob.status, func.count(CallJob.id)).group_by(CallJob.status).all()
+        )
+        return {status.value: counts.get(status, 0) for status in CallJobStatus}
+
+
+class CallJobWorker:
+    """
+    Drains the call job queue; several processes may run one each
+
+    Database work runs in worker threads or through an AsyncSession, so the
+    event loop only waits on VAPI. A job's outcome is recorded only if the
+    claim that dialed it is still current (see CallJobService.hold_job).
+    """
+
+    def __init__(self, worker_id: Optional[str] = None, concurrency: Optional[int] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or settings.call_job_worker_concurrency
+        self._in_flight: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def notify(self):
+        """Wake the worker to claim newly queued jobs without waiting for the next poll"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the worker loop on the running event loop"""
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop claiming jobs and wait for in-flight dials to finish"""
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def run(self):
+        """Claim and execute jobs until stopped"""
+        logger.info(f"Call job worker {self.worker_id} started")
+        self._wakeup = asyncio.Event()
+        last_stale_check = 0.0
+        loop = asyncio.get_running_loop()
+
+        while not self._stopping:
+            claimed = 0
+            try:
+                if loop.time() - last_stale_check > settings.call_job_lock_timeout / 2:
+                    await asyncio.to_thread(run_in_session, CallJobService.requeue_stale_jobs)
+                    last_stale_check = loop.time()
+
+                free_slots = self.concurrency - len(self._in_flight)
+                if free_slots > 0:
+                    jobs = await asyncio.to_thread(run_in_session, self._claim, free_slots)
+                    claimed = len(jobs)
+                    for job_id, attempt in jobs:
+                        task = asyncio.create_task(self._execute(job_id, attempt))
+                        self._in_flight.add(task)
+                        task.add_done_callback(self._in_flight.discard)
+
+            except Exception as e:
+                logger.error(f"Call job worker {self.worker_id} error: {str(e)}")
+
+            if not claimed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.call_job_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(0)
+
+    def _claim(self, db: Session, limit: int) -> List[Tuple[int, int]]:
+        """Claim due jobs; returns (job ID, attempt) pairs"""
+        return [(job.id, job.attempts) for job in CallJobService.claim_jobs(db, self.worker_id, limit)]
+
+    def _start(self, db: Session, job_id: int, attempt: int):
+        """The job, bill and pending call log to dial, or None if there is nothing to dial"""
+        job = CallJobService.hold_job(db, job_id, self.worker_id, attempt)
+        if not job:
+            logger.warning(f"Call job {job_id} attempt {attempt} was requeued before it started")
+            return None
+
+        bill = BillService.get_bill(db, job.bill_id)
+        if not bill or bill.status in (BillStatus.PAID, BillStatus.CANCELLED):
+            CallJobService.cancel_job(db, job, "Bill no longer needs a call")
+            return None
+
+        call_log = None
+        if job.call_log_id:
+            call_log = db.query(CallLog).filter(CallLog.id == job.call_log_id).first()
+
+        db.commit()
+        return job, bill, call_log
+
+    def _finish(self, db: Session, job_id: int, attempt: int, finish, *args):
+        """Record a job's outcome with finish(db, job, *args) if this claim is still current"""
+        job = CallJobService.hold_job(db, job_id, self.worker_id, attempt)
+        if not job:
+            db.rollback()
+            logger.warning(f"Call job {job_id} attempt {attempt} was requeued while dialing; outcome dropped")
+            return
+        finish(db, job, *args)
+
+    async def _execute(self, job_id: int, attempt: int):
+        async with AsyncSessionLocal() as db:
+            try:
+                start = await db.run_sync(self._start, job_id, attempt)
+                if not start:
+                    return
+                job, bill, call_log = start
+
+                try:
+                    call_log = await CallService.place_call(db, bill, call_log)
+                except CallLimitExceeded as e:
+                    await db.rollback()
+                    await db.run_sync(self._finish, job_id, attempt, CallJobService.release_capacity_wait, str(e))
+                    return
+                except CallAlreadyActive:
+                    await db.rollback()
+                    await db.run_sync(self._finish, job_id, attempt, CallJobService.cancel_job, "Call already in progress")
+                    return
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"Call job {job_id} attempt {attempt} failed: {str(e)}")
+                    await db.run_sync(self._finish, job_id, attempt, CallJobService.fail_job, str(e))
+                    return
+
+                await db.run_sync(self._finish, job_id, attempt, CallJobService.complete_job, call_log.id)
+
+            except Exception as e:
+                logger.error(f"Call job {job_id} could not be processed: {str(e)}")
+
+
+call_job_worker = CallJobWorker()
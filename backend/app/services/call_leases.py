@@ -0,0 +1,97 @@
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.call_lease import CallLease
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CALLS_POOL = "calls"
+
+
+def number_pool(phone_number_id: str) -> str:
+    """Lease pool capping the live calls of one outbound phone number"""
+    return f"number:{phone_number_id}"
+
+
+class CallLeaseStore:
+    """
+    Concurrent call slots kept in the call_leases table.
+
+    Each pool has a fixed set of slot rows. A slot is taken with a
+    conditional UPDATE that only matches a free (or expired) slot, so API
+    processes and call workers never hand out the same slot twice, and a
+    call is released by whichever process receives its end webhook.
+    """
+
+    @staticmethod
+    def ensure_slots(db: Session, pool: str, count: int):
+        """Create the slot rows a pool has not got yet"""
+        existing = {slot for (slot,) in db.query(CallLease.slot).filter(CallLease.pool == pool).all()}
+        for slot in range(count):
+            if slot in existing:
+                continue
+            db.add(CallLease(pool=pool, slot=slot))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another process created it first
+                db.rollback()
+
+    @staticmethod
+    def acquire(db: Session, pool: str, count: int, lease_key: str, lease_seconds: float) -> bool:
+        """Take one of the first count slots of a pool; False if all are held"""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        # Calls whose end webhook was lost must not hold a slot forever
+        free = or_(CallLease.lease_key.is_(None), CallLease.acquired_at < cutoff)
+
+        candidates = db.query(CallLease.slot, CallLease.lease_key).filter(
+            CallLease.pool == pool,
+            CallLease.slot < count,
+            free
+        ).order_by(CallLease.slot).all()
+
+        for slot, previous in candidates:
+            result = db.execute(
+                update(CallLease)
+                .where(CallLease.pool == pool, CallLease.slot == slot, free)
+                .values(lease_key=lease_key, call_id=None, acquired_at=datetime.utcnow())
+            )
+            db.commit()
+            if result.rowcount == 1:
+                if previous:
+                    logger.warning(f"Call lease {previous} in {pool} expired without a terminal status")
+                return True
+            # Another process took it between the read and the update
+
+        return False
+
+    @staticmethod
+    def bind(db: Session, lease_key: str, call_id: Optional[str]):
+        """Record the VAPI call ID on every slot held by a lease key"""
+        if call_id:
+            db.execute(update(CallLease).where(CallLease.lease_key == lease_key).values(call_id=call_id))
+
+    @staticmethod
+    def release(db: Session, key: Optional[str]) -> int:
+        """Free every slot held by a lease key or VAPI call ID; returns how many"""
+        if not key:
+            return 0
+        result = db.execute(
+            update(CallLease)
+            .where(or_(CallLease.lease_key == key, CallLease.call_id == key))
+            .values(lease_key=None, call_id=None, acquired_at=None)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def count_live(db: Session, lease_seconds: float) -> Dict[str, int]:
+        """Held, unexpired slots per pool"""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        rows = db.query(CallLease.pool, func.count(CallLease.slot)).filter(
+            CallLease.lease_key.isnot(None),
+            CallLease.acquired_at >= cutoff
+        ).group_by(CallLease.pool).all()
+        return dict(rows)
@@ -0,0 +1,181 @@
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import SessionLocal, run_in_session
+from app.services.call_leases import CALLS_POOL, CallLeaseStore
+from collections import deque
+from typing import Optional
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CallLimitExceeded(Exception):
+    """Raised when a call could not get capacity within the allowed wait"""
+    pass
+
+
+class TokenBucket:
+    """Token bucket limiting how many calls may start per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, deadline: float):
+        """Take one token, waiting no later than the monotonic deadline"""
+        # The lock keeps waiters in arrival order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                if time.monotonic() + wait > deadline:
+                    raise CallLimitExceeded("Call rate limit exceeded")
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+
+
+class CallLimiter:
+    """
+    Governs outbound call starts: a token bucket caps calls per second and
+    slot rows in the call_leases table cap concurrent live calls across
+    every process that places calls. Leases are released by whichever
+    process's webhook handler sees the call reach a terminal status.
+
+    The token bucket is per process; the concurrent call cap is global.
+    """
+
+    def __init__(
+        self,
+        calls_per_second: float,
+        burst: int,
+        max_concurrent_calls: int,
+        max_wait: float,
+        lease_seconds: float
+    ):
+        self.bucket = TokenBucket(rate=calls_per_second, capacity=burst)
+        self.max_concurrent_calls = max_concurrent_calls
+        self.max_wait = max_wait
+        self.lease_seconds = lease_seconds
+
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_times: deque = deque(maxlen=1000)
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots_ready = False
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _take_slot(self, lease_key: str) -> bool:
+        db = SessionLocal()
+        try:
+            if not self._slots_ready:
+                CallLeaseStore.ensure_slots(db, CALLS_POOL, self.max_concurrent_calls)
+                self._slots_ready = True
+            return CallLeaseStore.acquire(db, CALLS_POOL, self.max_concurrent_calls, lease_key, self.lease_seconds)
+        finally:
+            db.close()
+
+    async def acquire(self) -> str:
+        """
+        Wait for a concurrent call slot and a rate token
+
+        Returns:
+            Lease key to bind to the VAPI call ID once the call is placed
+
+        Raises:
+            CallLimitExceeded: if capacity is not available within max_wait
+        """
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        lease_key = uuid.uuid4().hex
+        self._loop = asyncio.get_running_loop()
+
+        self.waiting += 1
+        try:
+            async with self.condition:
+                while not await asyncio.to_thread(self._take_slot, lease_key):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CallLimitExceeded("Too many concurrent calls")
+                    try:
+                        # Wake periodically: slots freed by other processes
+                        # and expired leases are only seen by retrying
+                        await asyncio.wait_for(self.condition.wait(), timeout=min(remaining, 1.0))
+                    except asyncio.TimeoutError:
+                        pass
+
+            try:
+                await self.bucket.acquire(deadline)
+            except BaseException:
+                await self.release(lease_key)
+                raise
+
+        except CallLimitExceeded:
+            self.rejected += 1
+            raise
+
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.wait_times.append(time.monotonic() - started)
+        return lease_key
+
+    async def release(self, key: Optional[str]):
+        """Free the slots held by a lease key or VAPI call ID"""
+        if key:
+            await asyncio.to_thread(run_in_session, CallLeaseStore.release, key)
+            self.wake()
+
+    async def _notify(self):
+        async with self.condition:
+            self.condition.notify()
+
+    def wake(self):
+        """Let a waiter retry at once after a slot was freed; safe from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._notify(), self._loop)
+
+    def get_stats(self, db: Session) -> dict:
+        """Current queue depth, live calls and wait time statistics"""
+        waits = sorted(self.wait_times)
+        live = CallLeaseStore.count_live(db, self.lease_seconds)
+        return {
+            "live_calls": live.get(CALLS_POOL, 0),
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "calls_per_second": self.bucket.rate,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait_seconds": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            "max_wait_seconds": waits[-1] if waits else 0.0,
+        }
+
+
+call_limiter = CallLimiter(
+    calls_per_second=settings.vapi_calls_per_second,
+    burst=settings.vapi_call_burst,
+    max_concurrent_calls=settings.vapi_max_concurrent_calls,
+    max_wait=settings.vapi_call_queue_max_wait,
+    lease_seconds=settings.max_call_duration + settings.vapi_call_lease_grace
+)
@@ -0,0 +1,221 @@
+from sqlalchemy import or_, and_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, run_in_session
+from app.models.call_log import CallLog, CallStatus
+from app.models.worker_lease import WorkerLease
+from app.services.vapi_event_handlers import process_vapi_event, vapi_service
+from app.services.webhook_partitions import WebhookEventStore, webhook_partition_worker
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def build_synthetic_event(call: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a VAPI call object into the webhook event its current state implies"""
+    call = dict(call)
+
+    if call.get("status") == "ended":
+        if call.get("duration") is None and call.get("startedAt") and call.get("endedAt"):
+            started = datetime.fromisoformat(call["startedAt"].replace("Z", "+00:00"))
+            ended = datetime.fromisoformat(call["endedAt"].replace("Z", "+00:00"))
+            call["duration"] = int((ended - started).total_seconds())
+
+        artifact = dict(call.get("artifact") or {})
+        artifact.setdefault("recordingUrl", call.get("recordingUrl"))
+
+        return {
+            "message": {"type": "end-of-call-report", "endedReason": call.get("endedReason")},
+            "call": call,
+            "artifact": artifact
+        }
+
+    return {
+        "message": {"type": "status-update", "status": call.get("status")},
+        "call": call
+    }
+
+
+def append_event(db: Session, event: Dict[str, Any]) -> int:
+    """Store a synthetic event for the partition workers; returns its partition"""
+    return WebhookEventStore.append(db, event).partition
+
+
+class CallReconciler:
+    """
+    Repairs call logs whose webhooks were lost.
+
+    Call logs stuck in INITIATED or RINGING (or IN_PROGRESS past the maximum
+    call duration) are looked up through the (status, created_at) index,
+    their real state is fetched from VAPI concurrently over the shared
+    connection pool, and the result is applied through the same handlers
+    the webhook endpoint uses.
+
+    Every API process starts the loop, but a pass only runs in the process
+    holding the reconciler's row in worker_leases, so VAPI is not asked
+    about the same calls once per process.
+    """
+
+    LEASE_NAME = "call_reconciler"
+
+    def __init__(self, interval: int, stale_seconds: int, concurrency: int, batch_size: int, lease_seconds: int):
+        self.interval = interval
+        self.stale_seconds = stale_seconds
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic reconciliation loop"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the reconciliation loop"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await asyncio.to_thread(self._release_lease)
+
+    async def run(self):
+        logger.info(f"Call reconciler {self.worker_id} started")
+        while True:
+            try:
+                if await asyncio.to_thread(self._claim_lease):
+                    await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Call reconciler error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def _claim_lease(self) -> bool:
+        """Take or renew the reconciler lease; False if another live process holds it"""
+        db = SessionLocal()
+        try:
+            if db.query(WorkerLease.name).filter(WorkerLease.name == self.LEASE_NAME).first() is None:
+                db.add(WorkerLease(name=self.LEASE_NAME))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Another process created it first
+                    db.rollback()
+
+            now = datetime.utcnow()
+            result = db.execute(
+                update(WorkerLease)
+                .where(
+                    WorkerLease.name == self.LEASE_NAME,
+                    or_(
+                        WorkerLease.owner.is_(None),
+                        WorkerLease.owner == self.worker_id,
+                        WorkerLease.expires_at < now
+                    )
+                )
+                .values(owner=self.worker_id, expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def _release_lease(self):
+        """Give up the lease so another process takes over at its next pass"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(WorkerLease)
+                .where(WorkerLease.name == self.LEASE_NAME, WorkerLease.owner == self.worker_id)
+                .values(owner=None, expires_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _find_stale_calls(self) -> List[Tuple[int, str]]:
+        now = datetime.utcnow()
+        ringing_cutoff = now - timedelta(seconds=self.stale_seconds)
+        in_progress_cutoff = now - timedelta(seconds=settings.max_call_duration + self.stale_seconds)
+
+        db = SessionLocal()
+        try:
+            return db.query(CallLog.id, CallLog.vapi_call_id).filter(
+                CallLog.vapi_call_id.isnot(None),
+                or_(
+                    and_(
+                        CallLog.status.in_([CallStatus.INITIATED, CallStatus.RINGING]),
+                        CallLog.created_at < ringing_cutoff
+                    ),
+                    and_(
+                        CallLog.status == CallStatus.IN_PROGRESS,
+                        CallLog.created_at < in_progress_cutoff
+                    )
+                )
+            ).order_by(CallLog.created_at).limit(self.batch_size).all()
+        finally:
+            db.close()
+
+    async def reconcile(self) -> Dict[str, int]:
+        """
+        Run one reconciliation pass
+
+        Returns:
+            Counts of stale calls checked, repaired and failed lookups
+        """
+        stale = await asyncio.to_thread(self._find_stale_calls)
+        if not stale:
+            return {"checked": 0, "repaired": 0, "errors": 0}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(call_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await vapi_service.get_call_details(call_id)
+                except Exception as e:
+                    logger.warning(f"Could not fetch state of call {call_id}: {str(e)}")
+                    return None
+
+        calls = await asyncio.gather(*(fetch(call_id) for _, call_id in stale))
+
+        repaired = 0
+        errors = 0
+        for (call_log_id, call_id), call in zip(stale, calls):
+            if call is None:
+                errors += 1
+                continue
+
+            call.setdefault("id", call_id)
+            try:
+                event = build_synthetic_event(call)
+                if settings.webhook_ingest_mode == "partitioned":
+                    # Apply after any real events still pending for the call
+                    partition = await asyncio.to_thread(run_in_session, append_event, event)
+                    webhook_partition_worker.notify(partition)
+                else:
+                    await process_vapi_event(event)
+                repaired += 1
+            except Exception as e:
+                errors += 1
+                logger.error(f"Failed to reconcile call log {call_log_id}: {str(e)}")
+
+        logger.info(f"Reconciled {repaired} of {len(stale)} stale calls ({errors} errors)")
+        return {"checked": len(stale), "repaired": repaired, "errors": errors}
+
+
+call_reconciler = CallReconciler(
+    interval=settings.call_reconciler_interval,
+    stale_seconds=settings.call_reconciler_stale_seconds,
+    concurrency=settings.call_reconciler_concurrency,
+    batch_size=settings.call_reconciler_batch_size,
+    lease_seconds=settings.call_reconciler_lease_seconds
+)
@@ -0,0 +1,222 @@
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.bill import Bill
+from app.models.call_log import CallLog, CallStatus
+from app.services.vapi_service import VapiService
+from app.services.active_call_cache import ActiveCall, active_call_cache
+from app.services.stats_service import StatsService
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+vapi_service = VapiService()
+
+LIVE_CALL_STATUSES = (CallStatus.INITIATED, CallStatus.RINGING, CallStatus.IN_PROGRESS)
+
+# Dials waiting on VAPI in this process, keyed by bill ID; resolves to the VAPI
+# call ID, or None if the dial failed. Other processes are kept out by the
+# bill's dialing_until reservation.
+_in_flight_calls: Dict[int, asyncio.Future] = {}
+
+# A dial holds its bill for at most the limiter wait plus the VAPI request timeout
+DIAL_RESERVATION_SECONDS = settings.vapi_call_queue_max_wait + 60
+
+
+class CallAlreadyActive(Exception):
+    """Raised when a bill already has a call being placed or in progress"""
+
+    def __init__(self, bill_id: int, vapi_call_id: Optional[str] = None):
+        super().__init__(f"Bill {bill_id} already has a call in progress")
+        self.bill_id = bill_id
+        self.vapi_call_id = vapi_call_id
+
+
+def get_ordinal_suffix(day: int) -> str:
+    """Get ordinal suffix for a day of month (1st, 2nd, 3rd, etc.)"""
+    if 10 <= day % 100 <= 20:
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+
+class CallService:
+    """Service for placing outbound calls for bills"""
+
+    @staticmethod
+    def build_bill_data(bill: Bill) -> Dict[str, Any]:
+        """Prepare bill data passed to the VAPI assistant"""
+        day = bill.due_date.day
+        ordinal_day = f"{day}{get_ordinal_suffix(day)}"
+        formatted_date = bill.due_date.strftime(f"{ordinal_day} %B %Y")
+
+        return {
+            "customer_name": bill.customer_name,
+            "bill_amount": bill.bill_amount,
+            "due_date": formatted_date,  # e.g., "1st June 2025"
+            "consumer_number": bill.consumer_number,
+            "bill_number": bill.bill_number,
+            "payment_link": bill.payment_link
+        }
+
+    @staticmethod
+    def get_active_call(db: Session, bill_id: int) -> Optional[CallLog]:
+        """Get a live call for the bill started within the maximum call window"""
+        window_start = datetime.utcnow() - timedelta(
+            seconds=settings.max_call_duration + settings.vapi_call_lease_grace
+        )
+        return db.query(CallLog).filter(
+            CallLog.bill_id == bill_id,
+            CallLog.vapi_call_id.isnot(None),
+            CallLog.status.in_(LIVE_CALL_STATUSES),
+            CallLog.created_at >= window_start
+        ).order_by(CallLog.created_at.desc()).first()
+
+    @staticmethod
+    def update_call_log(db: Session, call_log_id: int, **values):
+        """Write call log fields by primary key, without loading the row"""
+        previous = None
+        if "status" in values or "outcome" in values:
+            # Only the old status and outcome, for the stats counters
+            previous = db.query(CallLog.status, CallLog.outcome).filter(
+                CallLog.id == call_log_id
+            ).with_for_update().first()
+        
+        db.execute(update(CallLog).where(CallLog.id == call_log_id).values(**values))
+        
+        if previous:
+            StatsService.apply(db, StatsService.call_log_deltas(previous.status, previous.outcome, values))
+
+    @staticmethod
+    async def place_call(db: AsyncSession, bill: Bill, call_log: Optional[CallLog] = None) -> CallLog:
+        """
+        Initiate a call for a bill via VAPI and record the call log
+
+        Database work goes through db.run_sync, so the event loop is never
+        blocked on it.
+
+        Args:
+            db: Async database session the bill and call log belong to
+            bill: Bill to call the customer for
+            call_log: Pending call log recorded when the call was queued
+
+        Returns:
+            Created or updated call log
+
+        Raises:
+            CallAlreadyActive: if the bill has a dial in flight or a live call;
+                a concurrent duplicate waits for the first dial and carries its call ID
+        """
+        await CallService.join_in_flight_call(bill.id)
+        await db.run_sync(CallService.reserve_dial, bill.id)
+        try:
+            call_response = await CallService.dial(bill)
+        except BaseException:
+            await db.run_sync(CallService.release_dial, bill.id)
+            raise
+        return await db.run_sync(CallService.record_call, bill, call_response, call_log)
+
+    @staticmethod
+    async def join_in_flight_call(bill_id: int):
+        """Wait for a dial already in flight; raise CallAlreadyActive if it succeeded"""
+        # If it fails, this caller dials instead
+        while bill_id in _in_flight_calls:
+            vapi_call_id = await asyncio.shield(_in_flight_calls[bill_id])
+            if vapi_call_id:
+                raise CallAlreadyActive(bill_id, vapi_call_id)
+
+    @staticmethod
+    def reserve_dial(db: Session, bill_id: int):
+        """
+        Claim a bill for one dial, across every process
+
+        Raises:
+            CallAlreadyActive: if another dial holds the bill or it has a live call
+        """
+        now = datetime.utcnow()
+        result = db.execute(
+            update(Bill)
+            .where(Bill.id == bill_id, or_(Bill.dialing_until.is_(None), Bill.dialing_until < now))
+            .values(dialing_until=now + timedelta(seconds=DIAL_RESERVATION_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount != 1:
+            raise CallAlreadyActive(bill_id)
+
+        try:
+            CallService.check_no_active_call(db, bill_id)
+        except CallAlreadyActive:
+            CallService.release_dial(db, bill_id)
+            raise
+
+    @staticmethod
+    def release_dial(db: Session, bill_id: int):
+        """Give up the reservation of a dial that did not place a call"""
+        db.execute(
+            update(Bill).where(Bill.id == bill_id).values(dialing_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    @staticmethod
+    def check_no_active_call(db: Session, bill_id: int):
+        """Raise CallAlreadyActive if the bill has a live call"""
+        active = CallService.get_active_call(db, bill_id)
+        if active:
+            raise CallAlreadyActive(bill_id, active.vapi_call_id)
+
+    @staticmethod
+    async def dial(bill: Bill) -> Dict[str, Any]:
+        """Ask VAPI to call the customer; holds no database connection while waiting"""
+        # Callers checking for a live call asynchronously may have let another dial start
+        await CallService.join_in_flight_call(bill.id)
+
+        in_flight = asyncio.get_running_loop().create_future()
+        _in_flight_calls[bill.id] = in_flight
+        call_response = {}
+        try:
+            call_response = await vapi_service.initiate_call(
+                phone_number=bill.customer_phone,
+                bill_data=CallService.build_bill_data(bill)
+            )
+        finally:
+            del _in_flight_calls[bill.id]
+            in_flight.set_result(call_response.get("id"))
+
+        return call_response
+
+    @staticmethod
+    def record_call(
+        db: Session,
+        bill: Bill,
+        call_response: Dict[str, Any],
+        call_log: Optional[CallLog] = None
+    ) -> CallLog:
+        """Store the call VAPI accepted in a new or the pending call log"""
+        if not call_log:
+            call_log = CallLog(bill_id=bill.id, customer_phone=bill.customer_phone)
+            db.add(call_log)
+
+        call_log.vapi_call_id = call_response.get("id")
+        call_log.phone_number_id = call_response.get("phoneNumberId")
+        call_log.status = CallStatus.INITIATED
+        call_log.error_message = None
+
+        # The live call log now keeps other dials out
+        db.execute(
+            update(Bill).where(Bill.id == bill.id).values(dialing_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        db.refresh(call_log)
+
+        # Webhooks for this call can be handled without looking it up
+        active_call_cache.put(ActiveCall(call_log, bill))
+
+        logger.info(f"Call initiated for bill {bill.bill_number}, Call ID: {call_log.vapi_call_id}")
+        return call_log
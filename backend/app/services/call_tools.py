@@ -0,0 +1,381 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.database import run_in_session
+from app.models.bill import Bill
+from app.models.call_log import CallOutcome
+from app.services.twilio_service import TwilioService
+from app.services.call_service import CallService
+from app.services.reminder_scheduler import reminder_scheduler
+from app.services.active_call_cache import ActiveCall
+from app.config import get_settings
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import re
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+twilio_service = TwilioService()
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 5000)
+
+# Database changes of a tool, applied in the caller's transaction
+ToolChanges = Callable[[Session], None]
+# The reply for the assistant and the database changes to apply, if any
+ToolResult = Tuple[Dict[str, Any], Optional[ToolChanges]]
+ToolHandler = Callable[[ActiveCall, Dict[str, Any]], Awaitable[ToolResult]]
+
+
+def parse_tool_limits(spec: str) -> Dict[str, int]:
+    """Parse "tool:ms,tool:ms" into a map of tool name to milliseconds"""
+    limits = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, ms = part.partition(":")
+        limits[name.strip()] = int(ms)
+    return limits
+
+
+class ToolLatency:
+    """Latency histogram and outcome counters of one tool"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.over_budget = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, budget_ms: int):
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS_MS) and elapsed_ms > LATENCY_BUCKETS_MS[bucket]:
+            bucket += 1
+        self.buckets[bucket] += 1
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if elapsed_ms > budget_ms:
+            self.over_budget += 1
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """Upper bound of the bucket holding the given fraction of calls (None = beyond the last bound)"""
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+
+class CallTool:
+    """A function the assistant can call during a conversation"""
+
+    def __init__(self, name: str, handler: ToolHandler, fallback: Dict[str, Any], budget_ms: int, timeout_ms: int):
+        self.name = name
+        self.handler = handler
+        self.fallback = fallback
+        self.budget_ms = budget_ms
+        self.timeout_ms = timeout_ms
+        self.latency = ToolLatency()
+
+
+class ToolDispatcher:
+    """
+    Registry of assistant tools.
+
+    Tools get the live call from the active call cache, so customer and
+    bill details were read when the call was placed and are not reloaded
+    while the customer waits. A tool does its network I/O itself and
+    returns its database changes as a function of a session, which the
+    caller applies in a worker thread (or a commit writer batch). Each tool
+    has a latency budget, which is only measured, and a timeout: a tool
+    still running at its timeout is cancelled and the assistant gets the
+    tool's fallback reply so the conversation can go on.
+    """
+
+    def __init__(
+        self,
+        default_budget_ms: int,
+        default_timeout_ms: int,
+        budgets: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, int]] = None
+    ):
+        self.default_budget_ms = default_budget_ms
+        self.default_timeout_ms = default_timeout_ms
+        self.budgets = budgets or {}
+        self.timeouts = timeouts or {}
+        self.tools: Dict[str, CallTool] = {}
+
+    def tool(self, name: str, fallback: Dict[str, Any]):
+        """Decorator registering an async handler(call, parameters) -> (reply, changes) as a tool"""
+        def register(handler: ToolHandler) -> ToolHandler:
+            self.tools[name] = CallTool(
+                name=name,
+                handler=handler,
+                fallback=fallback,
+                budget_ms=self.budgets.get(name, self.default_budget_ms),
+                timeout_ms=self.timeouts.get(name, self.default_timeout_ms)
+            )
+            return handler
+        return register
+
+    async def dispatch(self, call: ActiveCall, name: Optional[str], parameters: Dict[str, Any]) -> ToolResult:
+        """Run a tool for a call; its reply for the assistant and its database changes"""
+        tool = self.tools.get(name)
+        if not tool:
+            logger.warning(f"No tool registered for function {name}")
+            return {"success": True, "message": "Function processed"}, None
+
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(tool.handler(call, parameters), timeout=tool.timeout_ms / 1000)
+
+        except asyncio.TimeoutError:
+            tool.latency.timeouts += 1
+            logger.warning(f"Tool {name} timed out after {tool.timeout_ms} ms for call {call.vapi_call_id}, sending fallback reply")
+            return tool.fallback, None
+
+        except Exception:
+            tool.latency.errors += 1
+            raise
+
+        finally:
+            elapsed_ms = (time.monotonic() - started) * 1000
+            tool.latency.record(elapsed_ms, tool.budget_ms)
+            if elapsed_ms > tool.budget_ms:
+                logger.warning(f"Tool {name} took {elapsed_ms:.0f} ms, over its {tool.budget_ms} ms budget")
+
+    def get_stats(self) -> List[dict]:
+        """Latency histogram and counters per tool"""
+        stats = []
+        for tool in self.tools.values():
+            latency = tool.latency
+            stats.append({
+                "name": tool.name,
+                "budget_ms": tool.budget_ms,
+                "timeout_ms": tool.timeout_ms,
+                "calls": latency.calls,
+                "errors": latency.errors,
+                "timeouts": latency.timeouts,
+                "over_budget": latency.over_budget,
+                "avg_ms": latency.total_ms / latency.calls if latency.calls else 0.0,
+                "p50_ms": latency.percentile(0.5) if latency.calls else 0,
+                "p95_ms": latency.percentile(0.95) if latency.calls else 0,
+                "max_ms": latency.max_ms,
+                "buckets": [
+                    {"le_ms": bound, "count": count}
+                    for bound, count in zip(list(LATENCY_BUCKETS_MS) + [None], latency.buckets)
+                ],
+            })
+        return stats
+
+
+tool_dispatcher = ToolDispatcher(
+    default_budget_ms=settings.tool_call_budget_ms,
+    default_timeout_ms=settings.tool_call_timeout_ms,
+    budgets=parse_tool_limits(settings.tool_call_budgets),
+    timeouts=parse_tool_limits(settings.tool_call_timeouts)
+)
+
+
+def get_sms_reply(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Reply for the assistant about a payment link SMS"""
+    if result.get("success"):
+        return {"success": True, "message": "SMS sent successfully", "sid": result.get("sid")}
+    return {"success": False, "error": result.get("error", "Unknown error")}
+
+
+def record_sms_result(db: Session, call_log_id: int, result: Dict[str, Any]):
+    """Store the outcome of a payment link SMS on the call log"""
+    if result.get("success"):
+        CallService.update_call_log(db, call_log_id, sms_sent=1, sms_sid=result.get("sid"))
+        logger.info(f"✅ Payment link sent for call log {call_log_id}, SMS SID: {result.get('sid')}")
+        return
+
+    error_msg = result.get("error", "Unknown error")
+    logger.error(f"❌ Failed to send SMS: {error_msg}")
+    CallService.update_call_log(db, call_log_id, error_message=error_msg)
+
+
+# Late SMS results being recorded; referenced so they are not garbage collected
+_late_sms_tasks: Set[asyncio.Task] = set()
+
+
+async def record_late_sms(call_log_id: int, result: Dict[str, Any]):
+    """Store the result of an SMS that finished after its tool call timed out"""
+    try:
+        await asyncio.to_thread(run_in_session, record_sms_result, call_log_id, result)
+    except Exception as e:
+        logger.error(f"Could not record late SMS result for call log {call_log_id}: {str(e)}")
+
+
+def on_late_sms(call_log_id: int, sms: asyncio.Future):
+    if sms.cancelled():
+        return
+    error = sms.exception()
+    result = {"success": False, "error": f"Error sending SMS: {str(error)}"} if error else sms.result()
+    task = asyncio.ensure_future(record_late_sms(call_log_id, result))
+    _late_sms_tasks.add(task)
+    task.add_done_callback(_late_sms_tasks.discard)
+
+
+@tool_dispatcher.tool(
+    "send_payment_link",
+    fallback={"success": True, "message": "The payment link is being sent and should arrive in a minute or two"}
+)
+async def send_payment_link(call: ActiveCall, parameters: Dict[str, Any]) -> ToolResult:
+    logger.info(f"Sending SMS to {call.customer_phone} for bill {call.bill_number}")
+
+    sms = asyncio.ensure_future(twilio_service.send_payment_link(
+        to_number=call.customer_phone,
+        customer_name=call.customer_name,
+        bill_amount=call.bill_amount,
+        due_date=call.due_date.strftime("%d-%m-%Y"),
+        payment_link=call.payment_link
+    ))
+
+    try:
+        # Shielded so a timeout only stops the wait; the SMS still goes out
+        result = await asyncio.shield(sms)
+    except asyncio.CancelledError:
+        sms.add_done_callback(partial(on_late_sms, call.call_log_id))
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error sending SMS: {str(e)}", exc_info=True)
+        result = {"success": False, "error": f"Error sending SMS: {str(e)}"}
+
+    return get_sms_reply(result), partial(record_sms_result, call_log_id=call.call_log_id, result=result)
+
+
+@tool_dispatcher.tool(
+    "confirm_payment",
+    fallback={"success": False, "message": "The payment confirmation could not be saved yet; it will be checked after the call"}
+)
+async def confirm_payment(call: ActiveCall, parameters: Dict[str, Any]) -> ToolResult:
+    def apply(db: Session):
+        call.outcome = CallOutcome.PAYMENT_CONFIRMED
+        CallService.update_call_log(db, call.call_log_id, outcome=call.outcome)
+
+    return {"success": True, "message": "Payment confirmed"}, apply
+
+
+@tool_dispatcher.tool(
+    "customer_disputed",
+    fallback={"success": False, "message": "The dispute could not be saved yet; it will be followed up after the call"}
+)
+async def customer_disputed(call: ActiveCall, parameters: Dict[str, Any]) -> ToolResult:
+    dispute_reason = parameters.get("reason", "No reason provided")
+
+    def apply(db: Session):
+        call.outcome = CallOutcome.CUSTOMER_DISPUTED
+        CallService.update_call_log(db, call.call_log_id, outcome=call.outcome)
+
+        # Add note to bill
+        db.execute(
+            update(Bill).where(Bill.id == call.bill_id).values(notes=f"Customer disputed: {dispute_reason}")
+        )
+
+    return {"success": True, "message": "Dispute recorded"}, apply
+
+
+def get_customer_timezone(name: Optional[str] = None) -> ZoneInfo:
+    """The named IANA timezone, or the configured one if it is missing or unknown"""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown timezone {name}, using {settings.customer_timezone}")
+    return ZoneInfo(settings.customer_timezone)
+
+
+def parse_callback_time(
+    preferred_time: Optional[str],
+    now: Optional[datetime] = None,
+    tz: Optional[ZoneInfo] = None
+) -> datetime:
+    """
+    Turn the customer's preferred callback time into a UTC datetime
+
+    Understands ISO timestamps, "in 2 hours" / "in 30 minutes" / "in 3 days",
+    and "[today|tomorrow] [at] 5 pm" / "17:30". Clock times and timestamps
+    without an offset are in the customer's timezone tz (default: the
+    configured CUSTOMER_TIMEZONE). Anything else falls back to the regular
+    reminder interval.
+    """
+    now = now or datetime.utcnow()
+    tz = tz or get_customer_timezone()
+    local_now = now.replace(tzinfo=timezone.utc).astimezone(tz)
+    text = (preferred_time or "").strip().lower()
+
+    def to_utc(local: datetime) -> datetime:
+        if local.tzinfo is None:
+            local = local.replace(tzinfo=tz)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+    try:
+        return to_utc(datetime.fromisoformat(text.upper()))
+    except ValueError:
+        pass
+
+    relative = re.search(r"in\s+(\d+)\s*(minute|min|hour|hr|day)s?", text)
+    if relative:
+        amount, unit = int(relative.group(1)), relative.group(2)
+        if unit in ("minute", "min"):
+            return now + timedelta(minutes=amount)
+        if unit in ("hour", "hr"):
+            return now + timedelta(hours=amount)
+        return now + timedelta(days=amount)
+
+    clock = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", text)
+    if clock and (clock.group(2) or clock.group(3)):
+        hour, minute = int(clock.group(1)), int(clock.group(2) or 0)
+        if clock.group(3) == "pm" and hour < 12:
+            hour += 12
+        elif clock.group(3) == "am" and hour == 12:
+            hour = 0
+        if hour < 24 and minute < 60:
+            day = local_now.date() + timedelta(days=1 if "tomorrow" in text else 0)
+            callback_at = datetime(day.year, day.month, day.day, hour, minute)
+            if to_utc(callback_at) <= now:
+                callback_at += timedelta(days=1)
+            return to_utc(callback_at)
+
+    if "tomorrow" in text:
+        return now + timedelta(days=1)
+
+    return now + timedelta(hours=settings.reminder_interval_hours)
+
+
+@tool_dispatcher.tool("schedule_callback", fallback={"success": True, "message": "Callback request noted"})
+async def schedule_callback(call: ActiveCall, parameters: Dict[str, Any]) -> ToolResult:
+    preferred_time = parameters.get("preferred_time")
+    tz = get_customer_timezone(parameters.get("timezone"))
+    callback_at = parse_callback_time(preferred_time, tz=tz)
+
+    note = f"Callback requested for {preferred_time or 'later'}"
+    if parameters.get("reason"):
+        note += f": {parameters['reason']}"
+
+    def apply(db: Session):
+        call.outcome = CallOutcome.CALLBACK_REQUESTED
+        call.callback_at = callback_at
+        CallService.update_call_log(db, call.call_log_id, outcome=call.outcome)
+
+        db.execute(
+            update(Bill).where(Bill.id == call.bill_id).values(next_reminder_date=callback_at, notes=note)
+        )
+        reminder_scheduler.schedule(call.bill_id, callback_at)
+
+    # Read back to the customer in their own time
+    local_time = callback_at.replace(tzinfo=timezone.utc).astimezone(tz)
+    return {"success": True, "message": f"Callback scheduled for {local_time.strftime('%d-%m-%Y %I:%M %p')}"}, apply
@@ -0,0 +1,210 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.bill import BillStatus
+from app.services.bill_service import BillService, AsyncBillService
+from app.services.call_service import CallService, CallAlreadyActive
+from app.schemas.campaign import CampaignStatus
+from app.config import get_settings
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class Campaign:
+    """In-memory state of a bulk dialing campaign"""
+
+    def __init__(self, bill_ids: List[int], concurrency: int, name: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = CampaignStatus.PENDING
+        self.concurrency = concurrency
+        self.bill_ids = bill_ids
+        self.total = len(bill_ids)
+        self.dialed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.in_flight = 0
+        self.last_error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._running = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        for bill_id in bill_ids:
+            self._queue.put_nowait(bill_id)
+
+    @property
+    def remaining(self) -> int:
+        """Bills still queued or being dialed"""
+        return self._queue.qsize() + self.in_flight
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (CampaignStatus.CANCELLED, CampaignStatus.COMPLETED)
+
+
+class CampaignManager:
+    """Runs bulk dialing campaigns server-side with bounded concurrency"""
+
+    def __init__(self):
+        self.campaigns: Dict[str, Campaign] = {}
+
+    async def create_campaign(
+        self,
+        db: AsyncSession,
+        name: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_calls: Optional[int] = None
+    ) -> Campaign:
+        """Snapshot pending bills in priority order into a new campaign and start dialing"""
+        bill_ids = [bill.id for bill in await db.run_sync(BillService.get_priority_bills, max_calls)]
+
+        concurrency = min(
+            concurrency or settings.campaign_concurrency,
+            settings.campaign_max_concurrency
+        )
+
+        campaign = Campaign(bill_ids=bill_ids, concurrency=concurrency, name=name)
+        self.campaigns[campaign.id] = campaign
+
+        campaign.status = CampaignStatus.RUNNING
+        campaign.started_at = datetime.utcnow()
+        campaign._running.set()
+        campaign._task = asyncio.create_task(self._run(campaign))
+
+        logger.info(f"Campaign {campaign.id} started with {campaign.total} bills, concurrency {concurrency}")
+        return campaign
+
+    def get_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        """Get campaign by ID"""
+        return self.campaigns.get(campaign_id)
+
+    def list_campaigns(self) -> List[Campaign]:
+        """Get all campaigns, newest first"""
+        return sorted(self.campaigns.values(), key=lambda c: c.created_at, reverse=True)
+
+    def pause_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        """Stop handing out new bills; calls already in flight finish"""
+        campaign = self.campaigns.get(campaign_id)
+        if not campaign:
+            return None
+
+        if campaign.status != CampaignStatus.RUNNING:
+            raise ValueError(f"Cannot pause a {campaign.status.value} campaign")
+
+        campaign.status = CampaignStatus.PAUSED
+        campaign._running.clear()
+        logger.info(f"Campaign {campaign_id} paused")
+        return campaign
+
+    def resume_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        """Resume a paused campaign"""
+        campaign = self.campaigns.get(campaign_id)
+        if not campaign:
+            return None
+
+        if campaign.status != CampaignStatus.PAUSED:
+            raise ValueError(f"Cannot resume a {campaign.status.value} campaign")
+
+        campaign.status = CampaignStatus.RUNNING
+        campaign._running.set()
+        logger.info(f"Campaign {campaign_id} resumed")
+        return campaign
+
+    def cancel_campaign(self, campaign_id: str) -> Optional[Campaign]:
+        """Cancel a campaign; bills not yet dialed are dropped, calls being placed finish"""
+        campaign = self.campaigns.get(campaign_id)
+        if not campaign:
+            return None
+
+        if campaign.is_finished:
+            raise ValueError(f"Cannot cancel a {campaign.status.value} campaign")
+
+        campaign.status = CampaignStatus.CANCELLED
+        campaign.finished_at = datetime.utcnow()
+        # Wake paused workers so they see the cancellation and stop. Workers
+        # in the middle of place_call are left to finish: cancelling them
+        # could leave a VAPI call running with no CallLog behind it.
+        campaign._running.set()
+        logger.info(f"Campaign {campaign_id} cancelled")
+        return campaign
+
+    async def shutdown(self):
+        """Cancel every unfinished campaign and wait for the calls being placed"""
+        tasks = []
+        for campaign in list(self.campaigns.values()):
+            if not campaign.is_finished:
+                self.cancel_campaign(campaign.id)
+            if campaign._task and not campaign._task.done():
+                tasks.append(campaign._task)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _run(self, campaign: Campaign):
+        workers = [
+            asyncio.create_task(self._worker(campaign))
+            for _ in range(campaign.concurrency)
+        ]
+        await asyncio.gather(*workers)
+
+        if not campaign.is_finished:
+            campaign.status = CampaignStatus.COMPLETED
+            campaign.finished_at = datetime.utcnow()
+            logger.info(
+                f"Campaign {campaign.id} completed: {campaign.succeeded} succeeded, "
+                f"{campaign.failed} failed, {campaign.skipped} skipped"
+            )
+
+    async def _worker(self, campaign: Campaign):
+        while True:
+            await campaign._running.wait()
+            if campaign.is_finished:
+                return
+
+            try:
+                bill_id = campaign._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            await self._dial(campaign, bill_id)
+
+    async def _dial(self, campaign: Campaign, bill_id: int):
+        campaign.in_flight += 1
+        db = AsyncSessionLocal()
+        try:
+            bill = await AsyncBillService.get_bill(db, bill_id)
+
+            # Bills may have been paid or removed since the campaign was created
+            if not bill or bill.status in (BillStatus.PAID, BillStatus.CANCELLED):
+                campaign.skipped += 1
+                return
+
+            campaign.dialed += 1
+            await CallService.place_call(db, bill)
+            campaign.succeeded += 1
+
+        except CallAlreadyActive:
+            campaign.dialed -= 1
+            campaign.skipped += 1
+
+        except Exception as e:
+            campaign.failed += 1
+            campaign.last_error = f"Bill {bill_id}: {str(e)}"
+            logger.error(f"Campaign {campaign.id} failed to call bill {bill_id}: {str(e)}")
+
+        finally:
+            await db.close()
+            campaign.in_flight -= 1
+
+
+campaign_manager = CampaignManager()
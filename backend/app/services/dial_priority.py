@@ -0,0 +1,149 @@
+from sqlalchemy import func, case, update
+from sqlalchemy.orm import Session
+from app.models.bill import Bill, BillStatus
+from app.models.call_log import CallLog, CallOutcome
+from app.config import get_settings
+from datetime import datetime
+from typing import List, Optional
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Statuses of bills the dialer works through
+DIALABLE_STATUSES = (BillStatus.PENDING, BillStatus.OVERDUE)
+
+# Fixed reference point for the overdue term of the score
+SCORE_EPOCH = datetime(2020, 1, 1)
+
+PAID_OUTCOMES = (CallOutcome.PAYMENT_CONFIRMED, CallOutcome.PAYMENT_PROMISED)
+
+
+def _days_since_epoch(moment: datetime) -> float:
+    return (moment - SCORE_EPOCH).total_seconds() / 86400
+
+
+class DialPriorityService:
+    """
+    Ranks dialable bills by expected rupees collected per dialer minute.
+
+    score = log(amount * p_answer * p_pay / expected_minutes) + w * days_overdue
+
+    p_answer and p_pay come from the customer's past calls, smoothed toward
+    the configured priors, and p_answer decays with each attempt on the
+    bill. Days overdue is (now - due_date); "now" adds the same amount to
+    every bill, so the stored score keeps only -w * (due_date - epoch) and
+    stays correctly ordered as time passes. Scores are stored in the indexed
+    bills.priority_score column and recomputed for a single bill whenever
+    that bill or one of its calls changes.
+    """
+
+    @staticmethod
+    def compute_score(
+        bill: Bill,
+        total_calls: int = 0,
+        answered_calls: int = 0,
+        paid_calls: int = 0
+    ) -> float:
+        """Stored priority score of a bill given its customer's call history"""
+        weight = settings.priority_prior_weight
+
+        p_answer = (answered_calls + settings.priority_answer_rate * weight) / (total_calls + weight)
+        p_answer *= settings.priority_attempt_decay ** (bill.call_attempts or 0)
+        p_pay = (paid_calls + settings.priority_payment_rate * weight) / (answered_calls + weight)
+
+        expected_minutes = (
+            p_answer * settings.priority_talk_minutes
+            + (1 - p_answer) * settings.priority_ring_minutes
+        )
+        rupees_per_minute = bill.bill_amount * p_answer * p_pay / expected_minutes
+
+        return math.log(max(rupees_per_minute, 1e-6)) - settings.priority_overdue_weight * _days_since_epoch(bill.due_date)
+
+    @staticmethod
+    def current_score(stored_score: Optional[float], now: Optional[datetime] = None) -> Optional[float]:
+        """Add back the time term so the score reads as log(rupees per minute) plus overdue boost"""
+        if stored_score is None:
+            return None
+        return stored_score + settings.priority_overdue_weight * _days_since_epoch(now or datetime.utcnow())
+
+    @staticmethod
+    def refresh(db: Session, bill: Bill):
+        """Recompute one bill's score in the current transaction; non-dialable bills are unranked"""
+        if bill.status not in DIALABLE_STATUSES or (bill.call_attempts or 0) >= settings.call_retry_attempts:
+            bill.priority_score = None
+            return
+
+        total, answered, paid = db.query(
+            func.count(CallLog.id),
+            func.count(CallLog.started_at),
+            func.sum(case((CallLog.outcome.in_(PAID_OUTCOMES), 1), else_=0))
+        ).filter(CallLog.customer_phone == bill.customer_phone).one()
+
+        bill.priority_score = DialPriorityService.compute_score(bill, total, answered, paid or 0)
+
+    @staticmethod
+    def refresh_many(db: Session, bill_ids: List[int]):
+        """Recompute the scores of many bills with one history query, in the current transaction"""
+        bills = db.query(
+            Bill.id, Bill.status, Bill.call_attempts, Bill.customer_phone, Bill.bill_amount, Bill.due_date
+        ).filter(Bill.id.in_(bill_ids)).all()
+
+        phones = {bill.customer_phone for bill in bills}
+        history = {
+            phone: (total, answered, paid or 0)
+            for phone, total, answered, paid in db.query(
+                CallLog.customer_phone,
+                func.count(CallLog.id),
+                func.count(CallLog.started_at),
+                func.sum(case((CallLog.outcome.in_(PAID_OUTCOMES), 1), else_=0))
+            ).filter(CallLog.customer_phone.in_(phones)).group_by(CallLog.customer_phone)
+        } if phones else {}
+
+        scores = []
+        for bill in bills:
+            if bill.status not in DIALABLE_STATUSES or (bill.call_attempts or 0) >= settings.call_retry_attempts:
+                score = None
+            else:
+                score = DialPriorityService.compute_score(bill, *history.get(bill.customer_phone, (0, 0, 0)))
+            scores.append({"id": bill.id, "priority_score": score})
+
+        if scores:
+            db.execute(update(Bill), scores)
+
+    @staticmethod
+    def refresh_bill(db: Session, bill_id: int):
+        """Recompute the score of a bill after one of its calls changed"""
+        bill = db.query(Bill).filter(Bill.id == bill_id).first()
+        if bill:
+            DialPriorityService.refresh(db, bill)
+
+    @staticmethod
+    def get_dial_list(db: Session, limit: Optional[int] = None) -> List[Bill]:
+        """Dialable bills, highest priority first, read off the priority_score index"""
+        query = db.query(Bill).filter(
+            Bill.priority_score.isnot(None)
+        ).order_by(Bill.priority_score.desc(), Bill.id)
+
+        if limit:
+            query = query.limit(limit)
+
+        return query.all()
+
+    @staticmethod
+    def backfill(db: Session) -> int:
+        """Score dialable bills inserted without going through BillService"""
+        bills = db.query(Bill).filter(
+            Bill.priority_score.is_(None),
+            Bill.status.in_(DIALABLE_STATUSES),
+            Bill.call_attempts < settings.call_retry_attempts
+        ).all()
+
+        for bill in bills:
+            DialPriorityService.refresh(db, bill)
+
+        db.commit()
+        if bills:
+            logger.info(f"Scored {len(bills)} unranked bills for the dial list")
+        return len(bills)
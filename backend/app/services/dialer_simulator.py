@@ -0,0 +1,252 @@
+from sqlalchemy.orm import Session
+from app.models.call_log import CallLog, CallStatus, CallOutcome, TERMINAL_CALL_STATUSES
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+import heapq
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+PAID_OUTCOMES = (CallOutcome.PAYMENT_CONFIRMED, CallOutcome.PAYMENT_PROMISED)
+
+# Line time of an unanswered call when the log has no timestamps to measure it
+DEFAULT_RING_SECONDS = 30
+
+# Used when there is no call history to sample from:
+# (weight, line seconds, answered, paid)
+DEFAULT_PROFILE = [
+    (30, 30, False, False),   # no answer
+    (10, 15, False, False),   # busy / failed
+    (35, 150, True, False),   # answered, no commitment
+    (25, 200, True, True),    # answered, payment promised or confirmed
+]
+
+
+class CallProfile:
+    """Empirical distribution of call outcomes sampled by the simulator"""
+
+    def __init__(self, samples: List[Tuple[float, bool, bool]]):
+        if not samples:
+            raise ValueError("A call profile needs at least one sample")
+        # Each sample is (line seconds, answered, paid)
+        self.samples = samples
+
+    @classmethod
+    def from_call_logs(cls, db: Session, since: Optional[datetime] = None) -> "CallProfile":
+        """Build a profile from finished calls recorded in the database"""
+        query = db.query(
+            CallLog.status,
+            CallLog.outcome,
+            CallLog.duration,
+            CallLog.created_at,
+            CallLog.started_at,
+            CallLog.ended_at
+        ).filter(
+            CallLog.status.in_(TERMINAL_CALL_STATUSES),
+            CallLog.vapi_call_id.isnot(None)
+        )
+
+        if since:
+            query = query.filter(CallLog.created_at >= since)
+
+        samples = []
+        for status, outcome, duration, created_at, started_at, ended_at in query.yield_per(10000):
+            answered = started_at is not None or (status == CallStatus.COMPLETED and bool(duration))
+
+            if created_at and ended_at and ended_at > created_at:
+                line_seconds = (ended_at - created_at).total_seconds()
+            elif duration:
+                line_seconds = duration + (DEFAULT_RING_SECONDS if answered else 0)
+            else:
+                line_seconds = DEFAULT_RING_SECONDS
+
+            samples.append((line_seconds, answered, outcome in PAID_OUTCOMES))
+
+        return cls(samples)
+
+    @classmethod
+    def default(cls) -> "CallProfile":
+        """Illustrative profile for databases with no call history"""
+        samples = []
+        for weight, line_seconds, answered, paid in DEFAULT_PROFILE:
+            samples.extend([(float(line_seconds), answered, paid)] * weight)
+        return cls(samples)
+
+    def summary(self) -> dict:
+        """Answer rate, payment rate and mean line time of the profile"""
+        n = len(self.samples)
+        answered = sum(1 for _, a, _ in self.samples if a)
+        return {
+            "samples": n,
+            "answer_rate": answered / n,
+            "paid_rate": sum(1 for _, _, p in self.samples if p) / n,
+            "avg_line_seconds": sum(s for s, _, _ in self.samples) / n,
+        }
+
+
+class DialerSimulator:
+    """
+    Discrete-event model of a collection drive.
+
+    Each customer is dialed until answered or out of attempts; unanswered
+    calls are retried after retry_delay seconds. A call needs a free line
+    (capped by lines and by numbers * max_calls_per_number) and a token from
+    the same token bucket the live call limiter uses. Outcomes are drawn
+    from a CallProfile.
+
+    Call ends are kept in a heap ordered by time, holding at most one entry
+    per line. Every retry waits the same delay, so retries fall due in the
+    order they were scheduled and wait in a FIFO queue instead of the heap.
+    """
+
+    def __init__(
+        self,
+        profile: CallProfile,
+        lines: int,
+        calls_per_second: float,
+        burst: int,
+        numbers: int = 1,
+        max_calls_per_number: int = 0,
+        retry_attempts: int = 3,
+        retry_delay: float = 86400
+    ):
+        self.profile = profile
+        self.lines = min(lines, numbers * max_calls_per_number) if max_calls_per_number else lines
+        self.calls_per_second = calls_per_second
+        self.burst = burst
+        self.numbers = numbers
+        self.retry_attempts = max(retry_attempts, 1)
+        self.retry_delay = retry_delay
+
+        if self.lines < 1:
+            raise ValueError("At least one line is required")
+        if calls_per_second <= 0:
+            raise ValueError("calls_per_second must be positive")
+
+    def run(self, customers: int, seed: Optional[int] = None) -> dict:
+        """Simulate dialing the given number of customers"""
+        rng = random.Random(seed)
+        samples = self.profile.samples
+        # Outcomes are drawn in batches; far cheaper than one draw per call
+        draws: list = []
+
+        rate = self.calls_per_second
+        burst = float(self.burst)
+        retry_attempts = self.retry_attempts
+        retry_delay = self.retry_delay
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        attempts = [0] * customers
+        ready = deque(range(customers))
+        events: list = []
+        retries: deque = deque()
+        seq = 0
+
+        free_lines = self.lines
+        tokens = burst
+        token_time = 0.0
+        now = 0.0
+
+        calls = 0
+        answered = 0
+        paid = 0
+        line_seconds = 0.0
+        rate_wait = 0.0
+
+        started = time.perf_counter()
+
+        while True:
+            # Start as many calls as lines and the token bucket allow
+            while free_lines and ready:
+                customer = ready.popleft()
+
+                tokens = min(burst, tokens + (now - token_time) * rate)
+                token_time = now
+                if tokens >= 1:
+                    tokens -= 1
+                    start = now
+                else:
+                    # Reserve the next token; the line is held while waiting for it
+                    wait = (1 - tokens) / rate
+                    start = now + wait
+                    rate_wait += wait
+                    tokens = 0.0
+                    token_time = start
+
+                if not draws:
+                    draws = rng.choices(samples, k=65536)
+                hold, was_answered, was_paid = draws.pop()
+                attempts[customer] += 1
+                calls += 1
+                line_seconds += hold
+                free_lines -= 1
+
+                if was_answered:
+                    answered += 1
+                    if was_paid:
+                        paid += 1
+                    retry = -1
+                else:
+                    retry = customer if attempts[customer] < retry_attempts else -1
+
+                # The end event carries the customer to redial, or -1
+                heappush(events, (start + hold, seq, retry))
+                seq += 1
+
+            if retries and (not events or retries[0][0] <= events[0][0]):
+                now, customer = retries.popleft()
+                ready.append(customer)
+            elif events:
+                now, _, customer = heappop(events)
+                free_lines += 1
+                if customer >= 0:
+                    retries.append((now + retry_delay, customer))
+            else:
+                break
+
+        elapsed = time.perf_counter() - started
+        makespan = now
+
+        return {
+            "customers": customers,
+            "calls": calls,
+            "lines": self.lines,
+            "completion_seconds": makespan,
+            "completion_hours": makespan / 3600,
+            "line_utilization": line_seconds / (self.lines * makespan) if makespan else 0.0,
+            "line_hours": line_seconds / 3600,
+            "avg_rate_limit_wait_seconds": rate_wait / calls if calls else 0.0,
+            "contacts": answered,
+            "contact_yield": answered / customers if customers else 0.0,
+            "payments": paid,
+            "payment_yield": paid / customers if customers else 0.0,
+            "calls_per_contact": calls / answered if answered else None,
+            "simulation_seconds": elapsed,
+        }
+
+    def run_many(self, customers: int, runs: int, seed: Optional[int] = None) -> dict:
+        """Repeat the simulation and report the mean and spread of the key figures"""
+        rng = random.Random(seed)
+        results = [self.run(customers, seed=rng.randrange(2 ** 32)) for _ in range(runs)]
+
+        def spread(key: str) -> dict:
+            values = sorted(r[key] for r in results)
+            return {
+                "mean": sum(values) / len(values),
+                "p10": values[int((len(values) - 1) * 0.1)],
+                "p90": values[int((len(values) - 1) * 0.9)],
+            }
+
+        return {
+            "runs": runs,
+            "completion_hours": spread("completion_hours"),
+            "line_utilization": spread("line_utilization"),
+            "contact_yield": spread("contact_yield"),
+            "payment_yield": spread("payment_yield"),
+            "calls": spread("calls"),
+            "simulation_seconds": sum(r["simulation_seconds"] for r in results),
+        }
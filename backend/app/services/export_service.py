@@ -0,0 +1,121 @@
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.bill import Bill
+from app.models.call_log import CallLog
+from app.models.payment import Payment
+from app.schemas.bill import BillResponse
+from app.schemas.call import CallLogResponse
+from app.schemas.payment import PaymentResponse
+from app.config import get_settings
+from datetime import datetime
+from typing import Any, Iterator, Optional
+import csv
+import enum
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def get_export_columns(model, schema, exclude: tuple = ()) -> list:
+    """Table columns that the API returns for the model, in table order"""
+    return [
+        column for column in model.__table__.columns
+        if column.name in schema.model_fields and column.name not in exclude
+    ]
+
+
+# Exports carry the same fields as the API responses. Call transcripts are
+# left out; they are stored per utterance and returned by GET /api/calls/{id}
+EXPORTS = {
+    "bills": (Bill, get_export_columns(Bill, BillResponse)),
+    "calls": (CallLog, get_export_columns(CallLog, CallLogResponse, exclude=("transcript",))),
+    "payments": (Payment, get_export_columns(Payment, PaymentResponse)),
+}
+
+
+def to_export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_export(
+    name: str,
+    fmt: str,
+    status: Optional[enum.Enum] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Rows of an export as CSV or NDJSON text, a batch at a time
+
+    Rows are read in ID order through a server-side cursor (yield_per), so
+    memory stays flat whatever the table size. The generator opens its own
+    session because it runs after the request's session is closed.
+
+    Args:
+        status: Only rows with this status
+        since: Only rows created at or after this time
+        until: Only rows created before this time
+    """
+    model, columns = EXPORTS[name]
+    batch_size = batch_size or settings.export_batch_size
+
+    query = select(*columns).order_by(model.id)
+    if status is not None:
+        query = query.where(model.status == status)
+    if since:
+        query = query.where(model.created_at >= since)
+    if until:
+        query = query.where(model.created_at < until)
+
+    names = [column.name for column in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(names)
+
+    db = SessionLocal()
+    rows = 0
+    try:
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            for row in partition:
+                values = [to_export_value(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(names, values)), default=str, separators=(",", ":")) + "\n")
+            rows += len(partition)
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # The CSV header when there were no rows
+        if buffer.tell():
+            yield buffer.getvalue()
+
+        logger.info(f"Exported {rows} {name} as {fmt}")
+
+    except Exception as e:
+        # Headers are already sent; the client sees a truncated download
+        logger.error(f"Export of {name} failed after {rows} rows: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def get_export_filename(name: str, fmt: str) -> str:
+    return f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{fmt}"
@@ -0,0 +1,117 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.idempotency_key import IdempotencyKey
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Any, Optional, Tuple
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PURGE_INTERVAL = timedelta(minutes=10)
+_last_purge: Optional[datetime] = None
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key cannot be honoured for this request"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IdempotencyService:
+    """Stores responses by Idempotency-Key so client retries are replayed, not repeated"""
+
+    @staticmethod
+    def hash_request(payload: Any) -> str:
+        """Fingerprint a request body so a reused key with a different body is rejected"""
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def begin(
+        db: Session,
+        key: str,
+        scope: str,
+        request_hash: str
+    ) -> Tuple[Optional[IdempotencyKey], Optional[Tuple[int, Any]]]:
+        """
+        Reserve a key before processing a request
+
+        Returns:
+            (record, None) when the request should be processed, or
+            (None, (status_code, body)) when a stored response should be replayed
+
+        Raises:
+            IdempotencyConflict: if the key is in use by a different or unfinished request
+        """
+        global _last_purge
+        now = datetime.utcnow()
+        if _last_purge is None or now - _last_purge > PURGE_INTERVAL:
+            _last_purge = now
+            IdempotencyService.purge_expired(db)
+
+        record = IdempotencyKey(
+            key=key,
+            scope=scope,
+            request_hash=request_hash,
+            expires_at=now + timedelta(hours=settings.idempotency_key_ttl_hours)
+        )
+
+        db.add(record)
+        try:
+            db.commit()
+            return record, None
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.query(IdempotencyKey).filter(
+            IdempotencyKey.key == key,
+            IdempotencyKey.scope == scope
+        ).first()
+
+        if existing and existing.expires_at <= now:
+            # Expired keys are free to reuse
+            db.delete(existing)
+            db.commit()
+            return IdempotencyService.begin(db, key, scope, request_hash)
+
+        if not existing:
+            return IdempotencyService.begin(db, key, scope, request_hash)
+
+        if existing.request_hash != request_hash:
+            raise IdempotencyConflict(422, "Idempotency-Key was already used with a different request")
+
+        if existing.response_status is None:
+            raise IdempotencyConflict(409, "A request with this Idempotency-Key is still in progress")
+
+        logger.info(f"Replaying stored response for Idempotency-Key {key} on {scope}")
+        return None, (existing.response_status, json.loads(existing.response_body))
+
+    @staticmethod
+    def complete(db: Session, record: IdempotencyKey, status_code: int, body: Any):
+        """Store the response of a finished request"""
+        record.response_status = status_code
+        record.response_body = json.dumps(body, default=str)
+        db.commit()
+
+    @staticmethod
+    def abandon(db: Session, record: IdempotencyKey):
+        """Release a key whose request failed, so the client may retry with it"""
+        db.rollback()
+        db.delete(record)
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Delete expired keys"""
+        deleted = db.query(IdempotencyKey).filter(
+            IdempotencyKey.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
@@ -0,0 +1,110 @@
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from app.database import SessionLocal, run_in_session
+from app.models.worker_lease import WorkerLease
+from app.services.bill_service import BillService
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class OverdueMarker:
+    """
+    Marks unpaid bills past their due date as overdue, every few minutes.
+
+    The overdue list and its counter-backed total read bills already marked,
+    so requests never run the update scan. Like the call reconciler, every
+    API process starts the loop but only the holder of the marker's row in
+    worker_leases runs a pass, so the counters are not moved twice for the
+    same bill.
+    """
+
+    LEASE_NAME = "overdue_marker"
+
+    def __init__(self, interval: int, lease_seconds: int):
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic marking loop"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the marking loop"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await asyncio.to_thread(self._release_lease)
+
+    async def run(self):
+        logger.info(f"Overdue marker {self.worker_id} started")
+        while True:
+            try:
+                if await asyncio.to_thread(self._claim_lease):
+                    marked = await asyncio.to_thread(run_in_session, BillService.mark_overdue_bills)
+                    if marked:
+                        logger.info(f"Marked {marked} bills overdue")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Overdue marker error: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def _claim_lease(self) -> bool:
+        """Take or renew the marker lease; False if another live process holds it"""
+        db = SessionLocal()
+        try:
+            if db.query(WorkerLease.name).filter(WorkerLease.name == self.LEASE_NAME).first() is None:
+                db.add(WorkerLease(name=self.LEASE_NAME))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Another process created it first
+                    db.rollback()
+
+            now = datetime.utcnow()
+            result = db.execute(
+                update(WorkerLease)
+                .where(
+                    WorkerLease.name == self.LEASE_NAME,
+                    or_(
+                        WorkerLease.owner.is_(None),
+                        WorkerLease.owner == self.worker_id,
+                        WorkerLease.expires_at < now
+                    )
+                )
+                .values(owner=self.worker_id, expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def _release_lease(self):
+        """Give up the lease so another process takes over at its next pass"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(WorkerLease)
+                .where(WorkerLease.name == self.LEASE_NAME, WorkerLease.owner == self.worker_id)
+                .values(owner=None, expires_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+overdue_marker = OverdueMarker(
+    interval=settings.overdue_marker_interval,
+    lease_seconds=settings.overdue_marker_lease_seconds
+)
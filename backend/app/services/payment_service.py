@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
 from app.schemas.payment import PaymentCreate, PaymentUpdate
@@ -7,6 +9,36 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Map gateway status to internal status
+GATEWAY_STATUS_MAPPING = {
+    "success": PaymentStatus.COMPLETED,
+    "completed": PaymentStatus.COMPLETED,
+    "failed": PaymentStatus.FAILED,
+    "pending": PaymentStatus.PROCESSING
+}
+
+
+def apply_payment_callback(
+    payment: Payment,
+    transaction_id: str,
+    status: str,
+    payment_method: Optional[str] = None,
+    gateway_response: Optional[str] = None
+):
+    """Copy a gateway callback onto the payment"""
+    payment.status = GATEWAY_STATUS_MAPPING.get(status.lower(), PaymentStatus.PROCESSING)
+    payment.transaction_id = transaction_id
+    payment.gateway_response = gateway_response
+    
+    if payment.status == PaymentStatus.COMPLETED:
+        payment.payment_date = datetime.utcnow()
+    
+    if payment_method:
+        try:
+            payment.payment_method = PaymentMethod(payment_method.lower())
+        except ValueError:
+            payment.payment_method = PaymentMethod.OTHER
+
 
 class PaymentService:
     """Service for payment processing operations"""
@@ -115,29 +147,58 @@ class PaymentService:
             logger.error(f"Payment not found for callback: {payment_id}")
             return None
         
-        # Map gateway status to internal status
-        status_mapping = {
-            "success": PaymentStatus.COMPLETED,
-            "completed": PaymentStatus.COMPLETED,
-            "failed": PaymentStatus.FAILED,
-            "pending": PaymentStatus.PROCESSING
-        }
+        apply_payment_callback(payment, transaction_id, status, payment_method, gateway_response)
         
-        payment.status = status_mapping.get(status.lower(), PaymentStatus.PROCESSING)
-        payment.transaction_id = transaction_id
-        payment.gateway_response = gateway_response
+        db.commit()
+        db.refresh(payment)
         
-        if payment.status == PaymentStatus.COMPLETED:
-            payment.payment_date = datetime.utcnow()
+        logger.info(f"Payment callback processed: {payment_id}, Status: {payment.status}")
+        return payment
+
+
+class AsyncPaymentService:
+    """PaymentService for async routes, on an AsyncSession"""
+    
+    @staticmethod
+    async def create_payment(db: AsyncSession, payment_data: PaymentCreate) -> Payment:
+        """Create a new payment record"""
+        payment = Payment(**payment_data.model_dump())
         
-        if payment_method:
-            try:
-                payment.payment_method = PaymentMethod(payment_method.lower())
-            except ValueError:
-                payment.payment_method = PaymentMethod.OTHER
+        db.add(payment)
+        await db.commit()
+        await db.refresh(payment)
+        return payment
+    
+    @staticmethod
+    async def get_payment(db: AsyncSession, payment_id: str) -> Optional[Payment]:
+        """Get payment by payment ID"""
+        return await db.scalar(select(Payment).where(Payment.payment_id == payment_id).limit(1))
+    
+    @staticmethod
+    async def get_payment_by_bill(db: AsyncSession, bill_id: int) -> Optional[Payment]:
+        """Get payment for a specific bill"""
+        return await db.scalar(select(Payment).where(Payment.bill_id == bill_id).limit(1))
+    
+    @staticmethod
+    async def process_payment_callback(
+        db: AsyncSession,
+        payment_id: str,
+        transaction_id: str,
+        status: str,
+        payment_method: Optional[str] = None,
+        gateway_response: Optional[str] = None
+    ) -> Optional[Payment]:
+        """Process payment gateway callback"""
+        payment = await AsyncPaymentService.get_payment(db, payment_id)
         
-        db.commit()
-        db.refresh(payment)
+        if not payment:
+            logger.error(f"Payment not found for callback: {payment_id}")
+            return None
+        
+        apply_payment_callback(payment, transaction_id, status, payment_method, gateway_response)
+        
+        await db.commit()
+        await db.refresh(payment)
         
         logger.info(f"Payment callback processed: {payment_id}, Status: {payment.status}")
         return payment
@@ -0,0 +1,131 @@
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.call_leases import CallLeaseStore, number_pool
+from app.services.call_limiter import CallLimitExceeded
+from typing import Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PhoneNumberPool:
+    """
+    Assigns an outbound VAPI phone number to each call.
+
+    Numbers are picked least-loaded first (or round-robin), skipping numbers
+    at their concurrent call cap. Each number has its own pool of slot rows
+    in the call_leases table, taken under the call's lease key, so the cap
+    holds across processes and the slot is freed together with the call
+    limiter's when the webhook handler sees the call end.
+    """
+
+    def __init__(
+        self,
+        phone_number_ids: List[str],
+        max_calls_per_number: int,
+        max_concurrent_calls: int,
+        strategy: str,
+        max_wait: float,
+        lease_seconds: float
+    ):
+        if not phone_number_ids:
+            raise ValueError("At least one VAPI phone number ID is required")
+
+        self.phone_number_ids = phone_number_ids
+        self.max_calls_per_number = max_calls_per_number
+        # An uncapped number can never carry more calls than the limiter lets through
+        self.slots_per_number = max_calls_per_number or max_concurrent_calls
+        self.strategy = strategy
+        self.max_wait = max_wait
+        self.lease_seconds = lease_seconds
+
+        self._round_robin = itertools.cycle(range(len(phone_number_ids)))
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots_ready = False
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _candidates(self, live: Dict[str, int]) -> List[str]:
+        if self.strategy == "round_robin":
+            start = next(self._round_robin)
+            return self.phone_number_ids[start:] + self.phone_number_ids[:start]
+        return sorted(self.phone_number_ids, key=lambda n: live.get(number_pool(n), 0))
+
+    def _assign(self, lease_key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            if not self._slots_ready:
+                for number_id in self.phone_number_ids:
+                    CallLeaseStore.ensure_slots(db, number_pool(number_id), self.slots_per_number)
+                self._slots_ready = True
+
+            live = CallLeaseStore.count_live(db, self.lease_seconds)
+            for number_id in self._candidates(live):
+                if CallLeaseStore.acquire(db, number_pool(number_id), self.slots_per_number, lease_key, self.lease_seconds):
+                    return number_id
+            return None
+        finally:
+            db.close()
+
+    async def acquire(self, lease_key: str) -> str:
+        """
+        Assign a phone number to a pending call
+
+        Raises:
+            CallLimitExceeded: if every number stays at its cap for max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        self._loop = asyncio.get_running_loop()
+
+        async with self.condition:
+            while True:
+                number_id = await asyncio.to_thread(self._assign, lease_key)
+                if number_id:
+                    return number_id
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CallLimitExceeded("All outbound phone numbers are at capacity")
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout=min(remaining, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _notify(self):
+        async with self.condition:
+            self.condition.notify()
+
+    def wake(self):
+        """Let a waiter retry at once after a number was freed; safe from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._notify(), self._loop)
+
+    def get_live_calls(self, db: Session) -> Dict[str, int]:
+        """Live call count per phone number ID"""
+        live = CallLeaseStore.count_live(db, self.lease_seconds)
+        return {number_id: live.get(number_pool(number_id), 0) for number_id in self.phone_number_ids}
+
+
+def get_configured_phone_number_ids() -> List[str]:
+    """Phone number IDs from VAPI_PHONE_NUMBER_IDS, or the single VAPI_PHONE_NUMBER_ID"""
+    phone_number_ids = [n.strip() for n in settings.vapi_phone_number_ids.split(",") if n.strip()]
+    return phone_number_ids or [settings.vapi_phone_number_id]
+
+
+phone_number_pool = PhoneNumberPool(
+    phone_number_ids=get_configured_phone_number_ids(),
+    max_calls_per_number=settings.vapi_max_calls_per_number,
+    max_concurrent_calls=settings.vapi_max_concurrent_calls,
+    strategy=settings.vapi_number_selection,
+    max_wait=settings.vapi_call_queue_max_wait,
+    lease_seconds=settings.max_call_duration + settings.vapi_call_lease_grace
+)
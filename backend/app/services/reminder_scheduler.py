@@ -0,0 +1,209 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, run_in_session
+from app.models.bill import Bill, BillStatus
+from app.services.twilio_service import TwilioService
+from app.config import get_settings
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+twilio_service = TwilioService()
+
+CLOSED_BILL_STATUSES = (BillStatus.PAID, BillStatus.CANCELLED)
+
+
+class ReminderScheduler:
+    """
+    Fires reminders when Bill.next_reminder_date comes due.
+
+    Upcoming reminders are kept in a min-heap loaded from the indexed
+    next_reminder_date column, at most `window` rows at a time. The loop
+    sleeps until the earliest reminder is due or the heap changes, so an
+    idle scheduler costs nothing regardless of table size. BillService
+    pushes changes in through schedule() and discard().
+
+    Off by default: with the "call" channel a due reminder dials the
+    customer, so it is enabled deliberately with REMINDER_SCHEDULER_ENABLED.
+    """
+
+    def __init__(self, window: int, resync_seconds: int):
+        self.window = window
+        self.resync_seconds = resync_seconds
+
+        self._heap: List[Tuple[datetime, int]] = []
+        self._entries: Dict[int, datetime] = {}
+        # Everything due at or before the horizon is in the heap; None means
+        # the whole table fit in the window
+        self._horizon: Optional[datetime] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Changes that arrive while a reload query is running, replayed on top of it
+        self._changes_during_load: Optional[List[Tuple[int, Optional[datetime]]]] = None
+
+    def start(self):
+        """Start the scheduler loop on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the scheduler loop"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._loop = None
+
+    def schedule(self, bill_id: int, when: Optional[datetime]):
+        """Record a bill's new reminder time; safe to call from any thread"""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._schedule, bill_id, when)
+
+    def discard(self, bill_id: int):
+        """Forget a bill's reminder (paid, cancelled or deleted)"""
+        self.schedule(bill_id, None)
+
+    def _schedule(self, bill_id: int, when: Optional[datetime]):
+        if self._changes_during_load is not None:
+            self._changes_during_load.append((bill_id, when))
+
+        # Heap entries are removed lazily: an entry is live only while it
+        # matches the bill's current time in _entries
+        self._entries.pop(bill_id, None)
+
+        if when and (self._horizon is None or when <= self._horizon):
+            self._entries[bill_id] = when
+            heapq.heappush(self._heap, (when, bill_id))
+
+        self._wakeup.set()
+
+    def _fetch_upcoming(self) -> List[Tuple[int, datetime]]:
+        db = SessionLocal()
+        try:
+            return db.query(Bill.id, Bill.next_reminder_date).filter(
+                Bill.next_reminder_date.isnot(None),
+                Bill.status.notin_(CLOSED_BILL_STATUSES)
+            ).order_by(Bill.next_reminder_date).limit(self.window).all()
+        finally:
+            db.close()
+
+    async def _load(self):
+        self._changes_during_load = []
+        try:
+            rows = await asyncio.to_thread(self._fetch_upcoming)
+        except BaseException:
+            self._changes_during_load = None
+            raise
+
+        changes, self._changes_during_load = self._changes_during_load, None
+
+        self._entries = {bill_id: when for bill_id, when in rows}
+        self._heap = [(when, bill_id) for bill_id, when in rows]
+        heapq.heapify(self._heap)
+        self._horizon = rows[-1][1] if len(rows) >= self.window else None
+
+        for bill_id, when in changes:
+            self._schedule(bill_id, when)
+
+    async def run(self):
+        """Sleep until the next reminder is due and dispatch it"""
+        logger.info("Reminder scheduler started")
+        loop = asyncio.get_running_loop()
+        last_load = None
+
+        while True:
+            try:
+                # Reload when the window is used up, and periodically to pick
+                # up changes made by other processes
+                if last_load is None or loop.time() - last_load > self.resync_seconds or (
+                    not self._heap and self._horizon is not None
+                ):
+                    await self._load()
+                    last_load = loop.time()
+
+                while self._heap and self._entries.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+
+                timeout = self.resync_seconds
+                if self._heap:
+                    due, bill_id = self._heap[0]
+                    delay = (due - datetime.utcnow()).total_seconds()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        del self._entries[bill_id]
+                        await self._dispatch(bill_id, due)
+                        continue
+                    timeout = min(delay, timeout)
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _dispatch(self, bill_id: int, due: datetime):
+        try:
+            sms = await asyncio.to_thread(run_in_session, self._claim, bill_id, due)
+            if sms:
+                bill_number, to_number, bill_amount, payment_link = sms
+                result = await twilio_service.send_reminder(
+                    to_number=to_number,
+                    bill_amount=bill_amount,
+                    payment_link=payment_link
+                )
+                logger.info(f"Reminder SMS for bill {bill_number}: {result.get('success')}")
+
+        except Exception as e:
+            logger.error(f"Failed to send reminder for bill {bill_id}: {str(e)}")
+
+    @staticmethod
+    def _claim(db: Session, bill_id: int, due: datetime) -> Optional[Tuple[str, str, float, Optional[str]]]:
+        """
+        Claim a due reminder by clearing it; only one process wins.
+
+        A reminder call is queued in the same transaction, so the reminder
+        is cleared only if the job was stored. For an SMS reminder, returns
+        what the caller needs to send it.
+        """
+        # Imported here because CallJobService depends on BillService, which
+        # notifies this scheduler
+        from app.services.call_job_service import CallJobService
+
+        result = db.execute(
+            update(Bill)
+            .where(
+                Bill.id == bill_id,
+                Bill.next_reminder_date == due,
+                Bill.status.notin_(CLOSED_BILL_STATUSES)
+            )
+            .values(next_reminder_date=None)
+        )
+        if result.rowcount != 1:
+            return None
+
+        bill = db.query(Bill).filter(Bill.id == bill_id).first()
+
+        if settings.reminder_channel == "call" and bill.call_attempts < settings.call_retry_attempts:
+            job = CallJobService.enqueue(db, bill.id)
+            logger.info(f"Reminder call queued for bill {bill.bill_number}, job {job.id}")
+            return None
+
+        return bill.bill_number, bill.customer_phone, bill.bill_amount, bill.payment_link
+
+
+reminder_scheduler = ReminderScheduler(
+    window=settings.reminder_scheduler_window,
+    resync_seconds=settings.reminder_scheduler_resync_seconds
+)
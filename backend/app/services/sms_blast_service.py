@@ -0,0 +1,406 @@
+from sqlalchemy import update, or_, func
+from sqlalchemy.orm import Session
+from app.database import run_in_session
+from app.models.bill import Bill
+from app.models.sms_blast import SmsBlast, SmsBlastStatus, SmsBlastRecipient, SmsRecipientStatus
+from app.services.twilio_service import TwilioService
+from app.services.call_limiter import TokenBucket
+from app.services.reminder_scheduler import CLOSED_BILL_STATUSES
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import math
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+twilio_service = TwilioService()
+
+
+def get_overdue_filter(now: datetime) -> list:
+    """Filter for bills whose due date has passed and that are still open"""
+    return [Bill.due_date < now, Bill.status.notin_(CLOSED_BILL_STATUSES)]
+
+
+class SmsBlastService:
+    """Database side of bulk reminder SMS blasts"""
+
+    @staticmethod
+    def create_blast(
+        db: Session,
+        name: Optional[str] = None,
+        messages_per_second: Optional[float] = None,
+        messaging_service_sid: Optional[str] = None
+    ) -> SmsBlast:
+        """Record a new blast over the currently overdue bills"""
+        total = db.query(func.count(Bill.id)).filter(*get_overdue_filter(datetime.utcnow())).scalar()
+
+        blast = SmsBlast(
+            name=name,
+            status=SmsBlastStatus.RUNNING,
+            messages_per_second=min(
+                messages_per_second or settings.sms_blast_messages_per_second,
+                settings.sms_blast_max_messages_per_second
+            ),
+            messaging_service_sid=messaging_service_sid or settings.twilio_messaging_service_sid or None,
+            total=total,
+            started_at=datetime.utcnow()
+        )
+        db.add(blast)
+        db.commit()
+        db.refresh(blast)
+        return blast
+
+    @staticmethod
+    def get_blast(db: Session, blast_id: int) -> Optional[SmsBlast]:
+        return db.query(SmsBlast).filter(SmsBlast.id == blast_id).first()
+
+    @staticmethod
+    def list_blasts(db: Session, limit: int = 50) -> List[SmsBlast]:
+        return db.query(SmsBlast).order_by(SmsBlast.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def get_recipients(
+        db: Session,
+        blast_id: int,
+        status: Optional[SmsRecipientStatus] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[SmsBlastRecipient]:
+        """Per-recipient results of a blast"""
+        query = db.query(SmsBlastRecipient).filter(SmsBlastRecipient.blast_id == blast_id)
+        if status:
+            query = query.filter(SmsBlastRecipient.status == status)
+        return query.order_by(SmsBlastRecipient.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def snapshot_chunk(db: Session, blast: SmsBlast, chunk_size: int) -> int:
+        """Add recipients for the next overdue bills in ID order"""
+        bills = db.query(Bill.id, Bill.customer_phone).filter(
+            Bill.id > blast.last_bill_id,
+            *get_overdue_filter(datetime.utcnow())
+        ).order_by(Bill.id).limit(chunk_size).all()
+
+        db.add_all([
+            SmsBlastRecipient(blast_id=blast.id, bill_id=bill_id, to_number=phone)
+            for bill_id, phone in bills
+        ])
+        if bills:
+            blast.last_bill_id = bills[-1].id
+
+        recipients = db.query(func.count(SmsBlastRecipient.id)).filter(
+            SmsBlastRecipient.blast_id == blast.id
+        ).scalar() + len(bills)
+
+        if len(bills) < chunk_size:
+            # Bills that became overdue after the blast started are included up to here
+            blast.snapshot_complete = 1
+            blast.total = recipients
+        else:
+            blast.total = max(blast.total, recipients)
+
+        db.commit()
+        return len(bills)
+
+    @staticmethod
+    def claim(db: Session, blast_id: int, owner: str, stale_seconds: int) -> bool:
+        """Take over a running blast unless another live process is sending it"""
+        now = datetime.utcnow()
+        result = db.execute(
+            update(SmsBlast)
+            .where(
+                SmsBlast.id == blast_id,
+                SmsBlast.status == SmsBlastStatus.RUNNING,
+                or_(
+                    SmsBlast.owner.is_(None),
+                    SmsBlast.owner == owner,
+                    SmsBlast.heartbeat_at < now - timedelta(seconds=stale_seconds)
+                )
+            )
+            .values(owner=owner, heartbeat_at=now)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def heartbeat(db: Session, blast_id: int, owner: str) -> bool:
+        """Mark a blast as still being sent; False if another process owns it"""
+        result = db.execute(
+            update(SmsBlast)
+            .where(SmsBlast.id == blast_id, SmsBlast.owner == owner)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def get_running_ids(db: Session) -> List[int]:
+        return [blast_id for (blast_id,) in db.query(SmsBlast.id).filter(SmsBlast.status == SmsBlastStatus.RUNNING)]
+
+    @staticmethod
+    def record_error(db: Session, blast_id: int, error: str):
+        db.execute(update(SmsBlast).where(SmsBlast.id == blast_id).values(last_error=error))
+        db.commit()
+
+    @staticmethod
+    def release(db: Session, blast_id: int, owner: str):
+        """Give up a blast so another process can resume it at once"""
+        db.execute(
+            update(SmsBlast)
+            .where(SmsBlast.id == blast_id, SmsBlast.owner == owner)
+            .values(owner=None)
+        )
+        db.commit()
+
+    @staticmethod
+    def set_status(db: Session, blast_id: int, status: SmsBlastStatus) -> Optional[SmsBlast]:
+        """Pause, resume or cancel a blast"""
+        blast = SmsBlastService.get_blast(db, blast_id)
+        if not blast:
+            return None
+
+        allowed_from = {
+            SmsBlastStatus.PAUSED: (SmsBlastStatus.RUNNING,),
+            SmsBlastStatus.RUNNING: (SmsBlastStatus.PAUSED,),
+            SmsBlastStatus.CANCELLED: (SmsBlastStatus.RUNNING, SmsBlastStatus.PAUSED),
+        }
+        if blast.status not in allowed_from.get(status, ()):
+            raise ValueError(f"Cannot change blast from {blast.status.value} to {status.value}")
+
+        blast.status = status
+        if status == SmsBlastStatus.CANCELLED:
+            blast.finished_at = datetime.utcnow()
+        db.commit()
+        db.refresh(blast)
+        return blast
+
+
+class SmsBlastRunner:
+    """
+    Sends the reminders of running blasts from this process.
+
+    Recipients are snapshotted from the overdue bills a chunk at a time, in
+    bill ID order, and sent by a pool of concurrent senders sharing a token
+    bucket at the blast's messages-per-second rate. Results are written
+    about once a second, so after a crash or restart a blast resumes from
+    its pending recipients and at most the last second of sends is
+    repeated. A heartbeat on the blast row, refreshed on a timer whatever
+    the send rate, keeps two processes from sending the same blast.
+
+    Database work runs in worker threads with a session per step, so the
+    event loop only waits on Twilio and the token bucket.
+    """
+
+    def __init__(self, concurrency: int, chunk_size: int, stale_seconds: int):
+        self.concurrency = max(concurrency, 1)
+        self.chunk_size = max(chunk_size, 1)
+        self.stale_seconds = stale_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._stopping: Set[int] = set()
+
+    def start(self, blast_id: int) -> bool:
+        """Start sending a blast this process has claimed"""
+        # A task still finishing a chunk after a pause simply carries on
+        self._stopping.discard(blast_id)
+        task = self._tasks.get(blast_id)
+        if not task or task.done():
+            self._tasks[blast_id] = asyncio.create_task(self._run(blast_id))
+        return True
+
+    async def resume(self, blast_id: int) -> bool:
+        """Claim a running blast and send it from this process"""
+        claimed = await asyncio.to_thread(
+            run_in_session, SmsBlastService.claim, blast_id, self.owner, self.stale_seconds
+        )
+        return claimed and self.start(blast_id)
+
+    async def resume_stale(self):
+        """Pick up running blasts left behind by a stopped process"""
+        try:
+            for blast_id in await asyncio.to_thread(run_in_session, SmsBlastService.get_running_ids):
+                if await self.resume(blast_id):
+                    logger.info(f"Resumed SMS blast {blast_id}")
+        except Exception as e:
+            logger.error(f"Could not resume SMS blasts: {str(e)}")
+
+    def stop_sending(self, blast_id: int):
+        """Stop starting new sends for a paused or cancelled blast"""
+        self._stopping.add(blast_id)
+
+    async def stop(self, timeout: float = 10.0):
+        """Let in-flight sends finish, record them and release the blasts"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        self._stopping.update(self._tasks)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+
+    async def _run(self, blast_id: int):
+        bucket: Optional[TokenBucket] = None
+        heartbeat = asyncio.create_task(self._heartbeat(blast_id))
+        try:
+            while blast_id not in self._stopping:
+                chunk = await asyncio.to_thread(run_in_session, self._next_chunk, blast_id)
+                if chunk is None:
+                    return
+                messages_per_second, messaging_service_sid, rows = chunk
+
+                if bucket is None:
+                    # No burst: carriers enforce the rate per second
+                    bucket = TokenBucket(rate=messages_per_second, capacity=1.0)
+
+                if not await self._send_chunk(blast_id, rows, bucket, messaging_service_sid):
+                    logger.warning(f"SMS blast {blast_id} was taken over by another process")
+                    return
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"SMS blast {blast_id} stopped: {str(e)}")
+            await asyncio.to_thread(run_in_session, SmsBlastService.record_error, blast_id, str(e))
+        finally:
+            heartbeat.cancel()
+            try:
+                await asyncio.to_thread(run_in_session, SmsBlastService.release, blast_id, self.owner)
+            except Exception as e:
+                logger.warning(f"Could not release SMS blast {blast_id}: {str(e)}")
+
+    async def _heartbeat(self, blast_id: int):
+        """Keep the claim on a blast fresh while it is sent, however slowly"""
+        while True:
+            await asyncio.sleep(self.stale_seconds / 3)
+            try:
+                if not await asyncio.to_thread(run_in_session, SmsBlastService.heartbeat, blast_id, self.owner):
+                    logger.warning(f"SMS blast {blast_id} is owned by another process, stopping")
+                    self._stopping.add(blast_id)
+                    return
+            except Exception as e:
+                logger.warning(f"Could not refresh the heartbeat of SMS blast {blast_id}: {str(e)}")
+
+    def _next_chunk(self, db: Session, blast_id: int) -> Optional[Tuple[float, Optional[str], list]]:
+        """
+        (rate, messaging service, pending recipients) of the blast's next
+        chunk, snapshotting more recipients as needed; None when there is
+        nothing left for this process to send
+        """
+        while True:
+            blast = SmsBlastService.get_blast(db, blast_id)
+            if not blast or blast.status != SmsBlastStatus.RUNNING or blast.owner != self.owner:
+                return None
+
+            rows = db.query(
+                SmsBlastRecipient.id,
+                SmsBlastRecipient.to_number,
+                Bill.bill_amount,
+                Bill.payment_link,
+                Bill.status
+            ).join(Bill, Bill.id == SmsBlastRecipient.bill_id).filter(
+                SmsBlastRecipient.blast_id == blast_id,
+                SmsBlastRecipient.status == SmsRecipientStatus.PENDING
+            ).order_by(SmsBlastRecipient.id).limit(self.chunk_size).all()
+
+            if rows:
+                return blast.messages_per_second, blast.messaging_service_sid, rows
+
+            if blast.snapshot_complete:
+                blast.status = SmsBlastStatus.COMPLETED
+                blast.finished_at = datetime.utcnow()
+                blast.owner = None
+                db.commit()
+                logger.info(f"SMS blast {blast_id} completed: {blast.sent} sent, {blast.failed} failed")
+                return None
+
+            SmsBlastService.snapshot_chunk(db, blast, self.chunk_size)
+
+    async def _send_chunk(
+        self,
+        blast_id: int,
+        rows: list,
+        bucket: TokenBucket,
+        messaging_service_sid: Optional[str]
+    ) -> bool:
+        """Send a chunk of reminders; False if the blast is no longer ours"""
+        pending = list(reversed(rows))
+        results: List[dict] = []
+
+        async def sender():
+            while pending and blast_id not in self._stopping:
+                recipient_id, to_number, bill_amount, payment_link, bill_status = pending.pop()
+                if bill_status in CLOSED_BILL_STATUSES:
+                    results.append({"id": recipient_id, "status": SmsRecipientStatus.SKIPPED, "error_message": "Bill closed"})
+                    continue
+
+                await bucket.acquire(deadline=math.inf)
+                result = await twilio_service.send_reminder(
+                    to_number=to_number,
+                    bill_amount=bill_amount,
+                    payment_link=payment_link,
+                    messaging_service_sid=messaging_service_sid
+                )
+                results.append({
+                    "id": recipient_id,
+                    "status": SmsRecipientStatus.SENT if result.get("success") else SmsRecipientStatus.FAILED,
+                    "sms_sid": result.get("sid"),
+                    "error_message": result.get("error"),
+                    "sent_at": datetime.utcnow(),
+                })
+
+        senders = {asyncio.create_task(sender()) for _ in range(min(self.concurrency, len(rows)))}
+        owned = True
+        try:
+            while senders:
+                _, senders = await asyncio.wait(senders, timeout=1.0)
+                if results:
+                    batch = list(results)
+                    results.clear()
+                    owned = await asyncio.to_thread(run_in_session, self._record, blast_id, batch) and owned
+                    if not owned:
+                        self._stopping.add(blast_id)
+        finally:
+            for task in senders:
+                task.cancel()
+            if results:
+                await asyncio.to_thread(run_in_session, self._record, blast_id, list(results))
+        return owned
+
+    def _record(self, db: Session, blast_id: int, results: List[dict]) -> bool:
+        """Write recipient results and blast counters; False if another process owns the blast"""
+        counts = {status: 0 for status in (SmsRecipientStatus.SENT, SmsRecipientStatus.FAILED, SmsRecipientStatus.SKIPPED)}
+        last_error = None
+        for result in results:
+            counts[result["status"]] += 1
+            if result["status"] == SmsRecipientStatus.FAILED:
+                last_error = result.get("error_message")
+
+        db.execute(update(SmsBlastRecipient), [dict(result) for result in results])
+
+        values = {
+            "sent": SmsBlast.sent + counts[SmsRecipientStatus.SENT],
+            "failed": SmsBlast.failed + counts[SmsRecipientStatus.FAILED],
+            "skipped": SmsBlast.skipped + counts[SmsRecipientStatus.SKIPPED],
+            "heartbeat_at": datetime.utcnow(),
+        }
+        if last_error:
+            values["last_error"] = last_error
+
+        owned = db.execute(
+            update(SmsBlast).where(SmsBlast.id == blast_id, SmsBlast.owner == self.owner).values(**values)
+        ).rowcount == 1
+        db.commit()
+        return owned
+
+
+sms_blast_runner = SmsBlastRunner(
+    concurrency=settings.sms_blast_concurrency,
+    chunk_size=settings.sms_blast_chunk_size,
+    stale_seconds=settings.sms_blast_stale_seconds
+)
@@ -0,0 +1,59 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.sms_delivery import SmsDelivery, SMS_STATUS_RANKS
+from app.models.call_log import CallLog
+from typing import List, Optional
+
+
+class SmsDeliveryService:
+    """Delivery status of sent SMS, as reported by Twilio status callbacks"""
+    
+    @staticmethod
+    def record_status(db: Session, sid: str, status: str, error_code: Optional[int] = None) -> bool:
+        """
+        Store a status callback
+        
+        Returns:
+            False if the message already has a later status
+        """
+        status = status.lower()
+        rank = SMS_STATUS_RANKS.get(status, 0)
+        values = {"status": status, "status_rank": rank, "error_code": error_code}
+        
+        for _ in range(2):
+            result = db.execute(
+                update(SmsDelivery)
+                .where(SmsDelivery.sid == sid, SmsDelivery.status_rank <= rank)
+                .values(**values)
+            )
+            if result.rowcount == 1:
+                db.commit()
+                return True
+            
+            if db.query(SmsDelivery.sid).filter(SmsDelivery.sid == sid).first():
+                db.commit()
+                return False
+            
+            try:
+                db.add(SmsDelivery(sid=sid, **values))
+                db.commit()
+                return True
+            except IntegrityError:
+                # A concurrent callback for the same message inserted first
+                db.rollback()
+        
+        return False
+    
+    @staticmethod
+    def get_for_call_logs(db: Session, call_log_ids: List[int]) -> list:
+        """(call_log_id, sms_sid, status, error_code, updated_at) rows for call logs, in one query"""
+        return db.query(
+            CallLog.id,
+            CallLog.sms_sid,
+            SmsDelivery.status,
+            SmsDelivery.error_code,
+            SmsDelivery.updated_at
+        ).outerjoin(
+            SmsDelivery, SmsDelivery.sid == CallLog.sms_sid
+        ).filter(CallLog.id.in_(call_log_ids)).order_by(CallLog.id).all()
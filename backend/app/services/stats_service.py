@@ -0,0 +1,227 @@
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.bill import Bill, BillStatus
+from app.models.call_log import CallLog, CallStatus, CallOutcome
+from app.models.stats_counter import StatsCounter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+BILL_STATUS = "bill_status"
+CALL_STATUS = "call_status"
+CALL_OUTCOME = "call_outcome"
+
+# (kind, name) -> [count, amount]
+Deltas = Dict[Tuple[str, str], List[float]]
+
+DELTAS_KEY = "stats_deltas"
+
+
+def _name(value) -> str:
+    return getattr(value, "value", value)
+
+
+def add_delta(deltas: Deltas, kind: str, value, count: int, amount: float = 0.0):
+    if value is None:
+        return
+    delta = deltas.setdefault((kind, _name(value)), [0, 0.0])
+    delta[0] += count
+    delta[1] += amount
+
+
+class StatsService:
+    """
+    Bill and call totals for the dashboard, kept in the stats_counters table.
+
+    Every flush that adds, deletes or changes the status (or amount) of a
+    bill or call log adds its deltas to the counters in the same
+    transaction, so GET /api/stats reads a handful of rows instead of
+    scanning the tables. Bulk UPDATE and INSERT statements bypass the flush
+    and record their own deltas with apply.
+    """
+
+    @staticmethod
+    def apply(db: Session, deltas: Deltas):
+        """Add deltas to the counters in the current transaction"""
+        rows = [
+            {"kind": kind, "name": name, "count": count, "amount": amount}
+            for (kind, name), (count, amount) in sorted(deltas.items())
+            if count or amount
+        ]
+        if not rows:
+            return
+
+        # Sorted so concurrent transactions lock the counter rows in the same order
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(StatsCounter.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StatsCounter.kind, StatsCounter.name],
+            set_={
+                "count": StatsCounter.count + stmt.excluded.count,
+                "amount": StatsCounter.amount + stmt.excluded.amount,
+                "updated_at": func.now(),
+            }
+        )
+        db.connection().execute(stmt, rows)
+
+    @staticmethod
+    def bill_status_deltas(bills: Iterable[Tuple[Optional[BillStatus], float]], status: BillStatus) -> Deltas:
+        """Deltas for moving (status, amount) bills to a new status"""
+        deltas: Deltas = {}
+        for old_status, amount in bills:
+            add_delta(deltas, BILL_STATUS, old_status, -1, -(amount or 0.0))
+            add_delta(deltas, BILL_STATUS, status, 1, amount or 0.0)
+        return deltas
+
+    @staticmethod
+    def call_log_deltas(previous_status, previous_outcome, values: dict) -> Deltas:
+        """Deltas for writing status and outcome values over a call log's previous ones"""
+        deltas: Deltas = {}
+        for kind, column, previous in ((CALL_STATUS, "status", previous_status), (CALL_OUTCOME, "outcome", previous_outcome)):
+            if column in values and values[column] != previous:
+                add_delta(deltas, kind, previous, -1)
+                add_delta(deltas, kind, values[column], 1)
+        return deltas
+
+    @staticmethod
+    def rebuild(db: Session):
+        """Recount every counter from the bills and call_logs tables"""
+        deltas: Deltas = {}
+        for status, count, amount in db.query(
+            Bill.status, func.count(Bill.id), func.coalesce(func.sum(Bill.bill_amount), 0.0)
+        ).group_by(Bill.status):
+            add_delta(deltas, BILL_STATUS, status, count, amount)
+        for status, count in db.query(CallLog.status, func.count(CallLog.id)).group_by(CallLog.status):
+            add_delta(deltas, CALL_STATUS, status, count)
+        for outcome, count in db.query(CallLog.outcome, func.count(CallLog.id)).group_by(CallLog.outcome):
+            add_delta(deltas, CALL_OUTCOME, outcome, count)
+
+        db.query(StatsCounter).delete(synchronize_session=False)
+        StatsService.apply(db, deltas)
+        db.commit()
+        logger.info(f"Rebuilt {len(deltas)} stats counters")
+
+    @staticmethod
+    def ensure_counters(db: Session):
+        """Count the tables once when the counters have never been filled"""
+        if db.query(StatsCounter.kind).first() is None and (
+            db.query(Bill.id).first() is not None or db.query(CallLog.id).first() is not None
+        ):
+            StatsService.rebuild(db)
+
+    @staticmethod
+    def get_counters(db: Session) -> Dict[str, Dict[str, StatsCounter]]:
+        counters: Dict[str, Dict[str, StatsCounter]] = {}
+        for counter in db.query(StatsCounter):
+            counters.setdefault(counter.kind, {})[counter.name] = counter
+        return counters
+
+    @staticmethod
+    def count_bills(db: Session, status: Optional[BillStatus] = None) -> int:
+        """Number of bills, or of bills with a status, from the counters"""
+        query = db.query(func.coalesce(func.sum(StatsCounter.count), 0)).filter(StatsCounter.kind == BILL_STATUS)
+        if status:
+            query = query.filter(StatsCounter.name == status.value)
+        return query.scalar()
+
+    @staticmethod
+    def get_stats(db: Session) -> dict:
+        """Bill counts and amounts by status, collection rate and call counts"""
+        counters = StatsService.get_counters(db)
+        bill_counters = counters.get(BILL_STATUS, {})
+
+        by_status = {
+            status.value: {
+                "count": bill_counters[status.value].count if status.value in bill_counters else 0,
+                "amount": round(bill_counters[status.value].amount, 2) if status.value in bill_counters else 0.0,
+            }
+            for status in BillStatus
+        }
+        total = sum(item["count"] for item in by_status.values())
+        total_amount = round(sum(item["amount"] for item in by_status.values()), 2)
+        paid = by_status[BillStatus.PAID.value]
+
+        call_statuses = {status.value: 0 for status in CallStatus}
+        call_statuses.update({name: counter.count for name, counter in counters.get(CALL_STATUS, {}).items()})
+        outcomes = {outcome.value: 0 for outcome in CallOutcome}
+        outcomes.update({name: counter.count for name, counter in counters.get(CALL_OUTCOME, {}).items()})
+
+        return {
+            "bills": {
+                "total": total,
+                "total_amount": total_amount,
+                "by_status": by_status,
+            },
+            "collection_rate": round(paid["count"] / total * 100, 1) if total else 0.0,
+            "amount_collection_rate": round(paid["amount"] / total_amount * 100, 1) if total_amount else 0.0,
+            "calls": {
+                "total": sum(call_statuses.values()),
+                "by_status": call_statuses,
+                "by_outcome": outcomes,
+            },
+        }
+
+
+def _history(obj, attribute: str):
+    """(value before the flush, value after it) of an attribute"""
+    history = inspect(obj).attrs[attribute].history
+    if history.added:
+        return (history.deleted[0] if history.deleted else None), history.added[0]
+    value = getattr(obj, attribute)
+    return value, value
+
+
+def _collect_deltas(session: Session, flush_context, instances):
+    deltas: Deltas = {}
+
+    for obj in session.new:
+        if isinstance(obj, Bill):
+            add_delta(deltas, BILL_STATUS, obj.status or BillStatus.PENDING, 1, obj.bill_amount or 0.0)
+        elif isinstance(obj, CallLog):
+            add_delta(deltas, CALL_STATUS, obj.status or CallStatus.INITIATED, 1)
+            add_delta(deltas, CALL_OUTCOME, obj.outcome, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Bill):
+            add_delta(deltas, BILL_STATUS, obj.status, -1, -(obj.bill_amount or 0.0))
+        elif isinstance(obj, CallLog):
+            add_delta(deltas, CALL_STATUS, obj.status, -1)
+            add_delta(deltas, CALL_OUTCOME, obj.outcome, -1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Bill) and session.is_modified(obj):
+            old_status, status = _history(obj, "status")
+            old_amount, amount = _history(obj, "bill_amount")
+            if (old_status, old_amount) != (status, amount):
+                add_delta(deltas, BILL_STATUS, old_status, -1, -(old_amount or 0.0))
+                add_delta(deltas, BILL_STATUS, status, 1, amount or 0.0)
+        elif isinstance(obj, CallLog) and session.is_modified(obj):
+            for kind, attribute in ((CALL_STATUS, "status"), (CALL_OUTCOME, "outcome")):
+                old_value, value = _history(obj, attribute)
+                if old_value != value:
+                    add_delta(deltas, kind, old_value, -1)
+                    add_delta(deltas, kind, value, 1)
+
+    session.info[DELTAS_KEY] = deltas
+
+
+def _write_deltas(session: Session, flush_context):
+    deltas = session.info.pop(DELTAS_KEY, None)
+    if deltas:
+        StatsService.apply(session, deltas)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Every session, including the ones under AsyncSession, keeps the counters
+event.listen(Session, "before_flush", _collect_deltas)
+event.listen(Session, "after_flush", _write_deltas)
+
+# Load the stored value when an expired attribute is assigned, so the flush
+# knows which counter the row leaves
+for attribute in (Bill.status, Bill.bill_amount, CallLog.status, CallLog.outcome):
+    event.listen(attribute, "set", _load_previous_value, active_history=True)
@@ -0,0 +1,92 @@
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.call_log import CallLog
+from app.models.transcript_segment import TranscriptSegment
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptService:
+    """
+    Append-only transcript storage.
+
+    Each final utterance is inserted as its own row instead of rewriting
+    the growing call_logs.transcript column. The text is written to the
+    call log at end of call, and again when an utterance arrives after it.
+    """
+
+    @staticmethod
+    def get_last_seq(db: Session, call_log_id: int) -> int:
+        """Sequence number of the last utterance recorded for a call (0 if none)"""
+        last_seq = db.query(func.max(TranscriptSegment.seq)).filter(
+            TranscriptSegment.call_log_id == call_log_id
+        ).scalar()
+        return last_seq or 0
+
+    @staticmethod
+    def append_segment(
+        db: Session,
+        call_log_id: int,
+        role: str,
+        text: str,
+        seq: Optional[int] = None,
+        attempts: int = 3
+    ) -> TranscriptSegment:
+        """
+        Add an utterance; seq defaults to the one after the last recorded
+
+        Callers number utterances from a per-process cache, so another
+        process may have taken seq first. The insert runs in a savepoint and
+        a conflicting seq is retried after the last one in the database.
+        """
+        if seq is None:
+            seq = TranscriptService.get_last_seq(db, call_log_id) + 1
+
+        for attempt in range(attempts):
+            segment = TranscriptSegment(call_log_id=call_log_id, seq=seq, role=role, text=text)
+            try:
+                with db.begin_nested():
+                    db.add(segment)
+                return segment
+            except IntegrityError:
+                if attempt == attempts - 1:
+                    raise
+                logger.info(f"Transcript seq {seq} of call log {call_log_id} taken, renumbering")
+                seq = TranscriptService.get_last_seq(db, call_log_id) + 1
+
+    @staticmethod
+    def assemble(db: Session, call_log_id: int) -> Optional[str]:
+        """Join the segments of a call into transcript text"""
+        segments = db.query(TranscriptSegment.role, TranscriptSegment.text).filter(
+            TranscriptSegment.call_log_id == call_log_id
+        ).order_by(TranscriptSegment.seq).all()
+
+        if not segments:
+            return None
+        return "\n".join(f"{role}: {text}" for role, text in segments)
+
+    @staticmethod
+    def get_transcript(db: Session, call_log: CallLog) -> Optional[str]:
+        """
+        Transcript of a call, built from its segments
+
+        The stored copy is used only for calls with no segments, whose
+        transcript came from the end-of-call report.
+        """
+        transcript = TranscriptService.assemble(db, call_log.id)
+        if transcript is None:
+            return call_log.transcript
+        return transcript
+
+    @staticmethod
+    def finalize(db: Session, call_log_id: int, fallback: Optional[str] = None):
+        """Write the full transcript onto the call log once the call has ended"""
+        transcript = TranscriptService.assemble(db, call_log_id)
+        if transcript is None and isinstance(fallback, str) and fallback:
+            # No utterances arrived as events; use the end-of-call report's copy
+            transcript = fallback
+        if transcript is not None:
+            db.execute(update(CallLog).where(CallLog.id == call_log_id).values(transcript=transcript))
@@ -1,44 +1,103 @@
-from twilio.rest import Client
 from app.config import get_settings
+from typing import Any, Dict, Mapping, Optional
+import base64
+import hashlib
+import hmac
+import httpx
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_twilio_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive HTTP client for Twilio requests"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=settings.twilio_timeout_seconds,
+            auth=(settings.twilio_account_sid, settings.twilio_auth_token),
+            limits=httpx.Limits(
+                max_connections=settings.twilio_max_connections,
+                max_keepalive_connections=settings.twilio_max_connections
+            )
+        )
+    return _http_client
+
+
+async def close_twilio_http_client():
+    """Close the shared Twilio HTTP client on shutdown"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_twilio_error(response: httpx.Response) -> str:
+    """Error message from a failed Twilio REST response"""
+    try:
+        body = response.json()
+        return f"{body.get('message')} (code {body.get('code')})"
+    except ValueError:
+        return f"HTTP {response.status_code}"
+
+
+def get_status_callback_url() -> str:
+    """URL Twilio posts message status changes to"""
+    return settings.twilio_status_callback_url or f"{settings.api_base_url}/api/webhooks/twilio/sms-status"
+
+
+def validate_twilio_signature(url: str, params: Mapping[str, str], signature: str) -> bool:
+    """Check the X-Twilio-Signature of a form-encoded Twilio request"""
+    payload = url + "".join(f"{key}{params[key]}" for key in sorted(params))
+    digest = hmac.new(settings.twilio_auth_token.encode(), payload.encode(), hashlib.sha1).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature or "")
+
 
 class TwilioService:
-    """Service for sending SMS via Twilio"""
+    """Service for sending SMS via the Twilio REST API, without blocking the event loop"""
     
     def __init__(self):
         self.account_sid = settings.twilio_account_sid
-        self.auth_token = settings.twilio_auth_token
         self.phone_number = settings.twilio_phone_number
-        self.client = Client(self.account_sid, self.auth_token)
+        self.messages_url = f"{settings.twilio_api_url}/Accounts/{self.account_sid}/Messages"
+        self.status_callback_url = get_status_callback_url() if settings.twilio_status_callback_enabled else None
     
-    def send_sms(self, to_number: str, message: str) -> dict:
+    async def send_sms(self, to_number: str, message: str, messaging_service_sid: Optional[str] = None) -> dict:
         """
         Send SMS to a phone number
         
         Args:
             to_number: Recipient phone number
             message: SMS message content
+            messaging_service_sid: Send through this Twilio Messaging Service
+                instead of from the configured phone number
             
         Returns:
             Message SID and status
         """
         try:
-            message_obj = self.client.messages.create(
-                body=message,
-                from_=self.phone_number,
-                to=to_number
-            )
+            data = {"Body": message, "To": to_number}
+            if messaging_service_sid:
+                data["MessagingServiceSid"] = messaging_service_sid
+            else:
+                data["From"] = self.phone_number
+            if self.status_callback_url:
+                data["StatusCallback"] = self.status_callback_url
             
-            logger.info(f"SMS sent to {to_number}, SID: {message_obj.sid}")
+            response = await get_twilio_http_client().post(f"{self.messages_url}.json", data=data)
+            if response.is_error:
+                raise RuntimeError(get_twilio_error(response))
+            
+            message_obj: Dict[str, Any] = response.json()
+            logger.info(f"SMS sent to {to_number}, SID: {message_obj['sid']}")
             
             return {
                 "success": True,
-                "sid": message_obj.sid,
-                "status": message_obj.status,
+                "sid": message_obj["sid"],
+                "status": message_obj.get("status"),
                 "to": to_number
             }
             
@@ -50,7 +109,7 @@ class TwilioService:
                 "to": to_number
             }
     
-    def send_payment_link(
+    async def send_payment_link(
         self,
         to_number: str,
         customer_name: str,
@@ -77,13 +136,14 @@ class TwilioService:
             payment_link=payment_link
         )
         
-        return self.send_sms(to_number, message)
+        return await self.send_sms(to_number, message)
     
-    def send_reminder(
+    async def send_reminder(
         self,
         to_number: str,
         bill_amount: float,
-        payment_link: str
+        payment_link: str,
+        messaging_service_sid: Optional[str] = None
     ) -> dict:
         """
         Send payment reminder SMS
@@ -92,6 +152,7 @@ class TwilioService:
             to_number: Customer phone number
             bill_amount: Bill amount
             payment_link: Payment URL
+            messaging_service_sid: Optional Twilio Messaging Service to send through
             
         Returns:
             SMS send result
@@ -101,9 +162,9 @@ class TwilioService:
             payment_link=payment_link
         )
         
-        return self.send_sms(to_number, message)
+        return await self.send_sms(to_number, message, messaging_service_sid)
     
-    def send_thank_you(
+    async def send_thank_you(
         self,
         to_number: str,
         bill_amount: float
@@ -122,9 +183,9 @@ class TwilioService:
             amount=bill_amount
         )
         
-        return self.send_sms(to_number, message)
+        return await self.send_sms(to_number, message)
     
-    def get_message_status(self, message_sid: str) -> dict:
+    async def get_message_status(self, message_sid: str) -> dict:
         """
         Get status of a sent message
         
@@ -135,15 +196,18 @@ class TwilioService:
             Message status information
         """
         try:
-            message = self.client.messages(message_sid).fetch()
+            response = await get_twilio_http_client().get(f"{self.messages_url}/{message_sid}.json")
+            if response.is_error:
+                raise RuntimeError(get_twilio_error(response))
             
+            message = response.json()
             return {
                 "success": True,
-                "sid": message.sid,
-                "status": message.status,
-                "to": message.to,
-                "error_code": message.error_code,
-                "error_message": message.error_message
+                "sid": message["sid"],
+                "status": message.get("status"),
+                "to": message.get("to"),
+                "error_code": message.get("error_code"),
+                "error_message": message.get("error_message")
             }
             
         except Exception as e:
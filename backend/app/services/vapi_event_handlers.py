@@ -0,0 +1,305 @@
+from sqlalchemy.orm import Session
+from app.database import run_in_session
+from app.services.vapi_service import VapiService
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.dial_priority import DialPriorityService
+from app.services.transcript_service import TranscriptService
+from app.services.active_call_cache import ActiveCall, active_call_cache
+from app.services.call_tools import ToolResult, tool_dispatcher
+from app.models.bill import Bill
+from app.models.call_log import CallLog, CallStatus, CallOutcome, TERMINAL_CALL_STATUSES
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+vapi_service = VapiService()
+
+# Events whose response carries a result the assistant is waiting for
+TOOL_EVENT_TYPES = ("tool-calls", "function-call")
+
+# VAPI endedReason values of calls that never reached the customer
+ENDED_REASON_STATUSES = {
+    "customer-did-not-answer": CallStatus.NO_ANSWER,
+    "customer-busy": CallStatus.BUSY,
+}
+
+
+def get_end_status(ended_reason: Optional[str]) -> CallStatus:
+    """Terminal call status implied by a VAPI endedReason"""
+    if not ended_reason:
+        return CallStatus.COMPLETED
+    if ended_reason in ENDED_REASON_STATUSES:
+        return ENDED_REASON_STATUSES[ended_reason]
+    # e.g. twilio-failed-to-connect-call, pipeline-error-openai-llm-failed
+    if "error" in ended_reason or "failed" in ended_reason:
+        return CallStatus.FAILED
+    return CallStatus.COMPLETED
+
+
+def resolve_active_call(db: Session, call_id: Optional[str], message_type: str) -> Optional[ActiveCall]:
+    """Find the call an event belongs to, from the active call cache when possible"""
+    call = active_call_cache.get(call_id)
+    if call:
+        return call
+    
+    row = None
+    if call_id:
+        row = db.query(CallLog, Bill).join(Bill, Bill.id == CallLog.bill_id).filter(
+            CallLog.vapi_call_id == call_id
+        ).first()
+        
+        if row:
+            call_log, bill = row
+            call = ActiveCall(call_log, bill, transcript_seq=TranscriptService.get_last_seq(db, call_log.id))
+            if call_log.status not in TERMINAL_CALL_STATUSES:
+                active_call_cache.put(call)
+            return call
+        
+        # If call_log not found but we have call_id, log for debugging
+        logger.warning(f"Call log not found for call_id: {call_id}")
+    
+    # Try the latest call as fallback (for tool-calls that might not have call_id)
+    if call_id or message_type == "tool-calls":
+        call = active_call_cache.latest()
+        if not call:
+            row = db.query(CallLog, Bill).join(Bill, Bill.id == CallLog.bill_id).order_by(
+                CallLog.id.desc()
+            ).first()
+            if row:
+                call_log, bill = row
+                call = ActiveCall(call_log, bill, transcript_seq=TranscriptService.get_last_seq(db, call_log.id))
+        if call:
+            logger.info(f"Using latest call log as fallback: {call.call_log_id}, vapi_call_id: {call.vapi_call_id}")
+    
+    return call
+
+
+def get_message_type(event_data: Dict[str, Any]) -> str:
+    return (event_data.get("message") or {}).get("type") or event_data.get("type", "")
+
+
+def apply_vapi_event(db: Session, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a raw VAPI webhook event other than a tool call to its call log
+    
+    Only database work: it runs in a worker thread (or a batch of the
+    commit writer) and the caller commits.
+    
+    Returns:
+        Response body for VAPI
+    """
+    processed = vapi_service.process_webhook_event(event_data)
+    message_type = processed.get("type")
+    call_id = processed.get("call_id")
+    
+    if message_type in TOOL_EVENT_TYPES:
+        raise ValueError("Tool calls are answered by prepare_tool_call")
+    
+    # Find the call; live calls are served from the active call cache
+    call = resolve_active_call(db, call_id, message_type)
+    
+    # Some events don't require call_log (like assistant.started)
+    if not call and message_type in ["status-update", "end-of-call-report", "transcript"]:
+        logger.warning(f"Call log not found for call_id: {call_id}, event: {message_type}")
+        return {"status": "ok", "message": "Call log not found, skipping event"}
+    
+    # Handle different event types only if we have a call_log
+    if call:
+        try:
+            if message_type == "status-update":
+                handle_status_update(db, call, processed)
+            
+            elif message_type == "transcript":
+                handle_transcript(db, call, processed)
+            
+            elif message_type == "end-of-call-report":
+                handle_end_of_call(db, call, processed)
+            
+            db.flush()
+        
+        except Exception:
+            # The cached call may now be ahead of the database; reload it next time
+            active_call_cache.invalidate(call.vapi_call_id)
+            raise
+    
+    return {"status": "ok", "message": "Webhook processed successfully"}
+
+
+async def prepare_tool_call(event_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Callable[[Session], Dict[str, Any]]]]:
+    """
+    Run the tool of a tool-calls or function-call event
+    
+    The tool's network I/O runs here, on the event loop. Its database
+    changes are returned for the caller to apply in a worker thread, or in
+    a commit writer batch, so no session is held while the tool waits.
+    
+    Returns:
+        Response body for VAPI (the function result for tool-calls), and a
+        function applying the tool's changes to a session, returning the
+        same response (None when there is nothing to apply)
+    """
+    # Log full event data for debugging tool-calls
+    logger.info(f"Tool-calls event data: {event_data}")
+    
+    processed = vapi_service.process_webhook_event(event_data)
+    message_type = processed.get("type")
+    call_id = processed.get("call_id")
+    logger.info(f"Extracted call_id: {call_id} from event")
+    
+    call = active_call_cache.get(call_id)
+    if not call:
+        call = await asyncio.to_thread(run_in_session, resolve_active_call, call_id, message_type)
+    if not call:
+        logger.warning(f"Call log not found for call_id: {call_id}, event: {message_type}")
+        logger.error(f"Full tool-calls event: {event_data}")
+        return {"status": "ok", "message": "Call log not found, skipping event"}, None
+    
+    result, changes = await handle_function_call(call, processed)
+    
+    # Return function result if needed (for VAPI function responses)
+    response = result if result and message_type == "tool-calls" else {"status": "ok", "message": "Webhook processed successfully"}
+    if changes is None:
+        return response, None
+    return response, partial(apply_tool_changes, call=call, changes=changes, response=response)
+
+
+def apply_tool_changes(db: Session, call: ActiveCall, changes: Callable[[Session], None], response: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the database changes of a tool; the caller commits"""
+    try:
+        changes(db)
+        db.flush()
+    except Exception:
+        # The cached call may now be ahead of the database; reload it next time
+        active_call_cache.invalidate(call.vapi_call_id)
+        raise
+    return response
+
+
+async def process_vapi_event(event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a raw VAPI webhook event and commit it
+    
+    The database work runs in a worker thread with its own session, so the
+    event loop keeps serving other webhooks meanwhile. A tool's network
+    I/O runs on the loop, before its changes are applied.
+    
+    Returns:
+        Response body for VAPI (the function result for tool-calls)
+    """
+    if get_message_type(event_data) in TOOL_EVENT_TYPES:
+        response, changes = await prepare_tool_call(event_data)
+        if changes:
+            await asyncio.to_thread(run_in_session, changes)
+        return response
+    
+    return await asyncio.to_thread(run_in_session, apply_vapi_event, event_data)
+
+
+def handle_status_update(db: Session, call: ActiveCall, processed: dict):
+    """Handle call status updates"""
+    status = processed.get("status", "").lower()
+    
+    # A replayed or late update must not move an ended call back
+    if call.ended:
+        return
+    
+    status_mapping = {
+        "queued": CallStatus.INITIATED,
+        "ringing": CallStatus.RINGING,
+        "in-progress": CallStatus.IN_PROGRESS,
+        "completed": CallStatus.COMPLETED,
+        "failed": CallStatus.FAILED,
+        "no-answer": CallStatus.NO_ANSWER,
+        "busy": CallStatus.BUSY
+    }
+    
+    if status in status_mapping:
+        values = {"status": status_mapping[status]}
+        
+        if status == "in-progress" and not call.started_at:
+            call.started_at = datetime.utcnow()
+            values["started_at"] = call.started_at
+        
+        CallService.update_call_log(db, call.call_log_id, **values)
+        
+        if values["status"] in TERMINAL_CALL_STATUSES:
+            vapi_service.release_call(db, call.vapi_call_id)
+            DialPriorityService.refresh_bill(db, call.bill_id)
+
+
+def handle_transcript(db: Session, call: ActiveCall, processed: dict):
+    """Handle transcript updates"""
+    # Partial transcripts are superseded by the final one for the same utterance
+    if processed.get("transcript_type") == "partial":
+        return
+    
+    transcript_text = processed.get("transcript", "")
+    role = processed.get("role", "")
+    
+    if transcript_text:
+        segment = TranscriptService.append_segment(db, call.call_log_id, role, transcript_text, seq=call.transcript_seq + 1)
+        call.transcript_seq = segment.seq
+        
+        # An utterance delivered after the end-of-call report
+        if call.ended:
+            TranscriptService.finalize(db, call.call_log_id)
+
+
+async def handle_function_call(call: ActiveCall, processed: dict) -> ToolResult:
+    """Handle function calls from VAPI assistant"""
+    function_name = processed.get("function_name")
+    parameters = processed.get("function_parameters", {})
+    
+    logger.info(f"Function called: {function_name} with params: {parameters}")
+    
+    return await tool_dispatcher.dispatch(call, function_name, parameters)
+
+
+def handle_end_of_call(db: Session, call: ActiveCall, processed: dict):
+    """Handle end of call report"""
+    # Replayed, redelivered or reconciled reports of a call that has already
+    # ended change nothing; the row lock orders concurrent reports
+    already_ended = db.query(CallLog.ended_at).filter(
+        CallLog.id == call.call_log_id
+    ).with_for_update().scalar()
+    if already_ended is not None:
+        logger.info(f"Call log {call.call_log_id} already ended, skipping end-of-call report")
+        call.ended = True
+        active_call_cache.invalidate(call.vapi_call_id)
+        return
+    
+    ended_at = datetime.utcnow()
+    duration = processed.get("duration")
+    
+    # Calculate duration if not provided
+    if not duration and call.started_at:
+        duration_delta = ended_at - call.started_at
+        duration = int(duration_delta.total_seconds())
+    
+    CallService.update_call_log(
+        db,
+        call.call_log_id,
+        status=get_end_status(processed.get("ended_reason")),
+        ended_at=ended_at,
+        duration=duration,
+        recording_url=processed.get("recording_url")
+    )
+    TranscriptService.finalize(db, call.call_log_id, fallback=processed.get("transcript_url"))
+    
+    vapi_service.release_call(db, call.vapi_call_id)
+    # Later events holding this object, e.g. in the same writer batch, must
+    # see the call as ended even though it leaves the cache
+    call.ended = True
+    active_call_cache.invalidate(call.vapi_call_id)
+    
+    # Update bill status
+    bill = BillService.mark_bill_called(db, call.bill_id, commit=False, next_reminder_date=call.callback_at)
+    
+    # If payment was confirmed during call, update accordingly
+    if bill and call.outcome == CallOutcome.PAYMENT_CONFIRMED:
+        logger.info(f"Payment confirmed for bill {bill.bill_number}")
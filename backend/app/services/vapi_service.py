@@ -1,12 +1,44 @@
 import httpx
+from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from app.config import get_settings
+from app.database import run_in_session
+from app.services.call_leases import CallLeaseStore
+from app.services.call_limiter import call_limiter
+from app.services.phone_number_pool import phone_number_pool
 from datetime import datetime
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# One connection pool shared by every VapiService instance
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive HTTP client for VAPI requests"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.vapi_max_connections,
+                max_keepalive_connections=settings.vapi_max_connections
+            )
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client on shutdown"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def get_time_of_day() -> str:
     """Get time of day greeting based on current hour"""
@@ -50,6 +82,9 @@ class VapiService:
             
         Returns:
             Call response from VAPI API
+            
+        Raises:
+            CallLimitExceeded: if no call capacity frees up within the allowed wait
         """
         try:
             # Get time of day for greeting
@@ -71,9 +106,18 @@ class VapiService:
             logger.info(f"Initiating call with variables - customerName: '{customer_name}', billNumber: '{bill_number}', timeOfDay: '{time_of_day}'")
             logger.info(f"Full bill_data: {bill_data}")
             
+            # Wait for a rate token and a concurrent call slot, then pick an
+            # outbound number with spare capacity
+            lease_key = await call_limiter.acquire()
+            try:
+                phone_number_id = await phone_number_pool.acquire(lease_key)
+            except BaseException:
+                await call_limiter.release(lease_key)
+                raise
+            
             payload = {
                 "assistantId": assistant_id or self.assistant_id,
-                "phoneNumberId": self.phone_number_id,
+                "phoneNumberId": phone_number_id,
                 "customer": {
                     "number": phone_number
                 },
@@ -92,31 +136,41 @@ class VapiService:
             
             logger.info(f"VAPI Payload variableValues: {payload['assistantOverrides']['variableValues']}")
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            try:
+                response = await get_http_client().post(
                     f"{self.api_url}/call/phone",
                     headers=self.headers,
-                    json=payload,
-                    timeout=30.0
+                    json=payload
                 )
                 response.raise_for_status()
-                return response.json()
+                call_response = response.json()
+            except BaseException:
+                await asyncio.to_thread(run_in_session, self.release_call, lease_key)
+                raise
+            
+            await asyncio.to_thread(run_in_session, CallLeaseStore.bind, lease_key, call_response.get("id"))
+            call_response.setdefault("phoneNumberId", phone_number_id)
+            return call_response
                 
         except httpx.HTTPError as e:
             logger.error(f"VAPI API error: {str(e)}")
             raise Exception(f"Failed to initiate call: {str(e)}")
     
+    def release_call(self, db: Session, call_id: Optional[str]):
+        """Free the call slot and phone number held by a call, in the caller's transaction"""
+        if CallLeaseStore.release(db, call_id):
+            call_limiter.wake()
+            phone_number_pool.wake()
+    
     async def get_call_details(self, call_id: str) -> Dict[str, Any]:
         """Get details of a specific call"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_url}/call/{call_id}",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await get_http_client().get(
+                f"{self.api_url}/call/{call_id}",
+                headers=self.headers
+            )
+            response.raise_for_status()
+            return response.json()
                 
         except httpx.HTTPError as e:
             logger.error(f"Failed to get call details: {str(e)}")
@@ -125,14 +179,12 @@ class VapiService:
     async def end_call(self, call_id: str) -> Dict[str, Any]:
         """End an ongoing call"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_url}/call/{call_id}/end",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await get_http_client().post(
+                f"{self.api_url}/call/{call_id}/end",
+                headers=self.headers
+            )
+            response.raise_for_status()
+            return response.json()
                 
         except httpx.HTTPError as e:
             logger.error(f"Failed to end call: {str(e)}")
@@ -166,6 +218,7 @@ class VapiService:
         if message_type == "transcript":
             processed["transcript"] = message.get("transcript", "")
             processed["role"] = message.get("role", "")
+            processed["transcript_type"] = message.get("transcriptType", "final")
         
         # Extract function call if available (handle both function-call and tool-calls)
         if message_type in ["function-call", "tool-calls"]:
@@ -181,17 +234,25 @@ class VapiService:
                 function_call.get("function", {}).get("name") or
                 message.get("name")
             )
-            processed["function_parameters"] = (
+            parameters = (
                 function_call.get("parameters") or
                 function_call.get("arguments") or
+                function_call.get("function", {}).get("arguments") or
                 message.get("parameters") or
                 {}
             )
+            # Tool call arguments usually arrive as a JSON string
+            if isinstance(parameters, str):
+                try:
+                    parameters = json.loads(parameters)
+                except ValueError:
+                    parameters = {}
+            processed["function_parameters"] = parameters
         
         # Extract call status updates
         if message_type in ["status-update", "end-of-call-report"]:
             processed["duration"] = event_data.get("call", {}).get("duration")
-            processed["ended_reason"] = event_data.get("call", {}).get("endedReason")
+            processed["ended_reason"] = event_data.get("call", {}).get("endedReason") or message.get("endedReason")
             processed["recording_url"] = event_data.get("artifact", {}).get("recordingUrl")
             processed["transcript_url"] = event_data.get("artifact", {}).get("transcript")
         
@@ -0,0 +1,290 @@
+from app.services.vapi_event_handlers import process_vapi_event
+from app.services.webhook_queue import get_event_call_id
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import glob
+import gzip
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SEGMENT_PATTERN = "vapi-*.jsonl.gz"
+SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+# Written on stop() to make the writer thread exit
+_STOP = object()
+
+
+def get_segment_start(path: str) -> Optional[datetime]:
+    """Time the segment was opened, from its file name"""
+    try:
+        return datetime.strptime(os.path.basename(path).split("-")[1], SEGMENT_TIME_FORMAT)
+    except (IndexError, ValueError):
+        return None
+
+
+class WebhookJournal:
+    """
+    Append-only journal of raw VAPI webhook events.
+
+    The endpoint hands events to record(), which only puts them on a bounded
+    in-memory queue; a background thread writes them as JSON lines to gzip
+    segment files and rotates segments by size and age. If the writer falls
+    behind and the queue is full, events are dropped from the journal (never
+    from processing) and counted.
+
+    Each process writes its own segments (the PID is in the file name), so
+    several API processes can share a journal directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int,
+        segment_seconds: int,
+        retention_days: int,
+        queue_size: int
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.retention_days = retention_days
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        self._file: Optional[gzip.GzipFile] = None
+        self._segment_path: Optional[str] = None
+        self._segment_opened = 0.0
+        self._segment_written = 0
+
+        self.recorded = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the writer thread"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="webhook-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook journal writing to {os.path.abspath(self.directory)}")
+
+    def stop(self, timeout: float = 10.0):
+        """Write out queued events and close the current segment"""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def record(self, event_data: Dict[str, Any], received_at: Optional[datetime] = None):
+        """Queue a raw event for the journal; never blocks"""
+        if not self._thread:
+            return
+        try:
+            self._queue.put_nowait((received_at or datetime.utcnow(), event_data))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Webhook journal is behind, {self.dropped} events not journaled so far")
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+
+            stopping = False
+            batch = []
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            try:
+                if batch:
+                    self._write(batch)
+
+                # Flush at most once a second so a crash loses little, but
+                # bursts still compress as one stream
+                if self._file and (stopping or time.monotonic() - last_flush >= 1.0):
+                    self._file.flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                logger.error(f"Webhook journal write failed: {str(e)}")
+                self._close_segment()
+
+            if stopping:
+                self._close_segment()
+                return
+
+    def _write(self, batch: List[Tuple[datetime, Dict[str, Any]]]):
+        if self._file and (
+            self._segment_written >= self.segment_bytes
+            or time.monotonic() - self._segment_opened >= self.segment_seconds
+        ):
+            self._close_segment()
+            self._purge_segments()
+
+        if not self._file:
+            self._open_segment()
+
+        lines = "".join(
+            json.dumps({"received_at": received_at.isoformat(), "event": event_data}, separators=(",", ":")) + "\n"
+            for received_at, event_data in batch
+        ).encode()
+        self._file.write(lines)
+        self._segment_written += len(lines)
+        self.recorded += len(batch)
+
+    def _open_segment(self):
+        name = f"vapi-{datetime.utcnow().strftime(SEGMENT_TIME_FORMAT)}-{os.getpid()}.jsonl.gz"
+        self._segment_path = os.path.join(self.directory, name)
+        self._file = gzip.open(self._segment_path, "ab")
+        self._segment_opened = time.monotonic()
+        self._segment_written = 0
+
+    def _close_segment(self):
+        if self._file:
+            try:
+                self._file.close()
+            except Exception as e:
+                logger.warning(f"Could not close journal segment {self._segment_path}: {str(e)}")
+        self._file = None
+        self._segment_path = None
+
+    def _purge_segments(self):
+        """Delete segments older than the retention window"""
+        if not self.retention_days:
+            return
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        for path in glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)):
+            started = get_segment_start(path)
+            if started and started < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self.running,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "segment": self._segment_path,
+        }
+
+
+def read_segment(path: str) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+    """Events of one segment; a segment still being written is read up to its last flush"""
+    with gzip.open(path, "rt") as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written last line of an open segment
+                    break
+                yield datetime.fromisoformat(entry["received_at"]), entry["event"]
+        except (EOFError, gzip.BadGzipFile):
+            return
+
+
+def read_journal(
+    directory: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+    """Journaled events of every segment in the directory, merged in receive order"""
+    paths = sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+    if until:
+        paths = [p for p in paths if (get_segment_start(p) or until) <= until]
+
+    for received_at, event_data in heapq.merge(*(read_segment(p) for p in paths), key=lambda e: e[0]):
+        if since and received_at < since:
+            continue
+        if until and received_at > until:
+            break
+        yield received_at, event_data
+
+
+async def replay_journal(
+    events: Iterator[Tuple[datetime, Dict[str, Any]]],
+    speed: float = 0.0,
+    call_id: Optional[str] = None,
+    event_types: Optional[List[str]] = None,
+    exclude_types: Optional[List[str]] = None,
+    dry_run: bool = False
+) -> dict:
+    """
+    Feed journaled events back through the webhook handlers, in order
+
+    Args:
+        speed: 1.0 replays at the recorded pace, 2.0 twice as fast;
+            0 replays as fast as the handlers allow
+        call_id: Only replay events of this call
+        event_types: Only replay these message types
+        exclude_types: Never replay these message types
+        dry_run: Count matching events without applying them
+    """
+    stats = {"replayed": 0, "failed": 0, "skipped": 0}
+    loop = asyncio.get_running_loop()
+    first_received = None
+    started = loop.time()
+
+    for received_at, event_data in events:
+        message_type = (event_data.get("message") or {}).get("type") or event_data.get("type")
+        if (call_id and get_event_call_id(event_data) != call_id) or (
+            event_types and message_type not in event_types
+        ) or (exclude_types and message_type in exclude_types):
+            stats["skipped"] += 1
+            continue
+
+        if speed > 0:
+            if first_received is None:
+                first_received = received_at
+            delay = (received_at - first_received).total_seconds() / speed - (loop.time() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if dry_run:
+            stats["replayed"] += 1
+            continue
+
+        try:
+            await process_vapi_event(event_data)
+            stats["replayed"] += 1
+        except Exception as e:
+            stats["failed"] += 1
+            logger.error(f"Replay of {message_type} event received at {received_at} failed: {str(e)}")
+
+    stats["seconds"] = loop.time() - started
+    return stats
+
+
+webhook_journal = WebhookJournal(
+    directory=settings.webhook_journal_dir,
+    segment_bytes=settings.webhook_journal_segment_mb * 1024 * 1024,
+    segment_seconds=settings.webhook_journal_segment_minutes * 60,
+    retention_days=settings.webhook_journal_retention_days,
+    queue_size=settings.webhook_journal_queue_size
+)
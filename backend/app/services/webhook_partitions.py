@@ -0,0 +1,361 @@
+from sqlalchemy import update, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, run_in_session
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus, WebhookPartitionLease
+from app.services.vapi_event_handlers import apply_vapi_event
+from app.services.webhook_queue import get_event_call_id, get_partition
+from app.config import get_settings
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class WebhookEventStore:
+    """Durable, partitioned log of VAPI webhook events"""
+
+    @staticmethod
+    def append(db: Session, event_data: Dict[str, Any]) -> WebhookEvent:
+        """Record an event in the partition of its call"""
+        call_id = get_event_call_id(event_data)
+        message = event_data.get("message") or {}
+
+        event = WebhookEvent(
+            call_id=call_id,
+            partition=get_partition(call_id, settings.webhook_partitions),
+            event_type=message.get("type") or event_data.get("type"),
+            payload=json.dumps(event_data),
+            status=WebhookEventStatus.PENDING
+        )
+
+        db.add(event)
+        db.commit()
+        return event
+
+    @staticmethod
+    def get_pending(db: Session, partition: int, limit: int = 100) -> List[WebhookEvent]:
+        """Pending events of a partition in arrival order"""
+        return db.query(WebhookEvent).filter(
+            WebhookEvent.partition == partition,
+            WebhookEvent.status == WebhookEventStatus.PENDING
+        ).order_by(WebhookEvent.id).limit(limit).all()
+
+    @staticmethod
+    def ensure_partitions(db: Session, partitions: int):
+        """Create lease rows for partitions that have none yet"""
+        existing = {p for (p,) in db.query(WebhookPartitionLease.partition).all()}
+        for partition in range(partitions):
+            if partition in existing:
+                continue
+            db.add(WebhookPartitionLease(partition=partition))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another process created it first
+                db.rollback()
+
+    @staticmethod
+    def claim_partition(db: Session, partition: int, owner: str, lease_seconds: int) -> bool:
+        """Take or renew the lease on a partition; False if another live worker holds it"""
+        now = datetime.utcnow()
+        result = db.execute(
+            update(WebhookPartitionLease)
+            .where(
+                WebhookPartitionLease.partition == partition,
+                or_(
+                    WebhookPartitionLease.owner.is_(None),
+                    WebhookPartitionLease.owner == owner,
+                    WebhookPartitionLease.expires_at < now
+                )
+            )
+            .values(owner=owner, expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def holds_partition(db: Session, partition: int, owner: str) -> bool:
+        """
+        Whether owner holds a live lease on the partition
+
+        The lease row is share-locked until the caller's transaction ends,
+        so another worker cannot take the partition over in the meantime.
+        """
+        return db.query(WebhookPartitionLease.partition).filter(
+            WebhookPartitionLease.partition == partition,
+            WebhookPartitionLease.owner == owner,
+            WebhookPartitionLease.expires_at > datetime.utcnow()
+        ).with_for_update(read=True).first() is not None
+
+    @staticmethod
+    def release_partitions(db: Session, partitions: List[int], owner: str):
+        """Give up leases so other workers can take the partitions at once"""
+        db.execute(
+            update(WebhookPartitionLease)
+            .where(
+                WebhookPartitionLease.partition.in_(partitions),
+                WebhookPartitionLease.owner == owner
+            )
+            .values(owner=None, expires_at=None)
+        )
+        db.commit()
+
+    @staticmethod
+    def purge_processed(db: Session, older_than_hours: int) -> int:
+        """Delete processed events past the retention window"""
+        cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+        deleted = db.query(WebhookEvent).filter(
+            WebhookEvent.status == WebhookEventStatus.PROCESSED,
+            WebhookEvent.processed_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def get_partition_stats(db: Session) -> List[dict]:
+        """Owner, backlog and oldest pending event per partition"""
+        backlog = {
+            (partition, status): (count, oldest)
+            for partition, status, count, oldest in db.query(
+                WebhookEvent.partition,
+                WebhookEvent.status,
+                func.count(WebhookEvent.id),
+                func.min(WebhookEvent.received_at)
+            ).filter(
+                WebhookEvent.status != WebhookEventStatus.PROCESSED
+            ).group_by(WebhookEvent.partition, WebhookEvent.status).all()
+        }
+
+        leases = {lease.partition: lease for lease in db.query(WebhookPartitionLease).all()}
+
+        now = datetime.utcnow()
+        stats = []
+        for partition in range(settings.webhook_partitions):
+            lease = leases.get(partition)
+            pending, oldest = backlog.get((partition, WebhookEventStatus.PENDING), (0, None))
+            failed, _ = backlog.get((partition, WebhookEventStatus.FAILED), (0, None))
+            live = lease is not None and lease.owner is not None and lease.expires_at and lease.expires_at > now
+            stats.append({
+                "partition": partition,
+                "owner": lease.owner if live else None,
+                "lease_expires_at": lease.expires_at if live else None,
+                "pending": pending,
+                "failed": failed,
+                "oldest_pending_seconds": (now - oldest).total_seconds() if oldest else 0.0,
+            })
+        return stats
+
+
+class WebhookPartitionWorker:
+    """
+    Applies webhook events from the partitions this process holds a lease on.
+
+    Every event of a call lands in the same partition, and a partition is
+    drained by one task in one process at a time, in event ID order, so
+    updates to a call log never race. Different partitions are drained in
+    parallel, by this process and by any other API or webhook_worker.py
+    process. An event that keeps failing blocks its partition until it has
+    used up its attempts, then it is marked failed and skipped.
+
+    Cancelling a drainer does not stop the thread applying its batch, so
+    every event is applied in a transaction that first checks this worker
+    still holds the partition and moves the event from pending to
+    processed with a conditional UPDATE. A worker that lost its lease
+    stops at its next event, and an event is never applied twice.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        partitions: Optional[List[int]] = None,
+        max_partitions: Optional[int] = None
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.candidates = partitions if partitions is not None else list(range(settings.webhook_partitions))
+        self.max_partitions = settings.webhook_worker_max_partitions if max_partitions is None else max_partitions
+        self.lease_seconds = settings.webhook_partition_lease_seconds
+
+        self._drainers: Dict[int, asyncio.Task] = {}
+        self._wakeups: Dict[int, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start claiming partitions on the running event loop"""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop draining and release this worker's leases"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def notify(self, partition: int):
+        """Wake the drainer of a partition owned by this process"""
+        wakeup = self._wakeups.get(partition)
+        if wakeup:
+            wakeup.set()
+
+    def owned_partitions(self) -> List[int]:
+        return sorted(self._drainers)
+
+    async def run(self):
+        """Keep leases renewed and a drainer running for each owned partition"""
+        logger.info(f"Webhook partition worker {self.worker_id} started")
+        loop = asyncio.get_running_loop()
+        last_purge = 0.0
+        try:
+            await asyncio.to_thread(run_in_session, WebhookEventStore.ensure_partitions, settings.webhook_partitions)
+
+            while True:
+                try:
+                    await self._renew_leases()
+
+                    if loop.time() - last_purge > 3600:
+                        await asyncio.to_thread(
+                            run_in_session, WebhookEventStore.purge_processed, settings.webhook_event_retention_hours
+                        )
+                        last_purge = loop.time()
+                except Exception as e:
+                    logger.error(f"Webhook partition worker {self.worker_id} error: {str(e)}")
+
+                await asyncio.sleep(self.lease_seconds / 3)
+
+        finally:
+            for task in self._drainers.values():
+                task.cancel()
+            await asyncio.gather(*self._drainers.values(), return_exceptions=True)
+
+            try:
+                await asyncio.to_thread(
+                    run_in_session, WebhookEventStore.release_partitions, list(self._drainers), self.worker_id
+                )
+            except Exception as e:
+                logger.warning(f"Could not release webhook partitions: {str(e)}")
+            finally:
+                self._drainers = {}
+                self._wakeups = {}
+
+    async def _renew_leases(self):
+        for partition in self.candidates:
+            owned = partition in self._drainers
+            if not owned and self.max_partitions and len(self._drainers) >= self.max_partitions:
+                continue
+
+            claimed = await asyncio.to_thread(
+                run_in_session, WebhookEventStore.claim_partition, partition, self.worker_id, self.lease_seconds
+            )
+            if claimed:
+                if not owned:
+                    logger.info(f"Worker {self.worker_id} took webhook partition {partition}")
+                    self._wakeups[partition] = asyncio.Event()
+                    self._drainers[partition] = asyncio.create_task(self._drain(partition))
+            elif owned:
+                logger.warning(f"Worker {self.worker_id} lost webhook partition {partition}")
+                self._drainers.pop(partition).cancel()
+                self._wakeups.pop(partition, None)
+
+    async def _drain(self, partition: int):
+        wakeup = self._wakeups[partition]
+        while True:
+            try:
+                applied, blocked = await asyncio.to_thread(self._drain_pending, partition)
+            except Exception as e:
+                applied, blocked = 0, True
+                logger.error(f"Error draining webhook partition {partition}: {str(e)}")
+
+            if applied and not blocked:
+                continue
+
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=settings.webhook_partition_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _drain_pending(self, partition: int) -> Tuple[int, bool]:
+        """Apply a batch of pending events in a worker thread; (events read, blocked)"""
+        db = SessionLocal()
+        try:
+            events = [(event.id, event.payload) for event in WebhookEventStore.get_pending(db, partition)]
+            db.rollback()
+            for event_id, payload in events:
+                applied = self._apply(db, partition, event_id, json.loads(payload))
+                if applied is None:
+                    logger.warning(f"Worker {self.worker_id} no longer holds webhook partition {partition}, stopping")
+                    return len(events), True
+                if not applied:
+                    return len(events), True
+            return len(events), False
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply(self, db: Session, partition: int, event_id: int, payload: Dict[str, Any]) -> Optional[bool]:
+        """
+        Apply one event
+
+        Returns:
+            True if it is done with (applied, already applied elsewhere, or
+            failed for good), False if it failed and should be retried
+            before later ones, None if this worker lost the partition
+        """
+        if not WebhookEventStore.holds_partition(db, partition, self.worker_id):
+            db.rollback()
+            return None
+
+        # Marked in the same transaction as the handler's changes, so an
+        # event is never applied twice or lost between the two. A second
+        # worker's UPDATE waits for this transaction and then matches nothing
+        claimed = db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == event_id, WebhookEvent.status == WebhookEventStatus.PENDING)
+            .values(
+                status=WebhookEventStatus.PROCESSED,
+                processed_at=datetime.utcnow(),
+                attempts=WebhookEvent.attempts + 1
+            )
+        ).rowcount
+        if claimed != 1:
+            db.rollback()
+            return True
+
+        try:
+            apply_vapi_event(db, payload)
+            db.commit()
+            return True
+
+        except Exception as e:
+            db.rollback()
+            event = db.query(WebhookEvent).filter(
+                WebhookEvent.id == event_id,
+                WebhookEvent.status == WebhookEventStatus.PENDING
+            ).with_for_update().first()
+            if not event:
+                db.rollback()
+                return True
+
+            event.attempts += 1
+            event.last_error = str(e)
+
+            if event.attempts >= settings.webhook_event_max_attempts:
+                event.status = WebhookEventStatus.FAILED
+                logger.error(f"Webhook event {event_id} failed permanently: {str(e)}")
+                db.commit()
+                return True
+
+            logger.warning(f"Webhook event {event_id} attempt {event.attempts} failed: {str(e)}")
+            db.commit()
+            return False
+
+
+webhook_partition_worker = WebhookPartitionWorker()
@@ -0,0 +1,168 @@
+from app.services.vapi_event_handlers import process_vapi_event
+from app.services.active_call_cache import active_call_cache
+from app.services.webhook_writer import webhook_commit_writer
+from app.config import get_settings
+from collections import deque
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def get_event_call_id(event_data: Dict[str, Any]) -> Optional[str]:
+    """Call ID of a raw VAPI event, wherever the payload carries it"""
+    message = event_data.get("message") or {}
+    call = event_data.get("call") or message.get("call") or {}
+    return call.get("id") or event_data.get("callId") or event_data.get("call_id")
+
+
+class WebhookQueueFull(Exception):
+    """Raised when an event's shard stayed full for the allowed wait"""
+    pass
+
+
+def get_partition(call_id: Optional[str], partitions: int) -> int:
+    """Stable partition of a call ID, the same in every process"""
+    return zlib.crc32((call_id or "").encode()) % partitions
+
+
+class WebhookEventQueue:
+    """
+    In-process queue that lets the webhook endpoint acknowledge VAPI
+    immediately and apply events in the background.
+
+    Events are sharded by call ID across consumer tasks, so events for one
+    call are applied in arrival order while different calls run in
+    parallel. When an event's shard is full, enqueue() waits for room and
+    then raises WebhookQueueFull, so the endpoint can ask VAPI to retry;
+    applying the event inline would put it ahead of the call's queued
+    events.
+    """
+
+    def __init__(self, consumers: int, max_size: int, max_wait: float):
+        self.consumers = max(consumers, 1)
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.lags = deque(maxlen=1000)
+        self.process_times = deque(maxlen=1000)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start the consumer tasks on the running event loop"""
+        shard_size = max(self.max_size // self.consumers, 1)
+        self._queues = [asyncio.Queue(maxsize=shard_size) for _ in range(self.consumers)]
+        self._tasks = [asyncio.create_task(self._consume(queue)) for queue in self._queues]
+        logger.info(f"Webhook queue started with {self.consumers} consumers")
+
+    async def stop(self, timeout: float = 10.0):
+        """Apply queued events (up to timeout), then stop the consumers"""
+        if not self._tasks:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook queue stopped with {self.depth()} events unapplied")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, event_data: Dict[str, Any]) -> bool:
+        """
+        Queue an event for a consumer, waiting up to max_wait for room in its shard
+
+        Returns:
+            False if the queue is not running and the event must be processed inline
+
+        Raises:
+            WebhookQueueFull: if the shard stayed full
+        """
+        if not self._tasks:
+            return False
+
+        queue = self._queues[get_partition(get_event_call_id(event_data), len(self._queues))]
+        item = (time.monotonic(), event_data)
+
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(queue.put(item), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise WebhookQueueFull("Webhook queue is full")
+
+        self.enqueued += 1
+        return True
+
+    async def _consume(self, queue: asyncio.Queue):
+        while True:
+            enqueued_at, event_data = await queue.get()
+            started = time.monotonic()
+            self.lags.append(started - enqueued_at)
+
+            try:
+                if webhook_commit_writer.running:
+                    # Already acknowledged, so only hand the event over; the
+                    # writer applies events in the order they are submitted
+                    await webhook_commit_writer.submit(event_data, wait=False)
+                else:
+                    await process_vapi_event(event_data)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error applying queued VAPI event: {str(e)}")
+            finally:
+                self.process_times.append(time.monotonic() - started)
+                queue.task_done()
+
+    def depth(self) -> int:
+        """Events waiting across all shards"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_stats(self) -> dict:
+        """Queue depth, throughput counters and lag statistics"""
+        lags = sorted(self.lags)
+        process_times = sorted(self.process_times)
+        return {
+            "mode": settings.webhook_ingest_mode,
+            "running": self.running,
+            "consumers": self.consumers,
+            "queue_depth": self.depth(),
+            "shard_depths": [queue.qsize() for queue in self._queues],
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_lag_seconds": sum(lags) / len(lags) if lags else 0.0,
+            "p95_lag_seconds": lags[min(len(lags) - 1, int(len(lags) * 0.95))] if lags else 0.0,
+            "max_lag_seconds": lags[-1] if lags else 0.0,
+            "avg_process_seconds": sum(process_times) / len(process_times) if process_times else 0.0,
+            "active_call_cache": active_call_cache.get_stats(),
+        }
+
+
+webhook_queue = WebhookEventQueue(
+    consumers=settings.webhook_consumers,
+    max_size=settings.webhook_queue_max_size,
+    max_wait=settings.webhook_queue_max_wait
+)
@@ -0,0 +1,258 @@
+from sqlalchemy.orm import Session
+from app.database import run_in_session
+from app.services.vapi_event_handlers import TOOL_EVENT_TYPES, apply_vapi_event, get_message_type, prepare_tool_call
+from app.services.active_call_cache import active_call_cache
+from app.config import get_settings
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Applied in a transaction of its own, committed before the caller continues
+IMMEDIATE = "immediate"
+# Coalesced with other events; the caller waits for the shared commit
+GROUP = "group"
+# Coalesced with other events; the caller continues as soon as it is queued
+DEFERRED = "deferred"
+
+DURABILITY_MODES = (IMMEDIATE, GROUP, DEFERRED)
+
+QUEUED_RESPONSE = {"status": "ok", "message": "Webhook queued"}
+
+# Put on the queue by stop() to end the writer loop
+_STOP = object()
+
+# Event, function applying it to a session, durability mode, and the future
+# of a waiting caller
+WriterItem = Tuple[Dict[str, Any], Callable[[Session], Dict[str, Any]], str, Optional[asyncio.Future]]
+
+
+def parse_durability(spec: str) -> Dict[str, str]:
+    """Parse "type:mode,type:mode" into a map of message type to durability mode"""
+    durability = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        message_type, _, mode = part.partition(":")
+        mode = mode.strip().lower()
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"Unknown webhook commit durability '{mode}' for {message_type.strip()}")
+        durability[message_type.strip()] = mode
+    return durability
+
+
+class WebhookCommitWriter:
+    """
+    Applies webhook events in shared transactions.
+
+    Events are applied one after another, in submission order, by a single
+    task. Once an event arrives the writer waits window seconds, then
+    applies everything queued so far (up to max_batch events) in one
+    session and commits once, so a burst of status and transcript events
+    costs one commit instead of one each. An immediate event ends the
+    batch and is committed on its own.
+
+    Only database work goes through the writer: a batch is applied and
+    committed in a worker thread with a session of its own, and a tool
+    call's network I/O is done by its submitter before its changes are
+    queued, so a slow SMS provider does not hold up other events.
+
+    If any event of a batch fails, the batch is rolled back and its events
+    are applied again one at a time, so only the failing event is lost.
+
+    At most max_queue events wait for the writer. Submitters, deferred
+    ones included, wait for room, so a writer that falls behind pushes
+    back on the webhook queue consumers instead of growing without bound.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_batch: int,
+        durability: Dict[str, str],
+        default_durability: str = GROUP,
+        max_queue: int = 1000
+    ):
+        self.window = window
+        self.max_batch = max(max_batch, 1)
+        self.max_queue = max(max_queue, 1)
+        self.durability = durability
+        self.default_durability = default_durability
+        self._queue: Optional[asyncio.Queue] = None
+        self._held: Optional[tuple] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.events = 0
+        self.batches = 0
+        self.failed = 0
+        self.retried_batches = 0
+        self.commit_times = deque(maxlen=1000)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def get_durability(self, message_type: str) -> str:
+        return self.durability.get(message_type, self.default_durability)
+
+    def start(self):
+        """Start the writer on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Webhook commit writer started ({self.window * 1000:g} ms window, batches of up to {self.max_batch})")
+
+    async def stop(self, timeout: float = 10.0):
+        """Apply queued events (up to timeout), then stop"""
+        if not self._task:
+            return
+
+        async def drain():
+            # The stop marker waits behind queued events like any submitter
+            await self._queue.put(_STOP)
+            await asyncio.shield(self._task)
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook commit writer stopped with {self._queue.qsize()} events unapplied")
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def submit(self, event_data: Dict[str, Any], wait: bool = True) -> Dict[str, Any]:
+        """
+        Apply an event through the writer
+
+        Args:
+            wait: False treats group events as deferred, for callers that
+                have already acknowledged the event
+
+        Returns:
+            The handler's response, or a queued acknowledgement for
+            deferred events other than tool calls
+        """
+        message_type = get_message_type(event_data)
+        mode = self.get_durability(message_type)
+
+        if message_type in TOOL_EVENT_TYPES:
+            response, apply = await prepare_tool_call(event_data)
+            if apply is None:
+                return response
+        else:
+            response, apply = QUEUED_RESPONSE, partial(apply_vapi_event, event_data=event_data)
+
+        # Waits while the writer is max_queue events behind
+        if mode == DEFERRED or (mode == GROUP and not wait):
+            await self._queue.put((event_data, apply, mode, None))
+            return response
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((event_data, apply, mode, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            item = self._held
+            self._held = None
+            if item is None:
+                item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stopping = False
+            if item[2] != IMMEDIATE:
+                # Let concurrent events catch up with this one
+                await asyncio.sleep(self.window)
+
+                while len(batch) < self.max_batch and not self._queue.empty():
+                    queued = self._queue.get_nowait()
+                    if queued is _STOP:
+                        stopping = True
+                        break
+                    if queued[2] == IMMEDIATE:
+                        self._held = queued
+                        break
+                    batch.append(queued)
+
+            try:
+                await self._apply(batch)
+            except Exception as e:
+                logger.error(f"Webhook commit writer error: {str(e)}")
+
+            if stopping:
+                # Events submitted while stopping are applied so no caller hangs
+                while not self._queue.empty():
+                    queued = self._queue.get_nowait()
+                    if queued is not _STOP:
+                        await self._apply([queued])
+                return
+
+    async def _apply(self, batch: List[WriterItem]):
+        started = time.monotonic()
+        try:
+            results = await asyncio.to_thread(run_in_session, self._apply_batch, batch)
+
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+
+            # Cached calls may be ahead of what was rolled back; reload them
+            for event_data, _, _, _ in batch:
+                message = event_data.get("message") or {}
+                call = event_data.get("call") or message.get("call") or {}
+                active_call_cache.invalidate(call.get("id"))
+
+            self.retried_batches += 1
+            logger.warning(f"Webhook batch of {len(batch)} events failed ({str(e)}), applying them one at a time")
+            for item in batch:
+                await self._apply([item])
+            return
+
+        self.batches += 1
+        self.events += len(batch)
+        self.commit_times.append(time.monotonic() - started)
+        for (_, _, _, future), result in zip(batch, results):
+            if future and not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _apply_batch(db: Session, batch: List[WriterItem]) -> List[Dict[str, Any]]:
+        """Apply a batch in one session; run_in_session commits it"""
+        return [apply(db) for _, apply, _, _ in batch]
+
+    def _fail(self, item: WriterItem, error: Exception):
+        event_data, _, _, future = item
+        self.failed += 1
+        if future and not future.done():
+            future.set_exception(error)
+        else:
+            logger.error(f"Error applying deferred {get_message_type(event_data)} event: {str(error)}")
+
+    def get_stats(self) -> dict:
+        """Batching and commit statistics"""
+        commit_times = sorted(self.commit_times)
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "events": self.events,
+            "batches": self.batches,
+            "avg_batch_size": self.events / self.batches if self.batches else 0.0,
+            "failed": self.failed,
+            "retried_batches": self.retried_batches,
+            "avg_commit_seconds": sum(commit_times) / len(commit_times) if commit_times else 0.0,
+        }
+
+
+webhook_commit_writer = WebhookCommitWriter(
+    window=settings.webhook_group_commit_window_ms / 1000,
+    max_batch=settings.webhook_group_commit_max_batch,
+    max_queue=settings.webhook_group_commit_max_queue,
+    durability=parse_durability(settings.webhook_commit_durability)
+)
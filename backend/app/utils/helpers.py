@@ -2,6 +2,15 @@ from app.database import Base
 from app.models.bill import Bill
 from app.models.call_log import CallLog
 from app.models.payment import Payment
+from app.models.call_job import CallJob
+from app.models.idempotency_key import IdempotencyKey
+from app.models.webhook_event import WebhookEvent, WebhookPartitionLease
+from app.models.transcript_segment import TranscriptSegment
+from app.models.sms_delivery import SmsDelivery
+from app.models.sms_blast import SmsBlast, SmsBlastRecipient
+from app.models.stats_counter import StatsCounter
+from app.models.call_lease import CallLease
+from app.models.worker_lease import WorkerLease
 
 # Import all models here so Alembic can detect them
-__all__ = ["Base", "Bill", "CallLog", "Payment"]
+__all__ = ["Base", "Bill", "CallLog", "Payment", "CallJob", "IdempotencyKey", "WebhookEvent", "WebhookPartitionLease", "TranscriptSegment", "SmsDelivery", "SmsBlast", "SmsBlastRecipient", "StatsCounter", "CallLease", "WorkerLease"]
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select, tuple_
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import binascii
+import json
+
+
+def encode_cursor(key: str, value: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past the row with this sort value and ID"""
+    payload = json.dumps({"k": key, "v": value.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str) -> Tuple[datetime, int]:
+    """(sort value, ID) of a cursor; ValueError if it is malformed or from another listing"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["k"] != key:
+            raise ValueError
+        return datetime.fromisoformat(payload["v"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_paginate(query, column, id_column, cursor: Optional[str], descending: bool = False):
+    """
+    Order a query by (column, id) and start it after the cursor
+
+    The row-value comparison is answered from a (column, id) index, so a
+    page deep in the listing costs the same as the first one. Fetch
+    limit + 1 rows and pass them to get_page.
+
+    The cursor row's value is read back by ID and compared as stored:
+    SQLite keeps server-default timestamps as "YYYY-MM-DD HH:MM:SS" but
+    binds datetimes with microseconds, so the decoded value would not sort
+    equal to the row it came from. The decoded value is only a fallback
+    for a row deleted between pages.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, column.key)
+        stored = select(column).where(id_column == row_id).correlate(None).scalar_subquery()
+        position = tuple_(column, id_column)
+        after = tuple_(func.coalesce(stored, value), row_id)
+        query = query.filter(position < after if descending else position > after)
+
+    if descending:
+        return query.order_by(column.desc(), id_column.desc())
+    return query.order_by(column, id_column)
+
+
+def get_page(rows: List[Any], limit: int, key: str) -> Tuple[List[Any], Optional[str]]:
+    """The first limit rows and the cursor of the next page, None on the last page"""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(key, getattr(last, key), last.id)
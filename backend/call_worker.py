@@ -0,0 +1,41 @@
+"""
+Standalone call job worker
+Run one or more of these processes to drain the call job queue in parallel
+with (or instead of) the worker embedded in the API process
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import logging
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db
+from app.services.call_job_service import CallJobWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the call job queue")
+    parser.add_argument("--concurrency", type=int, default=None, help="Calls this worker places at once")
+    parser.add_argument("--worker-id", default=None, help="Identifier recorded on claimed jobs")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    init_db()
+    worker = CallJobWorker(worker_id=args.worker_id, concurrency=args.concurrency)
+    
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
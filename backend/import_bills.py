@@ -0,0 +1,58 @@
+"""
+Bulk bill import
+Creates or updates bills from a CSV or NDJSON file, matched by bill
+number, the same way as POST /api/bills/bulk. The file is read a chunk
+at a time, so a whole billing cycle can be loaded in one run.
+"""
+
+import sys
+import os
+import argparse
+import logging
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, init_db
+from app.services.bill_import import import_bills, detect_format, IMPORT_FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import bills from a CSV or NDJSON file")
+    parser.add_argument("file", help="CSV file with a header row, or NDJSON with one bill per line; - reads stdin")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Default: from the file extension")
+    parser.add_argument("--show-errors", type=int, default=20, help="Number of row errors to print")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    init_db()
+    fmt = args.format or detect_format(args.file)
+    started = time.monotonic()
+
+    db = SessionLocal()
+    try:
+        if args.file == "-":
+            result = import_bills(db, sys.stdin, fmt)
+        else:
+            with open(args.file, encoding="utf-8-sig", newline="") as f:
+                result = import_bills(db, f, fmt)
+    finally:
+        db.close()
+
+    print(f"📥 {result['received']} rows: {result['inserted']} inserted, {result['updated']} updated, "
+          f"{result['failed']} failed in {time.monotonic() - started:.2f} s")
+    for error in result["errors"][:args.show_errors]:
+        print(f"  row {error['row']} ({error['bill_number'] or '-'}): {error['error']}")
+    if result["failed"] > args.show_errors:
+        print(f"  ... {result['failed'] - args.show_errors} more")
+
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
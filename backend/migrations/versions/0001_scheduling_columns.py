@@ -0,0 +1,67 @@
+"""Add the dialing, priority and phone number columns and the listing indexes
+
+Bills and call logs created before these columns existed. init_db()'s
+create_all never alters an existing table, so they are added here. Each
+step is skipped when it is already there, so the migration also runs on
+a database whose tables were created with the columns, or before the
+tables exist at all.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("bills", sa.Column("priority_score", sa.Float(), nullable=True)),
+    ("bills", sa.Column("dialing_until", sa.DateTime(), nullable=True)),
+    ("call_logs", sa.Column("phone_number_id", sa.String(), nullable=True)),
+)
+
+INDEXES = (
+    ("bills", "ix_bills_next_reminder_date", ["next_reminder_date"]),
+    ("bills", "ix_bills_priority_score", ["priority_score"]),
+    ("bills", "ix_bills_created_at_id", ["created_at", "id"]),
+    ("bills", "ix_bills_due_date_id", ["due_date", "id"]),
+    ("call_logs", "ix_call_logs_customer_phone", ["customer_phone"]),
+    ("call_logs", "ix_call_logs_phone_number_id", ["phone_number_id"]),
+    ("call_logs", "ix_call_logs_status_created_at", ["status", "created_at"]),
+    ("call_logs", "ix_call_logs_created_at_id", ["created_at", "id"]),
+)
+
+
+def upgrade():
+    # Offline (--sql) output is for a database with the baseline schema
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+    def missing(table, names):
+        """Names not yet in an existing table; nothing when init_db() will create the table"""
+        if inspector is None:
+            return set(names)
+        if not inspector.has_table(table):
+            return set()
+        return set(names) - {c["name"] for c in inspector.get_columns(table)} - {i["name"] for i in inspector.get_indexes(table)}
+
+    for table, column in COLUMNS:
+        if column.name in missing(table, [column.name]):
+            op.add_column(table, column)
+
+    for table, name, columns in INDEXES:
+        if name in missing(table, [name]):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    for table, column in reversed(COLUMNS):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column(column.name)
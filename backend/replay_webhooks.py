@@ -0,0 +1,60 @@
+"""
+Webhook journal replay
+Feeds raw VAPI events recorded in the webhook journal back through the
+webhook handlers, in the order they were received. Use it to backfill
+after a handler fix, to reproduce a call while debugging, or as load.
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import logging
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.database import init_db
+from app.services.webhook_journal import read_journal, replay_journal
+from app.services.vapi_event_handlers import TOOL_EVENT_TYPES
+
+
+def main():
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Replay journaled VAPI webhook events")
+    parser.add_argument("--dir", default=settings.webhook_journal_dir, help="Journal directory")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="Replay events received at or after this UTC time")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="Replay events received up to this UTC time")
+    parser.add_argument("--call-id", default=None, help="Only replay events of this VAPI call")
+    parser.add_argument("--types", default=None, help="Comma-separated message types to replay")
+    parser.add_argument("--include-tool-calls", action="store_true", help="Also replay tool calls; this re-sends payment link SMS")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = recorded pace, 10 = ten times faster, 0 = as fast as possible")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the events that would be replayed")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    init_db()
+    events = read_journal(args.dir, since=args.since, until=args.until)
+    stats = asyncio.run(replay_journal(
+        events,
+        speed=args.speed,
+        call_id=args.call_id,
+        event_types=args.types.split(",") if args.types else None,
+        exclude_types=None if args.include_tool_calls else list(TOOL_EVENT_TYPES),
+        dry_run=args.dry_run
+    ))
+
+    action = "Would replay" if args.dry_run else "Replayed"
+    print(f"🔁 {action} {stats['replayed']} events ({stats['failed']} failed, {stats['skipped']} skipped) "
+          f"in {stats['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, init_db
 from app.models.bill import Bill, BillStatus
+import app.services.stats_service  # noqa: F401 - keeps the stats counters in step with the seeded bills
 import uuid
 
 
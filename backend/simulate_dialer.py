@@ -0,0 +1,92 @@
+"""
+Dialer capacity simulator
+Estimates how long a collection drive of N customers takes with a given
+number of lines, phone numbers and rate limits, using call outcomes and
+durations sampled from the call history in the database. Nothing is dialed.
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.database import SessionLocal, init_db
+from app.services.dialer_simulator import CallProfile, DialerSimulator
+from app.services.phone_number_pool import get_configured_phone_number_ids
+
+
+def main():
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Simulate a dialing campaign against historical call data")
+    parser.add_argument("--customers", type=int, default=10000, help="Customers in the simulated drive")
+    parser.add_argument("--lines", type=int, default=settings.vapi_max_concurrent_calls, help="Concurrent calls")
+    parser.add_argument("--numbers", type=int, default=len(get_configured_phone_number_ids()), help="Outbound phone numbers")
+    parser.add_argument("--max-calls-per-number", type=int, default=settings.vapi_max_calls_per_number, help="Concurrent calls per number (0 = no cap)")
+    parser.add_argument("--calls-per-second", type=float, default=settings.vapi_calls_per_second, help="Call start rate limit")
+    parser.add_argument("--burst", type=int, default=settings.vapi_call_burst, help="Call start burst size")
+    parser.add_argument("--attempts", type=int, default=settings.call_retry_attempts, help="Call attempts per customer")
+    parser.add_argument("--retry-hours", type=float, default=settings.reminder_interval_hours, help="Delay before redialing an unanswered customer")
+    parser.add_argument("--hours-per-day", type=float, default=None, help="Calling hours per day, to express completion time in days")
+    parser.add_argument("--history-days", type=int, default=None, help="Only sample calls from the last N days")
+    parser.add_argument("--runs", type=int, default=1, help="Repeat the simulation and report mean and p10/p90")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        since = datetime.utcnow() - timedelta(days=args.history_days) if args.history_days else None
+        profile = CallProfile.from_call_logs(db, since=since)
+    except ValueError:
+        print("⚠️  No finished calls in the database, using the built-in illustrative profile")
+        profile = CallProfile.default()
+    finally:
+        db.close()
+
+    summary = profile.summary()
+    print(f"📊 Sampled {summary['samples']} calls: answer rate {summary['answer_rate']:.1%}, "
+          f"paid/promised {summary['paid_rate']:.1%}, avg line time {summary['avg_line_seconds']:.0f}s")
+
+    simulator = DialerSimulator(
+        profile=profile,
+        lines=args.lines,
+        calls_per_second=args.calls_per_second,
+        burst=args.burst,
+        numbers=args.numbers,
+        max_calls_per_number=args.max_calls_per_number,
+        retry_attempts=args.attempts,
+        retry_delay=args.retry_hours * 3600
+    )
+
+    print(f"📞 Simulating {args.customers} customers on {simulator.lines} lines "
+          f"({args.numbers} numbers, {args.calls_per_second}/s, {args.attempts} attempts)")
+
+    if args.runs > 1:
+        result = simulator.run_many(args.customers, args.runs, seed=args.seed)
+        for key in ("completion_hours", "line_utilization", "contact_yield", "payment_yield", "calls"):
+            stats = result[key]
+            print(f"   {key:<18} mean {stats['mean']:.3f}   p10 {stats['p10']:.3f}   p90 {stats['p90']:.3f}")
+        hours = result["completion_hours"]["mean"]
+    else:
+        result = simulator.run(args.customers, seed=args.seed)
+        print(f"   Calls placed:        {result['calls']}")
+        print(f"   Completion time:     {result['completion_hours']:.2f} h")
+        print(f"   Line utilization:    {result['line_utilization']:.1%}")
+        print(f"   Avg rate-limit wait: {result['avg_rate_limit_wait_seconds']:.1f} s")
+        print(f"   Contacts:            {result['contacts']} ({result['contact_yield']:.1%} of customers)")
+        print(f"   Payments/promises:   {result['payments']} ({result['payment_yield']:.1%} of customers)")
+        hours = result["completion_hours"]
+
+    if args.hours_per_day:
+        print(f"   Calendar days at {args.hours_per_day:g} h/day: {hours / args.hours_per_day:.1f}")
+
+    print(f"⏱️  Simulated in {result['simulation_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
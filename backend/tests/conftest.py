@@ -0,0 +1,100 @@
+"""
+Test setup: a throwaway SQLite database, no background workers, and fake
+VAPI / Twilio credentials. The environment is set before anything under
+app/ is imported, because settings and engines are built at import time.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp(prefix="bills-tests-")
+
+os.environ.update({
+    "VAPI_API_KEY": "test-key",
+    "VAPI_PHONE_NUMBER_ID": "pn-test",
+    "VAPI_ASSISTANT_ID": "asst-test",
+    "TWILIO_ACCOUNT_SID": "ACtest",
+    "TWILIO_AUTH_TOKEN": "test-token",
+    "TWILIO_PHONE_NUMBER": "+15550000000",
+    "DATABASE_URL": f"sqlite:///{_db_dir}/bills.db",
+    "CALL_JOB_WORKER_ENABLED": "false",
+    "REMINDER_SCHEDULER_ENABLED": "false",
+    "CALL_RECONCILER_ENABLED": "false",
+    "OVERDUE_MARKER_ENABLED": "false",
+    "WEBHOOK_WORKER_ENABLED": "false",
+    "WEBHOOK_INGEST_MODE": "sync",
+    "WEBHOOK_JOURNAL_ENABLED": "false",
+    "WEBHOOK_GROUP_COMMIT_ENABLED": "false",
+    "TWILIO_VALIDATE_SIGNATURE": "false",
+})
+
+import pytest
+from datetime import datetime, timedelta
+
+import app.models  # noqa: F401 - registers every table on Base
+import app.services  # noqa: F401 - registers the stats counter session hooks
+from app.database import Base, engine, SessionLocal
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    """Fresh tables for every test"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def bill_data(i: int, **values) -> dict:
+    """BillCreate fields for the i-th test bill"""
+    return {
+        "customer_name": f"Customer {i}",
+        "customer_phone": f"+9198765{i:05d}",
+        "consumer_number": f"CONS{i:05d}",
+        "bill_number": f"BILL{i:05d}",
+        "bill_amount": 100.0 + i,
+        "due_date": (datetime.utcnow() + timedelta(days=10)).isoformat(),
+        **values,
+    }
+
+
+def counter_snapshot(db) -> dict:
+    """Non-empty stats counters as {(kind, name): (count, amount)}"""
+    from app.services.stats_service import StatsService
+
+    db.expire_all()
+    return {
+        (kind, name): (counter.count, round(counter.amount, 2))
+        for kind, counters in StatsService.get_counters(db).items()
+        for name, counter in counters.items()
+        if counter.count or round(counter.amount, 2)
+    }
+
+
+def assert_counters_match_rebuild(db):
+    """The running stats counters equal a recount of the tables"""
+    from app.services.stats_service import StatsService
+
+    counters = counter_snapshot(db)
+    StatsService.rebuild(db)
+    assert counters == counter_snapshot(db)
@@ -0,0 +1,65 @@
+import io
+import json
+from app.models import Bill, BillStatus
+from app.services.bill_import import BillImport, import_bills, iter_rows
+from conftest import assert_counters_match_rebuild, bill_data
+
+
+def ndjson(*rows) -> io.StringIO:
+    return io.StringIO("".join((row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows))
+
+
+def test_upsert_inserts_new_bills_and_updates_existing_ones(db):
+    result = import_bills(db, ndjson(bill_data(0), bill_data(1)), "ndjson")
+    assert (result["inserted"], result["updated"], result["failed"]) == (2, 0, 0)
+
+    paid = db.query(Bill).filter(Bill.bill_number == "BILL00000").one()
+    paid.status = BillStatus.PAID
+    db.commit()
+    link = paid.payment_link
+
+    result = import_bills(db, ndjson(bill_data(0, bill_amount=500.0), bill_data(2)), "ndjson")
+    assert (result["inserted"], result["updated"], result["failed"]) == (1, 1, 0)
+
+    db.expire_all()
+    paid = db.query(Bill).filter(Bill.bill_number == "BILL00000").one()
+    # Re-imported bills get the new details but keep their status and link
+    assert paid.bill_amount == 500.0
+    assert paid.status == BillStatus.PAID
+    assert paid.payment_link == link
+    assert db.query(Bill).count() == 3
+    assert_counters_match_rebuild(db)
+
+
+def test_bad_rows_are_reported_without_failing_the_import(db):
+    rows = ndjson(
+        bill_data(0),
+        "{not json",
+        bill_data(1, bill_amount="lots"),
+        bill_data(2),
+        bill_data(3, consumer_number="CONS00000"),
+        bill_data(2, customer_name="Customer 2 again"),
+    )
+    result = BillImport(db, chunk_size=10, max_errors=3).run(iter_rows(rows, "ndjson"))
+
+    assert (result["received"], result["inserted"], result["failed"]) == (6, 2, 4)
+    # Only the first max_errors errors are kept
+    assert [(e["row"], e["bill_number"]) for e in result["errors"]] == [(2, None), (3, "BILL00001"), (4, "BILL00002")]
+    assert result["errors_truncated"]
+
+    db.expire_all()
+    assert db.query(Bill.bill_number).order_by(Bill.bill_number).all() == [("BILL00000",), ("BILL00002",)]
+    assert db.query(Bill).filter(Bill.bill_number == "BILL00002").one().customer_name == "Customer 2 again"
+    assert_counters_match_rebuild(db)
+
+
+def test_consumer_number_conflict_fails_only_its_row(db):
+    import_bills(db, ndjson(bill_data(0)), "ndjson")
+
+    result = import_bills(db, ndjson(bill_data(1), bill_data(2, consumer_number="CONS00000"), bill_data(3)), "ndjson")
+
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["errors"] == [
+        {"row": 2, "bill_number": "BILL00002", "error": "Consumer number already belongs to another bill"}
+    ]
+    assert_counters_match_rebuild(db)
@@ -0,0 +1,79 @@
+import asyncio
+from app.database import run_in_session
+from app.models import CallJob
+from app.models.call_job import CallJobStatus
+from app.schemas.bill import BillCreate
+from app.services.bill_service import BillService
+from app.services.call_job_service import CallJobService, CallJobWorker
+from app.services.call_service import CallService
+from conftest import bill_data
+from datetime import datetime, timedelta
+
+
+def queue_job(db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    return CallJobService.enqueue(db, bill.id, customer_phone=bill.customer_phone).id
+
+
+def expire_lock(db, job_id):
+    db.query(CallJob).filter(CallJob.id == job_id).update({"locked_at": datetime.utcnow() - timedelta(days=1)})
+    db.commit()
+
+
+def test_worker_dials_and_completes_its_job(db, monkeypatch):
+    job_id = queue_job(db)
+
+    async def dial(bill):
+        return {"id": "call-1"}
+
+    monkeypatch.setattr(CallService, "dial", staticmethod(dial))
+    worker = CallJobWorker(worker_id="a", concurrency=1)
+
+    async def run():
+        [(claimed_id, attempt)] = await asyncio.to_thread(run_in_session, worker._claim, 1)
+        await worker._execute(claimed_id, attempt)
+
+    asyncio.run(run())
+
+    db.expire_all()
+    job = CallJobService.get_job(db, job_id)
+    assert job.status == CallJobStatus.SUCCEEDED
+    assert job.active_bill_id is None
+
+
+def test_requeued_claim_cannot_finish_the_job(db):
+    job_id = queue_job(db)
+    first = CallJobWorker(worker_id="a", concurrency=1)
+    second = CallJobWorker(worker_id="b", concurrency=1)
+
+    [(_, first_attempt)] = run_in_session(first._claim, 1)
+    expire_lock(db, job_id)
+    assert run_in_session(CallJobService.requeue_stale_jobs) == 1
+
+    db.query(CallJob).update({"run_at": datetime.utcnow()})
+    db.commit()
+    [(_, second_attempt)] = run_in_session(second._claim, 1)
+    assert second_attempt == first_attempt + 1
+
+    # The first worker's dial finally returns; its outcome is dropped
+    run_in_session(first._finish, job_id, first_attempt, CallJobService.complete_job, None)
+
+    db.expire_all()
+    job = CallJobService.get_job(db, job_id)
+    assert job.status == CallJobStatus.RUNNING
+    assert job.locked_by == "b"
+
+
+def test_stale_check_leaves_a_finished_claim_alone(db):
+    job_id = queue_job(db)
+    worker = CallJobWorker(worker_id="a", concurrency=1)
+    [(_, attempt)] = run_in_session(worker._claim, 1)
+    cutoff = datetime.utcnow() - timedelta(seconds=60)
+
+    # Read as stale, but the worker touched the job before the requeue
+    assert run_in_session(CallJobService.hold_job, job_id, "a", attempt, cutoff) is None
+    assert run_in_session(CallJobService.requeue_stale_jobs) == 0
+
+    run_in_session(worker._finish, job_id, attempt, CallJobService.complete_job, None)
+    db.expire_all()
+    assert CallJobService.get_job(db, job_id).status == CallJobStatus.SUCCEEDED
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.database import run_in_session
+from app.models import CallLease
+from app.services.call_leases import CALLS_POOL, CallLeaseStore, number_pool
+from app.services.call_limiter import CallLimiter, CallLimitExceeded
+from app.services.phone_number_pool import PhoneNumberPool
+from datetime import datetime, timedelta
+
+
+def limiter(max_calls=2, max_wait=0.2):
+    return CallLimiter(calls_per_second=100, burst=100, max_concurrent_calls=max_calls, max_wait=max_wait, lease_seconds=60)
+
+
+def test_slots_are_shared_between_processes():
+    # Two limiters stand in for two API processes using the same database
+    first, second = limiter(), limiter()
+
+    async def run():
+        keys = [await first.acquire(), await second.acquire()]
+        with pytest.raises(CallLimitExceeded):
+            await first.acquire()
+        return keys
+
+    keys = asyncio.run(run())
+    run_in_session(CallLeaseStore.bind, keys[0], "call-1")
+
+    # The end webhook may reach a process that did not place the call
+    assert run_in_session(CallLeaseStore.release, "call-1") == 1
+    assert asyncio.run(second.acquire())
+
+
+def test_expired_lease_is_taken_over(db):
+    first = limiter(max_calls=1)
+    asyncio.run(first.acquire())
+
+    db.query(CallLease).update({"acquired_at": datetime.utcnow() - timedelta(seconds=120)})
+    db.commit()
+
+    assert asyncio.run(limiter(max_calls=1).acquire())
+
+
+def test_number_cap_holds_across_pools(db):
+    pools = [
+        PhoneNumberPool(["pn-a", "pn-b"], max_calls_per_number=1, max_concurrent_calls=10,
+                        strategy="least_loaded", max_wait=0.2, lease_seconds=60)
+        for _ in range(2)
+    ]
+
+    async def run():
+        assigned = [await pools[0].acquire("key-1"), await pools[1].acquire("key-2")]
+        with pytest.raises(CallLimitExceeded):
+            await pools[0].acquire("key-3")
+        return assigned
+
+    assert sorted(asyncio.run(run())) == ["pn-a", "pn-b"]
+    assert pools[1].get_live_calls(db) == {"pn-a": 1, "pn-b": 1}
+
+    live = CallLeaseStore.count_live(db, 60)
+    assert live == {number_pool("pn-a"): 1, number_pool("pn-b"): 1}
+    assert CALLS_POOL not in live
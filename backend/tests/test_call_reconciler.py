@@ -0,0 +1,48 @@
+import asyncio
+from app.models import CallLog, CallStatus
+from app.schemas.bill import BillCreate
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_reconciler import CallReconciler, build_synthetic_event
+from app.services.call_service import CallService
+from app.services.vapi_event_handlers import process_vapi_event
+from conftest import bill_data
+
+
+def reconciler():
+    return CallReconciler(interval=60, stale_seconds=300, concurrency=2, batch_size=10, lease_seconds=180)
+
+
+def test_only_one_process_holds_the_reconciler_lease():
+    first, second = reconciler(), reconciler()
+
+    assert first._claim_lease()
+    assert first._claim_lease()  # renewing
+    assert not second._claim_lease()
+
+    first._release_lease()
+    assert second._claim_lease()
+
+
+def place_call(db, i, call_id):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(i)))
+    call_log = CallService.record_call(db, bill, {"id": call_id})
+    active_call_cache.invalidate(call_id)
+    return call_log
+
+
+def test_ended_call_gets_the_status_of_its_ended_reason(db):
+    reasons = {
+        "customer-did-not-answer": CallStatus.NO_ANSWER,
+        "customer-busy": CallStatus.BUSY,
+        "twilio-failed-to-connect-call": CallStatus.FAILED,
+        "customer-ended-call": CallStatus.COMPLETED,
+    }
+    for i, reason in enumerate(reasons):
+        place_call(db, i, f"call-{i}")
+        event = build_synthetic_event({"id": f"call-{i}", "status": "ended", "endedReason": reason})
+        asyncio.run(process_vapi_event(event))
+
+    db.expire_all()
+    for i, status in enumerate(reasons.values()):
+        assert db.query(CallLog).filter(CallLog.vapi_call_id == f"call-{i}").one().status == status
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from app.database import AsyncSessionLocal
+from app.models import Bill
+from app.schemas.bill import BillCreate
+from app.services.bill_service import BillService
+from app.services.call_service import CallAlreadyActive, CallService
+from conftest import bill_data
+
+
+def place_call(bill_id):
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await CallService.place_call(session, await session.get(Bill, bill_id))
+    return asyncio.run(run())
+
+
+def test_dial_reservation_keeps_out_other_processes(db, monkeypatch):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(1)))
+    bill_id = bill.id
+
+    async def dial(bill):
+        # Meanwhile another process tries the same bill; _in_flight_calls is per process
+        with pytest.raises(CallAlreadyActive):
+            CallService.reserve_dial(db, bill_id)
+        return {"id": "call-1"}
+
+    monkeypatch.setattr(CallService, "dial", staticmethod(dial))
+
+    call_log = place_call(bill_id)
+    assert call_log.vapi_call_id == "call-1"
+    assert db.query(Bill.dialing_until).filter(Bill.id == bill_id).scalar() is None
+
+    # The live call now keeps the next dial out, and the reservation is not left behind
+    with pytest.raises(CallAlreadyActive):
+        CallService.reserve_dial(db, bill_id)
+    assert db.query(Bill.dialing_until).filter(Bill.id == bill_id).scalar() is None
+
+
+def test_failed_dial_releases_the_bill(db, monkeypatch):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(1)))
+
+    async def dial(bill):
+        raise RuntimeError("VAPI unavailable")
+
+    monkeypatch.setattr(CallService, "dial", staticmethod(dial))
+
+    with pytest.raises(RuntimeError):
+        place_call(bill.id)
+
+    CallService.reserve_dial(db, bill.id)
@@ -0,0 +1,30 @@
+from app.services.call_tools import get_customer_timezone, parse_callback_time, tool_dispatcher
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# 10:00 in Kolkata (UTC+5:30)
+NOW = datetime(2026, 3, 2, 4, 30)
+
+
+def test_clock_times_are_in_the_customers_timezone():
+    kolkata = ZoneInfo("Asia/Kolkata")
+
+    assert parse_callback_time("5 pm", now=NOW, tz=kolkata) == datetime(2026, 3, 2, 11, 30)
+    assert parse_callback_time("tomorrow at 9:15 am", now=NOW, tz=kolkata) == datetime(2026, 3, 3, 3, 45)
+    # Already past today, so tomorrow
+    assert parse_callback_time("9 am", now=NOW, tz=kolkata) == datetime(2026, 3, 3, 3, 30)
+    assert parse_callback_time("2026-03-05T18:00", now=NOW, tz=kolkata) == datetime(2026, 3, 5, 12, 30)
+    assert parse_callback_time("2026-03-05T18:00+00:00", now=NOW, tz=kolkata) == datetime(2026, 3, 5, 18, 0)
+    assert parse_callback_time("in 2 hours", now=NOW, tz=kolkata) == datetime(2026, 3, 2, 6, 30)
+
+
+def test_unknown_timezone_falls_back_to_the_configured_one():
+    assert get_customer_timezone("Mars/Olympus") == ZoneInfo("Asia/Kolkata")
+    assert get_customer_timezone("America/New_York") == ZoneInfo("America/New_York")
+    # 5 pm EST is 22:00 UTC
+    assert parse_callback_time("5 pm", now=NOW, tz=get_customer_timezone("America/New_York")) == datetime(2026, 3, 2, 22, 0)
+
+
+def test_fallbacks_do_not_claim_the_change_was_saved():
+    for name in ("confirm_payment", "customer_disputed"):
+        assert tool_dispatcher.tools[name].fallback["success"] is False
@@ -0,0 +1,76 @@
+import asyncio
+from app.database import AsyncSessionLocal
+from app.schemas.bill import BillCreate
+from app.schemas.campaign import CampaignStatus
+from app.services import campaign_service
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.campaign_service import CampaignManager
+from conftest import bill_data
+
+
+def create_bills(db, count):
+    for i in range(count):
+        BillService.create_bill(db, BillCreate(**bill_data(i)))
+
+
+def test_failed_lookups_leave_nothing_remaining(db, monkeypatch):
+    create_bills(db, 3)
+
+    async def broken_lookup(db, bill_id):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(campaign_service.AsyncBillService, "get_bill", broken_lookup)
+
+    async def run():
+        manager = CampaignManager()
+        async with AsyncSessionLocal() as session:
+            campaign = await manager.create_campaign(session, concurrency=2)
+        await campaign._task
+        return campaign
+
+    campaign = asyncio.run(run())
+    assert campaign.status == CampaignStatus.COMPLETED
+    assert campaign.failed == 3
+    assert campaign.dialed == 0
+    assert campaign.remaining == 0
+
+
+def test_cancel_lets_calls_being_placed_finish(db, monkeypatch):
+    create_bills(db, 4)
+    placed = []
+
+    async def place_call(db, bill):
+        await asyncio.sleep(0.05)
+        placed.append(bill.id)
+
+    monkeypatch.setattr(CallService, "place_call", staticmethod(place_call))
+
+    async def run():
+        manager = CampaignManager()
+        async with AsyncSessionLocal() as session:
+            campaign = await manager.create_campaign(session, concurrency=2)
+        await asyncio.sleep(0.01)
+        manager.cancel_campaign(campaign.id)
+        await campaign._task
+        return campaign
+
+    campaign = asyncio.run(run())
+    assert campaign.status == CampaignStatus.CANCELLED
+    # The two dials started before the cancel completed; nothing new was dialed
+    assert len(placed) == 2
+    assert campaign.succeeded == 2
+    assert campaign.remaining == 2
+
+
+def test_create_campaign_route(client, db, monkeypatch):
+    create_bills(db, 3)
+
+    async def place_call(db, bill):
+        return None
+
+    monkeypatch.setattr(CallService, "place_call", staticmethod(place_call))
+
+    response = client.post("/api/campaigns/", json={"concurrency": 2})
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
@@ -0,0 +1,47 @@
+import gzip
+import importlib
+import json
+import pytest
+import replay_webhooks
+import sys
+from app.models import CallLog, CallStatus
+from app.schemas.bill import BillCreate
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from conftest import bill_data
+from datetime import datetime
+
+
+@pytest.mark.parametrize("script", [
+    "call_worker", "import_bills", "replay_webhooks", "seed_data", "simulate_dialer", "webhook_worker"
+])
+def test_cli_scripts_import(script):
+    importlib.import_module(script)
+
+
+def write_segment(directory, events):
+    with gzip.open(directory / f"vapi-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-1.jsonl.gz", "wt") as f:
+        for event in events:
+            f.write(json.dumps({"received_at": datetime.utcnow().isoformat(), "event": event}) + "\n")
+
+
+def test_replay_webhooks_replays_the_journal_without_tool_calls(db, tmp_path, monkeypatch, capsys):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": "call-1"})
+    active_call_cache.invalidate("call-1")
+
+    write_segment(tmp_path, [
+        {"message": {"type": "status-update", "status": "in-progress"}, "call": {"id": "call-1"}},
+        {
+            "message": {"type": "tool-calls", "toolCalls": [{"function": {"name": "send_payment_link", "arguments": "{}"}}]},
+            "call": {"id": "call-1"},
+        },
+    ])
+    monkeypatch.setattr(sys, "argv", ["replay_webhooks.py", "--dir", str(tmp_path)])
+
+    replay_webhooks.main()
+
+    assert "Replayed 1 events (0 failed, 1 skipped)" in capsys.readouterr().out
+    db.expire_all()
+    assert db.query(CallLog).one().status == CallStatus.IN_PROGRESS
@@ -0,0 +1,55 @@
+import os
+import pytest
+from alembic import command
+from alembic.config import Config
+from app.database import check_schema, engine
+from sqlalchemy import inspect, text
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# Added to the baseline bills and call_logs tables
+NEW_INDEXES = {
+    "bills": ["ix_bills_next_reminder_date", "ix_bills_priority_score", "ix_bills_created_at_id", "ix_bills_due_date_id"],
+    "call_logs": [
+        "ix_call_logs_customer_phone",
+        "ix_call_logs_phone_number_id",
+        "ix_call_logs_status_created_at",
+        "ix_call_logs_created_at_id",
+    ],
+}
+NEW_COLUMNS = {"bills": ["priority_score", "dialing_until"], "call_logs": ["phone_number_id"]}
+
+
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Tables are recreated for every test, so no migration has run on them"""
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def downgrade_to_baseline():
+    with engine.begin() as connection:
+        for table, indexes in NEW_INDEXES.items():
+            for index in indexes:
+                connection.execute(text(f"DROP INDEX {index}"))
+        for table, columns in NEW_COLUMNS.items():
+            for column in columns:
+                connection.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+def test_upgrade_adds_the_columns_a_baseline_database_lacks():
+    downgrade_to_baseline()
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        check_schema()
+
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
+    check_schema()
+    inspector = inspect(engine)
+    for table, indexes in NEW_INDEXES.items():
+        assert set(indexes) <= {index["name"] for index in inspector.get_indexes(table)}
+
+
+def test_upgrade_of_a_current_database_changes_nothing():
+    command.upgrade(Config(ALEMBIC_INI), "head")
+    check_schema()
@@ -0,0 +1,56 @@
+import asyncio
+from app.models import Bill, BillStatus
+from app.models.worker_lease import WorkerLease
+from app.schemas.bill import BillCreate
+from app.services.bill_service import BillService
+from app.services.overdue_marker import OverdueMarker
+from conftest import bill_data, assert_counters_match_rebuild
+from datetime import datetime, timedelta
+
+
+def create_bills(db, count, **values):
+    return [BillService.create_bill(db, BillCreate(**bill_data(i, **values))) for i in range(count)]
+
+
+def test_overdue_list_does_not_mark_bills(client, db):
+    create_bills(db, 2, due_date=(datetime.utcnow() - timedelta(days=1)).isoformat())
+
+    response = client.get("/api/bills/overdue/list")
+    assert response.json()["total"] == 0
+    assert response.json()["bills"] == []
+
+    BillService.mark_overdue_bills(db)
+
+    response = client.get("/api/bills/overdue/list")
+    assert response.json()["total"] == 2
+    assert len(response.json()["bills"]) == 2
+
+
+def test_marker_marks_while_holding_the_lease(db):
+    create_bills(db, 2, due_date=(datetime.utcnow() - timedelta(days=1)).isoformat())
+    holder = OverdueMarker(interval=60, lease_seconds=60)
+    other = OverdueMarker(interval=60, lease_seconds=60)
+
+    async def run(marker):
+        marker.start()
+        await asyncio.sleep(0.2)
+        await marker.stop()
+
+    assert holder._claim_lease()
+    asyncio.run(run(other))
+    db.expire_all()
+    assert db.query(Bill).filter(Bill.status == BillStatus.OVERDUE).count() == 0
+
+    holder._release_lease()
+    asyncio.run(run(other))
+    db.expire_all()
+    assert db.query(Bill).filter(Bill.status == BillStatus.OVERDUE).count() == 2
+    assert db.query(WorkerLease.owner).filter(WorkerLease.name == OverdueMarker.LEASE_NAME).scalar() is None
+    assert_counters_match_rebuild(db)
+
+
+def test_pending_total_is_opt_in(client, db):
+    create_bills(db, 3)
+
+    assert client.get("/api/bills/pending/list").json()["total"] is None
+    assert client.get("/api/bills/pending/list?include_total=true").json()["total"] == 3
@@ -0,0 +1,82 @@
+import pytest
+from app.models import CallLog
+from app.utils.pagination import decode_cursor, encode_cursor
+from conftest import bill_data
+from datetime import datetime
+
+
+def import_bills(client, count):
+    rows = "".join(
+        f"{b['customer_name']},{b['customer_phone']},{b['consumer_number']},{b['bill_number']},{b['bill_amount']},{b['due_date']}\n"
+        for b in (bill_data(i) for i in range(count))
+    )
+    response = client.post(
+        "/api/bills/bulk",
+        files={"file": ("bills.csv", "customer_name,customer_phone,consumer_number,bill_number,bill_amount,due_date\n" + rows, "text/csv")}
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == count
+
+
+def follow(client, path, key="bills", limit=2, max_pages=50, **params):
+    """Every row of a listing, page by page"""
+    rows, cursor = [], None
+    for _ in range(max_pages):
+        response = client.get(path, params={"limit": limit, **params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        if key:
+            page, cursor = response.json()[key], response.json()["next_cursor"]
+        else:
+            page, cursor = response.json(), response.headers.get("X-Next-Cursor")
+        rows.extend(page)
+        if not cursor:
+            return rows
+    pytest.fail(f"{path} did not end after {max_pages} pages")
+
+
+def test_bills_created_in_the_same_second_page_once_each(client):
+    # Bulk-imported rows share the server-default created_at second
+    import_bills(client, 7)
+
+    bills = follow(client, "/api/bills")
+
+    assert [bill["bill_number"] for bill in bills] == [f"BILL{i:05d}" for i in reversed(range(7))]
+
+
+def test_pending_list_pages_by_due_date(client):
+    for i in range(5):
+        client.post("/api/bills/", json=bill_data(i, due_date=datetime(2030, 1, 5 - i % 2).isoformat()))
+
+    bills = follow(client, "/api/bills/pending/list")
+
+    assert len({bill["id"] for bill in bills}) == 5
+    assert [(bill["due_date"], bill["id"]) for bill in bills] == sorted((bill["due_date"], bill["id"]) for bill in bills)
+
+
+def test_call_logs_page_through_header_cursor(client, db):
+    client.post("/api/bills/", json=bill_data(1))
+    db.add_all([CallLog(bill_id=1, customer_phone="+1") for _ in range(5)])
+    db.commit()
+
+    calls = follow(client, "/api/calls/", key=None)
+
+    assert [call["id"] for call in calls] == [5, 4, 3, 2, 1]
+
+
+def test_cursor_from_another_listing_is_rejected(client):
+    cursor = encode_cursor("due_date", datetime(2030, 1, 1), 1)
+
+    assert client.get("/api/bills/", params={"cursor": cursor}).status_code == 400
+    assert client.get("/api/bills/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert decode_cursor(cursor, "due_date") == (datetime(2030, 1, 1), 1)
+
+
+def test_priority_list_returns_scored_bills(client):
+    for i in range(3):
+        client.post("/api/bills/", json=bill_data(i))
+
+    body = client.get("/api/bills/priority/list").json()
+
+    assert body["total"] == 3
+    assert len(body["bills"]) == 3
+    assert all(bill["priority_score"] is not None for bill in body["bills"])
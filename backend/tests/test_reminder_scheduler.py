@@ -0,0 +1,68 @@
+import asyncio
+import sys
+from app.models import Bill, CallJob
+from app.schemas.bill import BillCreate
+from app.services.bill_service import BillService
+from app.services.call_job_service import CallJobService
+from app.services.reminder_scheduler import ReminderScheduler
+from conftest import bill_data
+from datetime import datetime, timedelta
+
+reminder_module = sys.modules["app.services.reminder_scheduler"]
+
+
+def due_bill(db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    due = datetime.utcnow() - timedelta(minutes=1)
+    bill.next_reminder_date = due
+    db.commit()
+    return bill.id, due
+
+
+def dispatch(bill_id, due):
+    scheduler = ReminderScheduler(window=100, resync_seconds=60)
+    asyncio.run(scheduler._dispatch(bill_id, due))
+
+
+def test_due_reminder_queues_a_call_and_clears_the_reminder(db):
+    bill_id, due = due_bill(db)
+
+    dispatch(bill_id, due)
+
+    db.expire_all()
+    assert db.query(Bill.next_reminder_date).scalar() is None
+    assert db.query(CallJob).filter(CallJob.bill_id == bill_id).count() == 1
+
+
+def test_reminder_stays_due_when_the_enqueue_fails(db, monkeypatch):
+    bill_id, due = due_bill(db)
+
+    def fail(db, bill_id, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(CallJobService, "enqueue", staticmethod(fail))
+
+    dispatch(bill_id, due)
+
+    db.expire_all()
+    assert db.query(Bill.next_reminder_date).scalar() == due
+    assert db.query(CallJob).count() == 0
+
+
+def test_sms_channel_sends_after_clearing_the_reminder(db, monkeypatch):
+    bill_id, due = due_bill(db)
+    sent = []
+
+    async def send_reminder(**kwargs):
+        sent.append(kwargs["to_number"])
+        return {"success": True}
+
+    monkeypatch.setattr(reminder_module.settings, "reminder_channel", "sms")
+    monkeypatch.setattr(reminder_module.twilio_service, "send_reminder", send_reminder)
+
+    dispatch(bill_id, due)
+
+    db.expire_all()
+    assert sent == [bill_data(0)["customer_phone"]]
+    assert db.query(Bill.next_reminder_date).scalar() is None
+    assert db.query(CallJob).count() == 0
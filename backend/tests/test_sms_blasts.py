@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from app.database import run_in_session
+from app.models.sms_blast import SmsBlast, SmsBlastStatus, SmsBlastRecipient, SmsRecipientStatus
+from app.schemas.bill import BillCreate
+from app.services import sms_blast_service
+from app.services.bill_service import BillService
+from app.services.sms_blast_service import SmsBlastService, SmsBlastRunner
+from conftest import bill_data
+from datetime import datetime, timedelta
+
+
+def create_overdue_bills(db, count):
+    due_date = (datetime.utcnow() - timedelta(days=3)).isoformat()
+    for i in range(count):
+        BillService.create_bill(db, BillCreate(**bill_data(i, due_date=due_date)))
+
+
+def fake_send(delay: float, threads: set):
+    async def send_reminder(**kwargs):
+        threads.add(threading.get_ident())
+        await asyncio.sleep(delay)
+        return {"success": True, "sid": f"SM{kwargs['to_number']}"}
+    return send_reminder
+
+
+def test_slow_blast_keeps_its_heartbeat_fresh(db, monkeypatch):
+    create_overdue_bills(db, 1)
+    blast = SmsBlastService.create_blast(db, "slow", 1.0, None)
+    monkeypatch.setattr(sms_blast_service.twilio_service, "send_reminder", fake_send(1.0, set()))
+    runner = SmsBlastRunner(concurrency=1, chunk_size=10, stale_seconds=0.3)
+    other = SmsBlastRunner(concurrency=1, chunk_size=10, stale_seconds=0.3)
+
+    async def scenario():
+        assert await runner.resume(blast.id)
+        # The single send takes longer than the stale timeout
+        await asyncio.sleep(0.6)
+        taken_over = await asyncio.to_thread(
+            run_in_session, SmsBlastService.claim, blast.id, other.owner, other.stale_seconds
+        )
+        await runner._tasks[blast.id]
+        return taken_over
+
+    assert asyncio.run(scenario()) is False
+
+    db.expire_all()
+    blast = db.query(SmsBlast).one()
+    assert blast.status == SmsBlastStatus.COMPLETED
+    assert blast.sent == 1
+
+
+def test_blast_database_work_runs_off_the_event_loop(db, monkeypatch):
+    create_overdue_bills(db, 3)
+    blast = SmsBlastService.create_blast(db, "fast", 100.0, None)
+    monkeypatch.setattr(sms_blast_service.twilio_service, "send_reminder", fake_send(0, set()))
+    runner = SmsBlastRunner(concurrency=2, chunk_size=2, stale_seconds=30)
+    db_threads = set()
+
+    def traced(fn):
+        def wrapper(db, *args):
+            db_threads.add(threading.get_ident())
+            return fn(db, *args)
+        return wrapper
+
+    monkeypatch.setattr(runner, "_next_chunk", traced(runner._next_chunk))
+    monkeypatch.setattr(runner, "_record", traced(runner._record))
+
+    async def scenario():
+        assert await runner.resume(blast.id)
+        await runner._tasks[blast.id]
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert db_threads and loop_thread not in db_threads
+
+    db.expire_all()
+    assert db.query(SmsBlast).one().sent == 3
+    assert db.query(SmsBlastRecipient).filter(SmsBlastRecipient.status == SmsRecipientStatus.SENT).count() == 3
+
+
+def test_create_blast_route(client, db, monkeypatch):
+    create_overdue_bills(db, 2)
+    # Slow sends keep the blast running until it is cancelled
+    monkeypatch.setattr(sms_blast_service.twilio_service, "send_reminder", fake_send(5.0, set()))
+
+    response = client.post("/api/sms-blasts/", json={"name": "overdue", "messages_per_second": 50})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+
+    blast_id = response.json()["id"]
+    response = client.post(f"/api/sms-blasts/{blast_id}/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == SmsBlastStatus.CANCELLED.value
@@ -0,0 +1,73 @@
+import asyncio
+from app.database import AsyncSessionLocal
+from app.models import Bill, BillStatus
+from app.schemas.bill import BillCreate, BillUpdate
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import AsyncBillService, BillService
+from app.services.call_service import CallService
+from app.services.vapi_event_handlers import process_vapi_event
+from conftest import assert_counters_match_rebuild, bill_data
+from datetime import datetime, timedelta
+
+
+def create_bills(db, count, **values):
+    return [BillService.create_bill(db, BillCreate(**bill_data(i, **values))) for i in range(count)]
+
+
+def test_bill_changes_keep_the_counters_in_step(db, client):
+    bills = create_bills(db, 5)
+
+    BillService.update_bill(db, bills[0].id, BillUpdate(bill_amount=250.0))
+    BillService.update_bill(db, bills[1].id, BillUpdate(status=BillStatus.CANCELLED, bill_amount=90.0))
+    BillService.mark_bill_called(db, bills[2].id)
+    BillService.mark_bill_paid(db, bills[3].id, "pay-1", datetime.utcnow())
+    BillService.delete_bill(db, bills[4].id)
+    assert_counters_match_rebuild(db)
+
+    stats = client.get("/api/stats").json()
+    assert stats["bills"]["total"] == 4
+    assert stats["bills"]["by_status"]["paid"] == {"count": 1, "amount": 103.0}
+    assert stats["collection_rate"] == 25.0
+
+
+def test_bulk_overdue_update_moves_the_counters(db):
+    create_bills(db, 3, due_date=(datetime.utcnow() - timedelta(days=1)).isoformat())
+    BillService.mark_bill_paid(db, db.query(Bill.id).first()[0], "pay-1", datetime.utcnow())
+
+    assert BillService.mark_overdue_bills(db, batch_size=1) == 2
+    assert_counters_match_rebuild(db)
+
+
+def test_async_session_changes_keep_the_counters_in_step(db):
+    bills = create_bills(db, 2)
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            await AsyncBillService.mark_bill_called(session, bills[0].id)
+            await AsyncBillService.mark_bill_paid(session, bills[1].id, "pay-1", datetime.utcnow())
+
+    asyncio.run(run())
+    assert_counters_match_rebuild(db)
+
+
+def test_call_webhooks_keep_the_counters_in_step(db):
+    for i, bill in enumerate(create_bills(db, 3)):
+        CallService.record_call(db, bill, {"id": f"call-{i}"})
+        active_call_cache.invalidate(f"call-{i}")
+
+    events = [
+        {"message": {"type": "status-update", "status": "in-progress"}, "call": {"id": "call-0"}},
+        {
+            "message": {"type": "tool-calls", "toolCalls": [{"function": {"name": "confirm_payment", "arguments": "{}"}}]},
+            "call": {"id": "call-0"},
+        },
+        {"message": {"type": "end-of-call-report", "endedReason": "customer-ended-call"}, "call": {"id": "call-0"}},
+        {"message": {"type": "end-of-call-report", "endedReason": "customer-busy"}, "call": {"id": "call-1"}},
+        # A replayed report changes nothing
+        {"message": {"type": "end-of-call-report", "endedReason": "customer-busy"}, "call": {"id": "call-1"}},
+        {"message": {"type": "status-update", "status": "ringing"}, "call": {"id": "call-2"}},
+    ]
+    for event in events:
+        asyncio.run(process_vapi_event(event))
+
+    assert_counters_match_rebuild(db)
@@ -0,0 +1,41 @@
+from app.models import CallLog, TranscriptSegment
+from app.schemas.bill import BillCreate
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.transcript_service import TranscriptService
+from conftest import bill_data
+
+
+def test_seq_taken_by_another_process_is_renumbered(db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(1)))
+    call_log = CallService.record_call(db, bill, {"id": "call-1"})
+
+    # Two processes each numbered their first utterance 1 from their own cache
+    TranscriptService.append_segment(db, call_log.id, "user", "Hello", seq=1)
+    db.commit()
+    segment = TranscriptService.append_segment(db, call_log.id, "assistant", "Hi there", seq=1)
+    db.commit()
+
+    assert segment.seq == 2
+    assert TranscriptService.assemble(db, call_log.id) == "user: Hello\nassistant: Hi there"
+    assert db.query(TranscriptSegment).count() == 2
+
+
+def transcript_event(text, call_id="call-1"):
+    return {
+        "message": {"type": "transcript", "transcriptType": "final", "role": "user", "transcript": text},
+        "call": {"id": call_id},
+    }
+
+
+def test_utterance_after_end_of_call_reaches_the_transcript(client, db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(1)))
+    call_log = CallService.record_call(db, bill, {"id": "call-1"})
+    end = {"message": {"type": "end-of-call-report", "endedReason": "customer-ended-call"}, "call": {"id": "call-1"}}
+
+    for event in (transcript_event("Hello"), end, transcript_event("Bye")):
+        assert client.post("/api/webhooks/vapi/events", json=event).status_code == 200
+
+    assert client.get(f"/api/calls/{call_log.id}").json()["transcript"] == "user: Hello\nuser: Bye"
+    db.expire_all()
+    assert db.get(CallLog, call_log.id).transcript == "user: Hello\nuser: Bye"
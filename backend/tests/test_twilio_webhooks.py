@@ -0,0 +1,14 @@
+from app.models.sms_delivery import SmsDelivery
+
+
+def post_status(client, status):
+    return client.post("/api/webhooks/twilio/sms-status", data={"MessageSid": "SM1", "MessageStatus": status})
+
+
+def test_sms_status_keeps_the_latest_status(client, db):
+    assert post_status(client, "sent").status_code == 200
+    assert post_status(client, "delivered").status_code == 200
+    # A late callback does not move the message back
+    assert post_status(client, "sent").status_code == 200
+
+    assert db.query(SmsDelivery).one().status == "delivered"
@@ -0,0 +1,64 @@
+import asyncio
+from app.models import CallLog, CallOutcome, CallStatus
+from app.schemas.bill import BillCreate
+from app.services import vapi_event_handlers
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from conftest import bill_data
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def test_handlers_run_off_the_event_loop(client, db, monkeypatch):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": "call-1"})
+    active_call_cache.invalidate("call-1")
+    loop_used = []
+
+    apply_vapi_event = vapi_event_handlers.apply_vapi_event
+    apply_tool_changes = vapi_event_handlers.apply_tool_changes
+
+    def apply_event(db, event_data):
+        loop_used.append(on_event_loop())
+        return apply_vapi_event(db, event_data)
+
+    def apply_changes(db, **kwargs):
+        loop_used.append(on_event_loop())
+        return apply_tool_changes(db, **kwargs)
+
+    monkeypatch.setattr(vapi_event_handlers, "apply_vapi_event", apply_event)
+    monkeypatch.setattr(vapi_event_handlers, "apply_tool_changes", apply_changes)
+
+    status = {"message": {"type": "status-update", "status": "in-progress"}, "call": {"id": "call-1"}}
+    tool = {
+        "message": {"type": "tool-calls", "toolCalls": [{"function": {"name": "confirm_payment", "arguments": "{}"}}]},
+        "call": {"id": "call-1"},
+    }
+    assert client.post("/api/webhooks/vapi/events", json=status).status_code == 200
+    response = client.post("/api/webhooks/vapi/events", json=tool)
+    assert response.json() == {"success": True, "message": "Payment confirmed"}
+
+    assert loop_used == [False, False]
+    db.expire_all()
+    assert db.query(CallLog).one().outcome == CallOutcome.PAYMENT_CONFIRMED
+
+
+def test_status_update_after_end_of_call_on_the_same_object_is_ignored(db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": "call-1"})
+    call = active_call_cache.get("call-1")
+
+    # A writer batch applies both events to the cached object it resolved once
+    vapi_event_handlers.handle_end_of_call(db, call, {"ended_reason": "customer-ended-call"})
+    vapi_event_handlers.handle_status_update(db, call, {"status": "in-progress"})
+    db.commit()
+
+    db.expire_all()
+    assert db.query(CallLog).one().status == CallStatus.COMPLETED
@@ -0,0 +1,92 @@
+import asyncio
+from app.database import run_in_session
+from app.models import CallLog, CallStatus
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus, WebhookPartitionLease
+from app.schemas.bill import BillCreate
+from app.services import webhook_partitions
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.webhook_partitions import WebhookEventStore, WebhookPartitionWorker
+from conftest import bill_data
+from datetime import datetime, timedelta
+
+
+def status_event(status, call_id="call-1"):
+    return {"message": {"type": "status-update", "status": status}, "call": {"id": call_id}}
+
+
+def setup_call(db):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": "call-1"})
+    active_call_cache.invalidate("call-1")
+    return WebhookEventStore.append(db, status_event("ringing")).partition
+
+
+def worker(name, partition):
+    return WebhookPartitionWorker(worker_id=name, partitions=[partition], max_partitions=0)
+
+
+def claim(db, name, partition):
+    WebhookEventStore.ensure_partitions(db, partition + 1)
+    return WebhookEventStore.claim_partition(db, partition, name, 30)
+
+
+def test_lease_holder_applies_pending_events(db):
+    partition = setup_call(db)
+    assert claim(db, "a", partition)
+
+    assert worker("a", partition)._drain_pending(partition) == (1, False)
+
+    db.expire_all()
+    assert db.query(WebhookEvent).one().status == WebhookEventStatus.PROCESSED
+    assert db.query(CallLog).one().status == CallStatus.RINGING
+
+
+def test_worker_that_lost_its_lease_applies_nothing(db):
+    partition = setup_call(db)
+    assert claim(db, "a", partition)
+
+    # The lease expires and another worker takes the partition over
+    db.query(WebhookPartitionLease).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert claim(db, "b", partition)
+
+    assert worker("a", partition)._drain_pending(partition) == (1, True)
+    db.expire_all()
+    assert db.query(WebhookEvent).one().status == WebhookEventStatus.PENDING
+
+    assert worker("b", partition)._drain_pending(partition) == (1, False)
+    db.expire_all()
+    assert db.query(WebhookEvent).one().status == WebhookEventStatus.PROCESSED
+
+
+def test_event_applied_by_another_worker_is_skipped(db, monkeypatch):
+    partition = setup_call(db)
+    assert claim(db, "a", partition)
+    event_id = db.query(WebhookEvent.id).scalar()
+    applied = []
+    monkeypatch.setattr(webhook_partitions, "apply_vapi_event", lambda db, payload: applied.append(payload))
+
+    db.query(WebhookEvent).update({"status": WebhookEventStatus.PROCESSED})
+    db.commit()
+
+    assert run_in_session(worker("a", partition)._apply, partition, event_id, status_event("ringing"))
+    assert applied == []
+
+
+def test_leases_are_renewed_and_released_off_the_event_loop(db):
+    partition = setup_call(db)
+
+    async def run():
+        partition_worker = worker("a", partition)
+        partition_worker.start()
+        await asyncio.sleep(0.2)
+        owned = partition_worker.owned_partitions()
+        await partition_worker.stop()
+        return owned
+
+    assert asyncio.run(run()) == [partition]
+    db.expire_all()
+    assert db.query(WebhookEvent).one().status == WebhookEventStatus.PROCESSED
+    assert db.get(WebhookPartitionLease, partition).owner is None
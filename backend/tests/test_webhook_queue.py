@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import threading
+from app.config import get_settings
+from app.services import vapi_event_handlers
+from app.services.webhook_queue import WebhookEventQueue, WebhookQueueFull, webhook_queue
+
+
+def status_event(n, call_id="call-1"):
+    return {"message": {"type": "status-update", "status": "ringing"}, "call": {"id": call_id}, "n": n}
+
+
+def test_queued_events_are_applied_in_order_off_the_event_loop(monkeypatch):
+    applied = []
+
+    def apply(db, event_data):
+        applied.append((threading.get_ident(), event_data["n"]))
+        return {}
+
+    monkeypatch.setattr(vapi_event_handlers, "apply_vapi_event", apply)
+
+    async def run():
+        queue = WebhookEventQueue(consumers=2, max_size=100, max_wait=1)
+        queue.start()
+        for n in range(5):
+            assert await queue.enqueue(status_event(n))
+        await queue.stop()
+        return threading.get_ident(), queue.processed
+
+    loop_thread, processed = asyncio.run(run())
+    assert processed == 5
+    assert [n for _, n in applied] == list(range(5))
+    assert all(thread != loop_thread for thread, _ in applied)
+
+
+def test_full_shard_pushes_back_instead_of_applying_inline(monkeypatch):
+    release = threading.Event()
+    applied = []
+
+    def apply(db, event_data):
+        release.wait(5)
+        applied.append(event_data["n"])
+        return {}
+
+    monkeypatch.setattr(vapi_event_handlers, "apply_vapi_event", apply)
+
+    async def run():
+        queue = WebhookEventQueue(consumers=1, max_size=1, max_wait=0.05)
+        queue.start()
+        await queue.enqueue(status_event(0))
+        await asyncio.sleep(0.01)  # the consumer is now applying event 0
+        await queue.enqueue(status_event(1))
+        with pytest.raises(WebhookQueueFull):
+            await queue.enqueue(status_event(2))
+        release.set()
+        await queue.stop()
+        return queue.rejected
+
+    assert asyncio.run(run()) == 1
+    assert applied == [0, 1]
+
+
+def test_endpoint_asks_vapi_to_retry_when_the_queue_is_full(client, monkeypatch):
+    async def full(event_data):
+        raise WebhookQueueFull("Webhook queue is full")
+
+    monkeypatch.setattr(get_settings(), "webhook_ingest_mode", "queue")
+    monkeypatch.setattr(webhook_queue, "enqueue", full)
+
+    response = client.post("/api/webhooks/vapi/events", json=status_event(0))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,58 @@
+import asyncio
+from app.models import Bill, BillStatus, CallLog, CallStatus
+from app.schemas.bill import BillCreate
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.vapi_event_handlers import process_vapi_event
+from conftest import bill_data
+
+
+def end_of_call(call_id="call-1"):
+    return {
+        "message": {"type": "end-of-call-report", "endedReason": "customer-ended-call"},
+        "call": {"id": call_id, "duration": 30},
+    }
+
+
+def place_call(db, call_id="call-1"):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": call_id})
+    active_call_cache.invalidate(call_id)
+    return bill
+
+
+def test_replayed_end_of_call_counts_the_attempt_once(db):
+    bill = place_call(db)
+
+    asyncio.run(process_vapi_event(end_of_call()))
+    asyncio.run(process_vapi_event(end_of_call()))
+
+    db.expire_all()
+    bill = db.get(Bill, bill.id)
+    assert bill.status == BillStatus.CALLED
+    assert bill.call_attempts == 1
+
+
+def test_replayed_end_of_call_leaves_a_paid_bill_paid(db):
+    bill = place_call(db)
+    asyncio.run(process_vapi_event(end_of_call()))
+
+    db.expire_all()
+    bill = db.get(Bill, bill.id)
+    assert bill.next_reminder_date is not None
+    bill.status = BillStatus.PAID
+    bill.next_reminder_date = None
+    db.commit()
+
+    asyncio.run(process_vapi_event(end_of_call()))
+    asyncio.run(process_vapi_event(
+        {"message": {"type": "status-update", "status": "in-progress"}, "call": {"id": "call-1"}}
+    ))
+
+    db.expire_all()
+    bill = db.get(Bill, bill.id)
+    assert bill.status == BillStatus.PAID
+    assert bill.call_attempts == 1
+    assert bill.next_reminder_date is None
+    assert db.query(CallLog).one().status == CallStatus.COMPLETED
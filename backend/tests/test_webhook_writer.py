@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+import sys
+import threading
+from app.models import CallLog
+from app.schemas.bill import BillCreate
+from app.services import call_tools, webhook_writer
+from app.services.active_call_cache import active_call_cache
+from app.services.bill_service import BillService
+from app.services.call_service import CallService
+from app.services.webhook_queue import WebhookEventQueue, WebhookQueueFull
+from app.services.webhook_writer import DEFERRED, GROUP, IMMEDIATE, WebhookCommitWriter
+from conftest import bill_data
+
+
+def status_event(n, call_id="call-1"):
+    return {"message": {"type": "status-update", "status": "ringing"}, "call": {"id": call_id}, "n": n}
+
+
+def writer(**durability):
+    return WebhookCommitWriter(window=0.05, max_batch=10, durability=durability, default_durability=GROUP)
+
+
+def test_events_arriving_together_share_one_commit_off_the_event_loop(monkeypatch):
+    applied = []
+
+    def apply(db, event_data):
+        applied.append((threading.get_ident(), event_data["n"]))
+        return {"n": event_data["n"]}
+
+    monkeypatch.setattr(webhook_writer, "apply_vapi_event", apply)
+
+    async def run():
+        commit_writer = writer()
+        commit_writer.start()
+        results = await asyncio.gather(*(commit_writer.submit(status_event(n)) for n in range(4)))
+        await commit_writer.stop()
+        return threading.get_ident(), results, commit_writer.get_stats()
+
+    loop_thread, results, stats = asyncio.run(run())
+    assert results == [{"n": n} for n in range(4)]
+    assert [n for _, n in applied] == list(range(4))
+    assert all(thread != loop_thread for thread, _ in applied)
+    assert stats["batches"] == 1
+    assert stats["events"] == 4
+
+
+def test_failing_event_is_isolated_from_its_batch(monkeypatch):
+    def apply(db, event_data):
+        if event_data["n"] == 1:
+            raise RuntimeError("bad event")
+        return {"n": event_data["n"]}
+
+    monkeypatch.setattr(webhook_writer, "apply_vapi_event", apply)
+
+    async def run():
+        commit_writer = writer()
+        commit_writer.start()
+        results = await asyncio.gather(
+            *(commit_writer.submit(status_event(n)) for n in range(3)), return_exceptions=True
+        )
+        await commit_writer.stop()
+        return results, commit_writer.get_stats()
+
+    results, stats = asyncio.run(run())
+    assert results[0] == {"n": 0} and results[2] == {"n": 2}
+    assert isinstance(results[1], RuntimeError)
+    assert stats["retried_batches"] == 1
+    assert stats["failed"] == 1
+    assert stats["events"] == 2
+
+
+def test_slow_tool_does_not_hold_up_other_events(db, monkeypatch):
+    bill = BillService.create_bill(db, BillCreate(**bill_data(0)))
+    CallService.record_call(db, bill, {"id": "call-1"})
+    active_call_cache.invalidate("call-1")
+    order = []
+
+    def apply(db, event_data):
+        order.append("status")
+        return {}
+
+    monkeypatch.setattr(webhook_writer, "apply_vapi_event", apply)
+
+    tool_event = {
+        "message": {"type": "tool-calls", "toolCalls": [{"function": {"name": "send_payment_link", "arguments": "{}"}}]},
+        "call": {"id": "call-1"},
+    }
+
+    async def run():
+        sms_sent = asyncio.Event()
+
+        async def send_payment_link(**kwargs):
+            await sms_sent.wait()
+            order.append("sms")
+            return {"success": True, "sid": "SM1"}
+
+        monkeypatch.setattr(call_tools.twilio_service, "send_payment_link", send_payment_link)
+
+        commit_writer = writer(**{"tool-calls": IMMEDIATE, "status-update": DEFERRED})
+        commit_writer.start()
+        tool = asyncio.ensure_future(commit_writer.submit(tool_event))
+        await asyncio.sleep(0.01)
+        await commit_writer.submit(status_event(0))
+        await asyncio.sleep(0.1)
+        sms_sent.set()
+        response = await tool
+        await commit_writer.stop()
+        return response
+
+    assert asyncio.run(run()) == {"success": True, "message": "SMS sent successfully", "sid": "SM1"}
+    # The status event was committed while the SMS was still being sent
+    assert order == ["status", "sms"]
+
+    db.expire_all()
+    call_log = db.query(CallLog).one()
+    assert call_log.sms_sent == 1
+    assert call_log.sms_sid == "SM1"
+
+
+def test_full_writer_pushes_back_on_the_webhook_queue(monkeypatch):
+    release = threading.Event()
+
+    def apply(db, event_data):
+        release.wait(5)
+        return {}
+
+    monkeypatch.setattr(webhook_writer, "apply_vapi_event", apply)
+    commit_writer = WebhookCommitWriter(window=0, max_batch=1, durability={}, default_durability=GROUP, max_queue=1)
+    # app.services re-exports the queue instance under the module's name
+    monkeypatch.setattr(sys.modules["app.services.webhook_queue"], "webhook_commit_writer", commit_writer)
+
+    async def run():
+        commit_writer.start()
+        queue = WebhookEventQueue(consumers=1, max_size=1, max_wait=0.05)
+        queue.start()
+
+        # One event being applied, one waiting in the writer, one held by the
+        # consumer, one in the shard; the next one is refused
+        for n in range(4):
+            await queue.enqueue(status_event(n))
+            await asyncio.sleep(0.02)
+        with pytest.raises(WebhookQueueFull):
+            await queue.enqueue(status_event(4))
+
+        release.set()
+        await queue.stop()
+        await commit_writer.stop()
+        return commit_writer.events
+
+    assert asyncio.run(run()) == 4
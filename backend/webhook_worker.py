@@ -0,0 +1,49 @@
+"""
+Standalone webhook partition worker
+Applies VAPI webhook events stored in partitioned mode (WEBHOOK_INGEST_MODE=partitioned).
+Run several of these processes to spread partitions across cores; each
+partition is leased to one worker at a time, so events of a call stay in order.
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import logging
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db
+from app.services.webhook_partitions import WebhookPartitionWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply partitioned VAPI webhook events")
+    parser.add_argument("--partitions", default=None, help="Comma-separated partitions to serve (default: any free partition)")
+    parser.add_argument("--max-partitions", type=int, default=None, help="Most partitions this worker holds at once (0 = no limit)")
+    parser.add_argument("--worker-id", default=None, help="Identifier recorded on partition leases")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    partitions = [int(p) for p in args.partitions.split(",")] if args.partitions else None
+    
+    init_db()
+    worker = WebhookPartitionWorker(
+        worker_id=args.worker_id,
+        partitions=partitions,
+        max_partitions=args.max_partitions
+    )
+    
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,6 +76,18 @@ class APIClient {
         return this.request('/api/bills/overdue/list');
     }
 
+    // Campaigns API
+    async createCampaign(campaignData = {}) {
+        return this.request('/api/campaigns/', {
+            method: 'POST',
+            body: JSON.stringify(campaignData)
+        });
+    }
+
+    async getCampaign(campaignId) {
+        return this.request(`/api/campaigns/${campaignId}`);
+    }
+
     // Calls API
     async getCallLogs(params = {}) {
         const queryString = new URLSearchParams(params).toString();
@@ -95,6 +107,11 @@ class APIClient {
         return this.request(`/api/payments/bill/${billId}`);
     }
 
+    // Stats API
+    async getStats() {
+        return this.request('/api/stats/');
+    }
+
     // Health Check
     async healthCheck() {
         return this.request('/health');
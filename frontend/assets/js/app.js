@@ -175,23 +175,15 @@ function setupQuickActions() {
             }
 
             try {
-                const response = await api.getPendingBills();
-                const bills = response.bills || [];
+                // Dialing runs server-side; the campaign keeps going if this tab is closed
+                const campaign = await api.createCampaign();
 
-                if (bills.length === 0) {
+                if (campaign.total === 0) {
                     utils.showToast('No pending bills to call', 'info');
                     return;
                 }
 
-                utils.showToast(`Initiating calls for ${bills.length} bills...`, 'info');
-
-                // Initiate calls for each bill (with delay to avoid overwhelming the system)
-                for (let i = 0; i < Math.min(bills.length, 5); i++) {
-                    await api.initiateCall(bills[i].id);
-                    await new Promise(resolve => setTimeout(resolve, 1000));
-                }
-
-                utils.showToast('Calls initiated successfully!', 'success');
+                utils.showToast(`Campaign started for ${campaign.total} bills`, 'success');
                 await dashboard.loadDashboard();
 
             } catch (error) {
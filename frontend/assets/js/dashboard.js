@@ -25,13 +25,13 @@ class Dashboard {
 
     async loadStats() {
         try {
-            const response = await api.getBills();
-            const bills = response.bills || [];
+            const stats = await api.getStats();
+            const byStatus = stats.bills.by_status;
 
-            this.stats.total = bills.length;
-            this.stats.pending = bills.filter(b => b.status === 'pending').length;
-            this.stats.paid = bills.filter(b => b.status === 'paid').length;
-            this.stats.overdue = bills.filter(b => b.status === 'overdue').length;
+            this.stats.total = stats.bills.total;
+            this.stats.pending = byStatus.pending.count;
+            this.stats.paid = byStatus.paid.count;
+            this.stats.overdue = byStatus.overdue.count;
 
             this.updateStatsDisplay();
         } catch (error) {